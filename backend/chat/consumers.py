@@ -4,7 +4,7 @@ from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth import get_user_model
 
-from gamification.signals import award_mission
+from gamification.events import publish
 
 from .models import Message
 from .serializers import MessageSerializer
@@ -48,7 +48,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             content=message,
         )
 
-        await sync_to_async(award_mission)(sender, "daily_chat")
+        await sync_to_async(publish)("chat_message_sent", sender.pk)
 
         serialized_msg = await sync_to_async(lambda: MessageSerializer(msg).data)()
 
@@ -1,15 +1,25 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from users.fields import ProfilePictureVariantsField
+
 from .models import Message
 
 User = get_user_model()
 
 
 class UserMiniSerializer(serializers.ModelSerializer):
+    profile_picture_variants = ProfilePictureVariantsField()
+
     class Meta:
         model = User
-        fields = ("username", "first_name", "last_name", "profile_picture")
+        fields = (
+            "username",
+            "first_name",
+            "last_name",
+            "profile_picture",
+            "profile_picture_variants",
+        )
 
 
 class MessageSerializer(serializers.ModelSerializer):
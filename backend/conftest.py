@@ -0,0 +1,114 @@
+import uuid
+
+import pytest
+import redis
+from django.core.cache import cache
+from django.db import connection
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-plans",
+        action="store_true",
+        default=False,
+        help="Seed large tables and fail on sequential scans behind API endpoints.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_plan: EXPLAIN-based checks, enabled with --query-plans"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--query-plans"):
+        return
+    skip = pytest.mark.skip(reason="needs --query-plans")
+    for item in items:
+        if "query_plan" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """Runs every test against an empty in-process cache instead of Redis."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_media(settings, tmp_path):
+    """Keeps uploaded files out of the real ``MEDIA_ROOT``."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+
+
+@pytest.fixture(autouse=True)
+def isolated_leaderboards(settings):
+    """Gives every test its own leaderboard keys in Redis."""
+    settings.LEADERBOARD_KEY_PREFIX = f"test:leaderboard:{uuid.uuid4().hex}"
+    yield
+    from gamification.leaderboards import ROLES, board_key, get_client
+
+    try:
+        get_client().delete(*(board_key(role) for role in ROLES))
+    except redis.ConnectionError:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def inline_gamification_events(settings):
+    """Handles gamification events on commit instead of queueing them."""
+    settings.GAMIFICATION_EVENTS_BACKEND = "inline"
+
+
+def _seq_scans(plan):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+@pytest.fixture
+def assert_no_seq_scans():
+    """
+    Runs EXPLAIN on every SELECT captured from ``queries`` and fails if any of
+    them sequentially scans a table holding at least ``min_rows`` rows.
+
+    Sequential scans are disabled while planning, so one only remains where
+    no index can serve the query. That keeps the check independent of how
+    the planner weighs index and sequential scans on the seeded statistics.
+    """
+
+    def check(queries, min_rows=1000):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= %s",
+                [min_rows],
+            )
+            large_tables = {row[0] for row in cursor.fetchall()}
+
+            offenders = []
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                for query in queries:
+                    sql = query["sql"]
+                    if not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                    plan = cursor.fetchone()[0][0]["Plan"]
+                    scanned = set(_seq_scans(plan)) & large_tables
+                    if scanned:
+                        offenders.append(f"{', '.join(sorted(scanned))}: {sql}")
+            finally:
+                cursor.execute("RESET enable_seqscan")
+
+        assert not offenders, "Sequential scans on large tables:\n" + "\n".join(
+            offenders
+        )
+
+    return check
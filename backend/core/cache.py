@@ -0,0 +1,103 @@
+import hashlib
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+TAG_KEY = "cache-tag:{}"
+
+
+def tag_versions(tags):
+    """
+    Current version token of every tag, creating tokens for unknown tags.
+
+    Tokens are random rather than counters, so a token lost to eviction can
+    never come back with a value an old entry was stored under.
+    """
+    keys = {tag: TAG_KEY.format(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            found[key] = cache.get(key)
+        versions[tag] = found[key]
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Orphans every cached response stored under any of ``tags``."""
+    cache.set_many({TAG_KEY.format(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def _digest(parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def cached_value(name, parts, tags, compute, timeout=None):
+    """
+    Returns ``compute()`` cached under ``name``, ``parts`` and the current
+    versions of ``tags``.
+    """
+    versions = sorted(tag_versions(tags).items())
+    key = f"value:{name}:{_digest((parts, versions))}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout or settings.RESPONSE_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_tags_on_commit(*tags):
+    # Invalidating before commit would let a concurrent read cache the old
+    # rows again until the next write.
+    transaction.on_commit(partial(invalidate_tags, *tags))
+
+
+class CachedResponseMixin:
+    """
+    Caches the data of ``list`` and ``retrieve`` responses under ``cache_tags``.
+
+    Entries are keyed on the full path and the current version of each tag,
+    so ``invalidate_tags`` drops them without knowing their keys. Set
+    ``cache_per_user`` when the payload depends on the requesting user.
+
+    Behind ``ConditionalGetMixin`` the validator it computed is part of the
+    key as well, so a cached body can never disagree with its ETag while an
+    invalidation is still waiting for its transaction to commit.
+    """
+
+    cache_tags = ()
+    cache_per_user = False
+    cache_timeout = None
+
+    def get_cache_key(self):
+        versions = tag_versions(self.cache_tags)
+        user_id = self.request.user.pk if self.cache_per_user else None
+        parts = (
+            self.request.get_full_path(),
+            user_id,
+            sorted(versions.items()),
+            getattr(self, "response_version", None),
+        )
+        return f"response:{type(self).__name__}:{self.action}:{_digest(parts)}"
+
+    def cached(self, render):
+        key = self.get_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = render()
+        if response.status_code == 200:
+            timeout = self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(partial(super().retrieve, request, *args, **kwargs))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from gamification.ledger import COMPACT_BATCH_SIZE, compact, compaction_cutoff
+
+
+class Command(BaseCommand):
+    help = "Delete XP ledger entries of old seasons, keeping their period rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-seasons",
+            type=int,
+            default=4,
+            help="Full seasons before the current one whose entries are kept.",
+        )
+        parser.add_argument("--batch-size", type=int, default=COMPACT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        removed = compact(
+            keep_seasons=options["keep_seasons"], batch_size=options["batch_size"]
+        )
+        cutoff = compaction_cutoff(options["keep_seasons"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Compacted {removed} ledger entries before {cutoff}.")
+        )
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from gigs.storage import GC_BATCH_SIZE, GC_GRACE, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete stored files that no submission or instruction refers to"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE)
+        parser.add_argument(
+            "--grace-minutes", type=int, default=int(GC_GRACE.total_seconds() // 60)
+        )
+
+    def handle(self, *args, **options):
+        removed = collect_garbage(
+            batch_size=options["batch_size"],
+            grace=timedelta(minutes=options["grace_minutes"]),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {removed} unused files."))
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from gigs.importers import (
+    DEFAULT_BATCH_SIZE,
+    GigImportError,
+    import_gigs,
+    parse_gig_rows,
+)
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Import gigs for one client from a JSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--client", required=True, help="Email or username")
+        parser.add_argument("--format", choices=["json", "csv"])
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "json")
+
+        client = User.objects.filter(
+            Q(email=options["client"]) | Q(username=options["client"])
+        ).first()
+        if client is None:
+            raise CommandError(f"User '{options['client']}' not found.")
+
+        try:
+            rows = parse_gig_rows(path.read_text(encoding="utf-8-sig"), fmt)
+            gigs = import_gigs(client, rows, batch_size=options["batch_size"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        except GigImportError as exc:
+            for row, errors in exc.errors.items():
+                self.stderr.write(f"Row {row}: {errors}")
+            raise CommandError("Nothing imported.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {len(gigs)} gigs for {client}.")
+        )
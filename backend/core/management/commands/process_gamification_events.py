@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gamification.events import EVENT_BATCH_SIZE, process_events
+
+
+class Command(BaseCommand):
+    help = "Apply missions, badges and notifications for queued gamification events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=EVENT_BATCH_SIZE)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Stop once the queue is empty instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            taken = process_events(batch_size=options["batch_size"])
+            processed += taken
+            if taken:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} events."))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gigs.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = "Delete resumable uploads that have not received a chunk for a while"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            upload.discard()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} stale uploads."))
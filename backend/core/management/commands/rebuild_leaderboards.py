@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from gamification.leaderboards import REBUILD_CHUNK_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis leaderboards from the gamification profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=REBUILD_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        sizes = rebuild(chunk_size=options["chunk_size"])
+        for role, size in sizes.items():
+            self.stdout.write(self.style.SUCCESS(f"{role}: {size} users ranked."))
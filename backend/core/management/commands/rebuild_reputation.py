@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gigs.reputation import rebuild_reputations
+
+
+class Command(BaseCommand):
+    help = "Recompute every freelancer's reputation from their reviews"
+
+    def handle(self, *args, **options):
+        count = rebuild_reputations()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} reputations."))
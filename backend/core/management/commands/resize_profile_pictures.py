@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from users.images import generate_variants, variant_names
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Render missing or outdated profile picture variants"
+
+    def handle(self, *args, **options):
+        users = (
+            User.objects.exclude(profile_picture="")
+            .exclude(profile_picture__isnull=True)
+            .only("pk", "profile_picture", "profile_picture_variants")
+        )
+        count = 0
+        for user in users.iterator():
+            source = user.profile_picture.name
+            if user.profile_picture_variants == variant_names(source):
+                continue
+            try:
+                generate_variants(user.pk, source)
+            except OSError as exc:
+                self.stderr.write(f"{source}: {exc}")
+                continue
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Resized {count} profile pictures."))
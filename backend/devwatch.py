@@ -8,6 +8,8 @@ def start():
     subprocess.run(["python", "manage.py", "makemigrations"])
     print("🔄 Running migrations...")
     subprocess.run(["python", "manage.py", "migrate"])
+    print("🏆 Seeding leaderboards...")
+    subprocess.run(["python", "manage.py", "rebuild_leaderboards"])
     print("🚀 Starting Daphne...")
     subprocess.run(
         [
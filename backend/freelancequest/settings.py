@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "django.contrib.postgres",
     "daphne",
     "django.contrib.staticfiles",
     # 3rd party apps
@@ -101,6 +102,24 @@ CHANNEL_LAYERS = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "freelancequest",
+    }
+}
+
+# Upper bound on staleness for cached API responses that no signal covers.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Redis sorted sets ranking each role by total XP; rebuild_leaderboards
+# refills them from Postgres.
+LEADERBOARD_KEY_PREFIX = "freelancequest:leaderboard"
+
+# Length in months of a leaderboard season; seasons start in January.
+XP_SEASON_MONTHS = 3
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -229,6 +248,25 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Gig files are downloaded through an access-checked view that hands the
+# transfer to the front proxy: "X-Accel-Redirect" for nginx, with
+# PROTECTED_MEDIA_PREFIX an internal location aliased to MEDIA_ROOT, or
+# "X-Sendfile" for Apache. Left empty, Django streams the files itself.
+PROTECTED_MEDIA_HEADER = env("PROTECTED_MEDIA_HEADER", default="")
+PROTECTED_MEDIA_PREFIX = env("PROTECTED_MEDIA_PREFIX", default="/protected-media/")
+
+# Partial files of resumable uploads, kept outside MEDIA_ROOT until finalized.
+CHUNKED_UPLOAD_DIR = BASE_DIR / "upload_chunks"
+CHUNKED_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+# Processes resizing profile pictures; 0 resizes inline on commit instead.
+IMAGE_VARIANT_WORKERS = env.int("IMAGE_VARIANT_WORKERS", default=2)
+
+# Where gamification events go on commit: "outbox" queues them for the
+# process_gamification_events worker, "inline" handles them in-process.
+GAMIFICATION_EVENTS_BACKEND = env("GAMIFICATION_EVENTS_BACKEND", default="outbox")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -1,8 +1,14 @@
 from django.contrib import admin
 
-from .models import GamificationProfile
+from .models import GamificationEvent, GamificationProfile
 
 
 @admin.register(GamificationProfile)
 class GamificationProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "xp", "level")
+
+
+@admin.register(GamificationEvent)
+class GamificationEventAdmin(admin.ModelAdmin):
+    list_display = ("kind", "user", "created_at", "attempts")
+    list_filter = ("kind",)
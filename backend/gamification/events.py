@@ -0,0 +1,105 @@
+import logging
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EVENT_BATCH_SIZE = 100
+# Events failing this many times stay in the outbox for inspection.
+MAX_ATTEMPTS = 5
+# A failed event waits this long before its first retry, doubling after that.
+RETRY_DELAY = timedelta(seconds=30)
+
+HANDLERS = {}
+
+
+def handles(kind):
+    """Registers the decorated ``handler(user, **payload)`` for ``kind``."""
+
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+def publish(kind, user_id, **payload):
+    """
+    Queues ``kind`` for ``user_id`` once the current transaction commits,
+    so the caller never waits on the rules that react to it.
+    """
+    backend = BACKENDS[settings.GAMIFICATION_EVENTS_BACKEND]
+    transaction.on_commit(partial(backend, kind, user_id, payload))
+
+
+def dispatch(kind, user, payload):
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        logger.warning("No handler for gamification event %s", kind)
+        return
+    handler(user, **payload)
+
+
+def _store(kind, user_id, payload):
+    from .models import GamificationEvent
+
+    GamificationEvent.objects.create(kind=kind, user_id=user_id, payload=payload)
+
+
+def _handle_inline(kind, user_id, payload):
+    """In-process stand-in for the outbox, used by tests and local runs."""
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is not None:
+        dispatch(kind, user, payload)
+
+
+BACKENDS = {"outbox": _store, "inline": _handle_inline}
+
+
+def process_events(batch_size=EVENT_BATCH_SIZE):
+    """
+    Handles up to ``batch_size`` outbox events, oldest first, and returns how
+    many were taken.
+
+    The batch stays locked until it is done, so several workers can run side
+    by side. Each event gets its own savepoint: a failing one is rolled back,
+    along with the notifications it queued, and retried after a backoff
+    without undoing the rest.
+    """
+    from .models import GamificationEvent
+
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            GamificationEvent.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=MAX_ATTEMPTS, available_at__lte=now)
+            .order_by("pk")[:batch_size]
+        )
+        if not events:
+            return 0
+        users = get_user_model().objects.in_bulk({event.user_id for event in events})
+
+        done, failed = [], []
+        for event in events:
+            try:
+                with transaction.atomic():
+                    dispatch(event.kind, users[event.user_id], event.payload)
+            except Exception as exc:
+                logger.exception("Gamification event %s failed", event.pk)
+                event.attempts += 1
+                event.last_error = repr(exc)
+                event.available_at = now + RETRY_DELAY * 2 ** (event.attempts - 1)
+                failed.append(event)
+            else:
+                done.append(event.pk)
+
+        GamificationEvent.objects.filter(pk__in=done).delete()
+        GamificationEvent.objects.bulk_update(
+            failed, ["attempts", "last_error", "available_at"]
+        )
+    return len(events)
@@ -0,0 +1,236 @@
+import logging
+import threading
+from functools import wraps
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("freelancer", "client")
+REBUILD_CHUNK_SIZE = 2000
+# Reads fall back to Postgres, so fail fast rather than retry with backoff.
+REDIS_TIMEOUT = 0.5
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=REDIS_TIMEOUT,
+                socket_timeout=REDIS_TIMEOUT,
+                retry=Retry(NoBackoff(), 1),
+            )
+        return _client
+
+
+def board_key(role):
+    return f"{settings.LEADERBOARD_KEY_PREFIX}:{role}"
+
+
+def total_xp(level, xp):
+    from .models import LEVEL_XP
+
+    return LEVEL_XP * (2 ** (level - 1) - 1) + xp
+
+
+def raise_scores(rows):
+    """
+    Records ``(user_id, role, level, xp)`` rows read after a reward. Scores
+    only ever go up here, so a late callback cannot undo a newer one.
+    """
+    pipe = get_client().pipeline(transaction=False)
+    for user_id, role, level, xp in rows:
+        if role in ROLES:
+            pipe.zadd(board_key(role), {user_id: total_xp(level, xp)}, gt=True)
+    pipe.execute()
+
+
+def sync_user(user_id):
+    """Puts the user on their role's board with their current total XP."""
+    from .models import GamificationProfile
+
+    row = (
+        GamificationProfile.objects.filter(user_id=user_id)
+        .values_list("user__role", "level", "xp")
+        .first()
+    )
+    pipe = get_client().pipeline(transaction=True)
+    for role in ROLES:
+        pipe.zrem(board_key(role), user_id)
+    if row is not None and row[0] in ROLES:
+        role, level, xp = row
+        pipe.zadd(board_key(role), {user_id: total_xp(level, xp)})
+    pipe.execute()
+
+
+def remove_user(user_id):
+    pipe = get_client().pipeline(transaction=True)
+    for role in ROLES:
+        pipe.zrem(board_key(role), user_id)
+    pipe.execute()
+
+
+def on_commit(func, *args):
+    """Runs a board update after commit; a Redis outage only gets logged."""
+    transaction.on_commit(lambda: func(*args), robust=True)
+
+
+def _ranked_profiles(role):
+    """Profiles on ``role``'s board in Postgres; level then XP orders total XP."""
+    from .models import GamificationProfile
+
+    return GamificationProfile.objects.filter(user__role=role).order_by(
+        "-level", "-xp", "user_id"
+    )
+
+
+def _db_top(role, limit):
+    rows = _ranked_profiles(role).values_list("user_id", "level", "xp")[:limit]
+    return [
+        (user_id, rank, total_xp(level, xp))
+        for rank, (user_id, level, xp) in enumerate(rows, start=1)
+    ]
+
+
+def _db_rank_of(role, user_id):
+    profiles = _ranked_profiles(role)
+    row = profiles.filter(user_id=user_id).values_list("level", "xp").first()
+    if row is None:
+        return None
+    level, xp = row
+    ahead = profiles.filter(
+        Q(level__gt=level)
+        | Q(level=level, xp__gt=xp)
+        | Q(level=level, xp=xp, user_id__lt=user_id)
+    ).count()
+    return ahead + 1, total_xp(level, xp)
+
+
+def _db_around(role, user_id, radius):
+    ranked = _db_rank_of(role, user_id)
+    if ranked is None:
+        return []
+    start = max(ranked[0] - 1 - radius, 0)
+    rows = _ranked_profiles(role).values_list("user_id", "level", "xp")[
+        start : ranked[0] + radius
+    ]
+    return [
+        (member, position, total_xp(level, xp))
+        for position, (member, level, xp) in enumerate(rows, start=start + 1)
+    ]
+
+
+def _db_count(role):
+    return _ranked_profiles(role).count()
+
+
+def _or_from_postgres(fallback):
+    """
+    Answers a board read from Postgres when Redis cannot be reached, which
+    is slower on a large board but keeps the page up.
+    """
+
+    def decorate(func):
+        @wraps(func)
+        def read(*args):
+            try:
+                return func(*args)
+            except redis.RedisError:
+                logger.warning("Leaderboard read from Postgres", exc_info=True)
+                return fallback(*args)
+
+        return read
+
+    return decorate
+
+
+@_or_from_postgres(_db_top)
+def top(role, limit):
+    """``(user_id, rank, score)`` of the first ``limit`` users, rank 1-based."""
+    members = get_client().zrevrange(board_key(role), 0, limit - 1, withscores=True)
+    return [
+        (int(member), rank, int(score))
+        for rank, (member, score) in enumerate(members, start=1)
+    ]
+
+
+@_or_from_postgres(_db_rank_of)
+def rank_of(role, user_id):
+    """The 1-based rank and score of ``user_id``, or ``None`` if not ranked."""
+    pipe = get_client().pipeline(transaction=False)
+    pipe.zrevrank(board_key(role), user_id)
+    pipe.zscore(board_key(role), user_id)
+    rank, score = pipe.execute()
+    if rank is None:
+        return None
+    return rank + 1, int(score)
+
+
+@_or_from_postgres(_db_around)
+def around(role, user_id, radius):
+    """
+    ``(user_id, rank, score)`` of up to ``radius`` users either side of
+    ``user_id`` and the user itself, or ``[]`` if they are not ranked.
+    """
+    rank = get_client().zrevrank(board_key(role), user_id)
+    if rank is None:
+        return []
+    start = max(rank - radius, 0)
+    members = get_client().zrevrange(
+        board_key(role), start, rank + radius, withscores=True
+    )
+    return [
+        (int(member), position, int(score))
+        for position, (member, score) in enumerate(members, start=start + 1)
+    ]
+
+
+@_or_from_postgres(_db_count)
+def count(role):
+    return get_client().zcard(board_key(role))
+
+
+def rebuild(chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Recomputes every board from Postgres into a scratch key and swaps it in,
+    so readers never see a half-built board. Returns the users per role.
+    """
+    from .models import GamificationProfile
+
+    client = get_client()
+    sizes = {}
+    for role in ROLES:
+        scratch = f"{board_key(role)}:rebuild"
+        client.delete(scratch)
+        rows = (
+            GamificationProfile.objects.filter(user__role=role)
+            .values_list("user_id", "level", "xp")
+            .iterator(chunk_size=chunk_size)
+        )
+        sizes[role] = 0
+        batch = {}
+        for user_id, level, xp in rows:
+            batch[user_id] = total_xp(level, xp)
+            if len(batch) >= chunk_size:
+                client.zadd(scratch, batch)
+                sizes[role] += len(batch)
+                batch = {}
+        if batch:
+            client.zadd(scratch, batch)
+            sizes[role] += len(batch)
+
+        if sizes[role]:
+            client.rename(scratch, board_key(role))
+        else:
+            client.delete(board_key(role))
+    return sizes
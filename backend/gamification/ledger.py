@@ -0,0 +1,84 @@
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import XPLedgerEntry, XPRollup
+
+COMPACT_BATCH_SIZE = 5000
+
+
+def period_starts(moment):
+    """First day of the week, month and season that ``moment`` falls in."""
+    day = timezone.localdate(moment)
+    season_month = (day.month - 1) // settings.XP_SEASON_MONTHS * (
+        settings.XP_SEASON_MONTHS
+    ) + 1
+    return {
+        XPRollup.WEEK: day - timedelta(days=day.weekday()),
+        XPRollup.MONTH: day.replace(day=1),
+        XPRollup.SEASON: date(day.year, season_month, 1),
+    }
+
+
+def record(user, entries):
+    """
+    Appends unsaved ``XPLedgerEntry`` objects for ``user`` and adds them to
+    the user's rollups for the current week, month and season.
+    """
+    if not entries:
+        return
+    now = timezone.now()
+    for entry in entries:
+        entry.user_id = user.pk
+        entry.created_at = now
+    starts = period_starts(now)
+
+    with transaction.atomic(savepoint=False):
+        XPLedgerEntry.objects.bulk_create(entries)
+        XPRollup.objects.bulk_create(
+            [
+                XPRollup(
+                    user_id=user.pk, role=user.role, period=period, period_start=start
+                )
+                for period, start in starts.items()
+            ],
+            ignore_conflicts=True,
+        )
+        current = Q()
+        for period, start in starts.items():
+            current |= Q(period=period, period_start=start)
+        XPRollup.objects.filter(current, user_id=user.pk).update(
+            xp=F("xp") + sum(entry.xp for entry in entries),
+            points=F("points") + sum(entry.points for entry in entries),
+        )
+
+
+def compaction_cutoff(keep_seasons, now=None):
+    """Start of the oldest season whose ledger entries are kept."""
+    start = period_starts(now or timezone.now())[XPRollup.SEASON]
+    months = (
+        start.year * 12 + start.month - 1 - keep_seasons * settings.XP_SEASON_MONTHS
+    )
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def compact(keep_seasons, batch_size=COMPACT_BATCH_SIZE):
+    """
+    Deletes ledger entries from before the last ``keep_seasons`` full
+    seasons, ``batch_size`` at a time, and returns how many went. Whole
+    seasons go at once, and their sums stay behind in the rollups.
+    """
+    cutoff = timezone.make_aware(
+        datetime.combine(compaction_cutoff(keep_seasons), time.min)
+    )
+    old = XPLedgerEntry.objects.filter(created_at__lt=cutoff)
+    removed = 0
+    while True:
+        batch = list(old.values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            return removed
+        XPLedgerEntry.objects.filter(pk__in=batch).delete()
+        removed += len(batch)
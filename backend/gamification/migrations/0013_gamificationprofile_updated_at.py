@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gamification", "0012_usermissionprogress_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamificationprofile",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
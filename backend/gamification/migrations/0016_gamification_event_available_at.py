@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gamification", "0015_xp_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamificationevent",
+            name="available_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
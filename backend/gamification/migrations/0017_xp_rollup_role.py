@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_roles(apps, schema_editor):
+    XPRollup = apps.get_model("gamification", "XPRollup")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    XPRollup.objects.update(
+        role=Subquery(User.objects.filter(pk=OuterRef("user_id")).values("role"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gamification", "0016_gamification_event_available_at"),
+        ("users", "0002_user_role"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="xprollup",
+            name="xp_rollup_board_idx",
+        ),
+        migrations.AddField(
+            model_name="xprollup",
+            name="role",
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.RunPython(backfill_roles, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="xprollup",
+            index=models.Index(
+                models.F("period"),
+                models.F("period_start"),
+                models.F("role"),
+                models.OrderBy(models.F("xp"), descending=True),
+                models.F("user"),
+                name="xp_rollup_board_idx",
+            ),
+        ),
+    ]
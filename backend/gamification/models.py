@@ -1,7 +1,63 @@
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connections, models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Cast, Floor, Log, Power
 from django.utils import timezone
 
+from . import leaderboards
+
+# XP to go from level n to n + 1 is LEVEL_XP * 2 ** (n - 1), so reaching
+# level n takes LEVEL_XP * (2 ** (n - 1) - 1) XP in total.
+LEVEL_XP = 100
+
+
+def level_for_total_xp(total):
+    """Level reached with ``total`` XP, in closed form."""
+    return (total // LEVEL_XP + 1).bit_length()
+
+
+def _xp_below(level):
+    """SQL for the total XP that reaching ``level`` takes."""
+    power = Cast(Power(Value(2), level - Value(1)), models.BigIntegerField())
+    return Value(LEVEL_XP) * (power - Value(1))
+
+
+class GamificationProfileQuerySet(models.QuerySet):
+    def add_rewards(self, xp=0, points=0):
+        """
+        Adds ``xp`` and ``points`` in a single UPDATE, levelling up in closed
+        form from the total XP, so concurrent awards never overwrite each
+        other. Returns the number of profiles updated.
+        """
+        changes = {"points": F("points") + points, "updated_at": timezone.now()}
+        if xp:
+            total = _xp_below(F("level")) + F("xp") + Value(xp)
+            # log(2, n) is exact at powers of two for numeric n, unlike for
+            # double precision.
+            steps = Cast(
+                (total / Value(LEVEL_XP)) + Value(1),
+                models.DecimalField(max_digits=40, decimal_places=0),
+            )
+            level = Cast(Floor(Log(Value(2), steps)), models.IntegerField()) + Value(1)
+            changes["level"] = level
+            changes["xp"] = total - _xp_below(level)
+        updated = self.update(**changes)
+        if xp and updated:
+            leaderboards.on_commit(
+                leaderboards.raise_scores,
+                self.values_list("user_id", "user__role", "level", "xp"),
+            )
+        return updated
+
+    def spend_points(self, amount):
+        """Takes ``amount`` points from profiles that have them; returns how many."""
+        return self.filter(points__gte=amount).update(
+            points=F("points") - amount, updated_at=timezone.now()
+        )
+
 
 class GamificationProfile(models.Model):
     user = models.OneToOneField(
@@ -12,32 +68,32 @@ class GamificationProfile(models.Model):
     xp = models.PositiveIntegerField(default=0)
     level = models.PositiveIntegerField(default=1)
     points = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GamificationProfileQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name} – Lvl {self.level} ({self.xp} XP)"
 
-    def add_xp(self, amount: int):
-        self.xp += amount
-
-        while self.xp >= self._xp_needed_for_next_level():
-            self.xp -= self._xp_needed_for_next_level()
-            self.level += 1
+    @property
+    def total_xp(self):
+        return leaderboards.total_xp(self.level, self.xp)
 
-        self.save()
+    def add_xp(self, amount: int):
+        self.add_rewards(xp=amount)
 
-    def _xp_needed_for_next_level(self) -> int:
-        return 100 * (2 ** (self.level - 1))
+    def add_rewards(self, xp: int = 0, points: int = 0):
+        """Adds XP and points atomically, then reloads them."""
+        GamificationProfile.objects.filter(pk=self.pk).add_rewards(xp=xp, points=points)
+        self.refresh_from_db(fields=["xp", "level", "points", "updated_at"])
 
     def add_points(self, amount: int):
-        self.points += amount
-        self.save()
+        self.add_rewards(points=amount)
 
     def spend_points(self, amount: int) -> bool:
-        if self.points >= amount:
-            self.points -= amount
-            self.save()
-            return True
-        return False
+        spent = GamificationProfile.objects.filter(pk=self.pk).spend_points(amount)
+        self.refresh_from_db(fields=["points", "updated_at"])
+        return bool(spent)
 
 
 class Mission(models.Model):
@@ -68,6 +124,22 @@ class Mission(models.Model):
     def __str__(self):
         return f"{self.title} ({self.xp_reward} XP)"
 
+    def period_start(self, now):
+        """
+        When the current period of a repeating mission began, or ``None``
+        for a one-time mission. Progress from before it starts over.
+        """
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.type == self.DAILY:
+            return midnight
+        if self.type == self.WEEKLY:
+            return now - timedelta(days=now.weekday())
+        if self.type == self.MONTHLY:
+            return midnight.replace(day=1)
+        if self.type == self.YEARLY:
+            return midnight.replace(month=1, day=1)
+        return None
+
 
 class PlatformBenefit(models.Model):
     name = models.CharField(max_length=100)
@@ -91,6 +163,70 @@ class UserBenefit(models.Model):
         return f"{self.user.get_full_name()} – {self.benefit.name}"
 
 
+# Upserts each (mission, goal) row's progress and marks it completed once it
+# reaches the goal. Completed progress is left alone, so RETURNING lists just
+# the rows this statement completed.
+ADVANCE_SQL = """
+INSERT INTO {progress} AS progress
+    (user_id, mission_id, current_count, completed, completed_at, seen, updated_at)
+SELECT %(user)s, goal.mission_id, %(increment)s, %(increment)s >= goal.count,
+    CASE WHEN %(increment)s >= goal.count THEN %(now)s END, false, %(now)s
+FROM (VALUES {goals}) AS goal (mission_id, count)
+ON CONFLICT (user_id, mission_id) DO UPDATE SET
+    current_count = progress.current_count + EXCLUDED.current_count,
+    completed = {reached},
+    completed_at = CASE WHEN {reached} THEN EXCLUDED.updated_at END,
+    updated_at = EXCLUDED.updated_at
+WHERE NOT progress.completed
+RETURNING progress.mission_id, progress.completed
+"""
+ADVANCE_REACHED_SQL = """
+progress.current_count + EXCLUDED.current_count >= (
+    SELECT GREATEST(goal_count, 1) FROM {mission} WHERE id = EXCLUDED.mission_id
+)
+"""
+
+
+class UserMissionProgressQuerySet(models.QuerySet):
+    def advance(self, user_id, missions, increment=1):
+        """
+        Adds ``increment`` to ``user_id``'s progress on ``missions`` in SQL,
+        starting repeating missions over once their period has passed, and
+        returns the missions this call completed. However many callers race,
+        each mission is completed, and so rewarded, once.
+        """
+        if not missions:
+            return []
+        now = timezone.now()
+        stale = Q()
+        for mission in missions:
+            start = mission.period_start(now)
+            if start is not None:
+                stale |= Q(mission=mission, updated_at__lt=start)
+        if stale:
+            self.filter(stale, user_id=user_id, completed=False).update(
+                current_count=0, updated_at=now
+            )
+
+        reached = ADVANCE_REACHED_SQL.format(mission=Mission._meta.db_table)
+        sql = ADVANCE_SQL.format(
+            progress=self.model._meta.db_table,
+            goals=", ".join(
+                f"(%(mission_{i})s::integer, %(goal_{i})s::integer)"
+                for i in range(len(missions))
+            ),
+            reached=reached,
+        )
+        params = {"user": user_id, "increment": increment, "now": now}
+        for i, mission in enumerate(missions):
+            params[f"mission_{i}"] = mission.pk
+            params[f"goal_{i}"] = max(mission.goal_count or 1, 1)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            completed = {mission_id for mission_id, done in cursor.fetchall() if done}
+        return [mission for mission in missions if mission.pk in completed]
+
+
 class UserMissionProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     mission = models.ForeignKey(Mission, on_delete=models.CASCADE)
@@ -100,18 +236,33 @@ class UserMissionProgress(models.Model):
     current_count = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserMissionProgressQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user", "mission")
 
-    def complete(self):
-        if not self.completed:
-            self.completed = True
-            self.completed_at = timezone.now()
-            self.save()
-
-            profile = self.user.gamification_profile
-            profile.add_xp(self.mission.xp_reward)
-            profile.add_points(self.mission.point_reward)
+    def complete(self) -> bool:
+        """
+        Marks the mission completed and pays its rewards, once however many
+        callers race for it. Returns whether this call completed it.
+        """
+        from .events import publish
+        from .ledger import record
+
+        now = timezone.now()
+        claimed = UserMissionProgress.objects.filter(
+            pk=self.pk, completed=False
+        ).update(completed=True, completed_at=now, updated_at=now)
+        if not claimed:
+            return False
+        self.completed, self.completed_at, self.updated_at = True, now, now
+
+        GamificationProfile.objects.filter(user_id=self.user_id).add_rewards(
+            xp=self.mission.xp_reward, points=self.mission.point_reward
+        )
+        record(self.user, [mission_entry(self.mission)])
+        publish("missions_completed", self.user_id, missions=[self.mission_id])
+        return True
 
     def __str__(self):
         return f"{self.user.first_name} – {self.mission.title} – {'true' if self.completed else 'false'}"
@@ -137,3 +288,118 @@ class UserBadge(models.Model):
 
     def __str__(self):
         return f"{self.user.first_name} – {self.badge.name}"
+
+
+class GamificationEvent(models.Model):
+    """
+    Outbox row for a gamification event that the
+    ``process_gamification_events`` worker has not handled yet.
+    """
+
+    kind = models.CharField(max_length=50)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Failed events are not retried before this.
+    available_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.kind} – {self.user_id}"
+
+
+class XPLedgerEntry(models.Model):
+    """
+    Append-only record of one XP and points change. ``XPRollup`` keeps the
+    sums per period as entries are written, so entries can be compacted away.
+    """
+
+    MISSION = "mission"
+    BENEFIT = "benefit"
+    REASON_CHOICES = [
+        (MISSION, "Mission"),
+        (BENEFIT, "Benefit"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="xp_ledger"
+    )
+    xp = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    mission = models.ForeignKey(
+        Mission, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    benefit = models.ForeignKey(
+        PlatformBenefit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="xp_ledger_user_idx"),
+            # Rows arrive in time order, which a BRIN index covers in a few pages.
+            BrinIndex(fields=["created_at"], name="xp_ledger_created_brin"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} – {self.reason} ({self.xp} XP, {self.points})"
+
+
+def mission_entry(mission):
+    return XPLedgerEntry(
+        reason=XPLedgerEntry.MISSION,
+        mission=mission,
+        xp=mission.xp_reward,
+        points=mission.point_reward,
+    )
+
+
+class XPRollup(models.Model):
+    """XP and points a user gained in one week, month or season."""
+
+    WEEK = "week"
+    MONTH = "month"
+    SEASON = "season"
+    PERIOD_CHOICES = [
+        (WEEK, "Week"),
+        (MONTH, "Month"),
+        (SEASON, "Season"),
+    ]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="xp_rollups"
+    )
+    # The user's role, copied here so a board is one index range, no join.
+    role = models.CharField(max_length=20, null=True, blank=True)
+    xp = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "period_start", "user"], name="xp_rollup_unique"
+            )
+        ]
+        indexes = [
+            models.Index(
+                "period",
+                "period_start",
+                "role",
+                F("xp").desc(),
+                "user",
+                name="xp_rollup_board_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} – {self.period} {self.period_start} ({self.xp} XP)"
@@ -13,6 +13,7 @@ from gamification.models import (
     UserBenefit,
     UserMissionProgress,
 )
+from users.fields import ProfilePictureVariantsField
 
 
 class GamificationProfileSerializer(serializers.ModelSerializer):
@@ -77,16 +78,28 @@ class LeaderboardEntrySerializer(serializers.ModelSerializer):
     xp = serializers.IntegerField(source="gamification_profile.xp")
     points = serializers.IntegerField(source="gamification_profile.points")
     profile_picture = serializers.ImageField(allow_null=True)
+    profile_picture_variants = ProfilePictureVariantsField()
+    rank = serializers.SerializerMethodField()
+    period_xp = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
+            "rank",
             "id",
             "username",
             "first_name",
             "last_name",
             "profile_picture",
+            "profile_picture_variants",
             "level",
             "xp",
             "points",
+            "period_xp",
         ]
+
+    def get_rank(self, obj):
+        return self.context.get("ranks", {}).get(obj.pk)
+
+    def get_period_xp(self, obj):
+        return self.context.get("period_xp", {}).get(obj.pk)
@@ -1,20 +1,24 @@
-from datetime import timedelta
-
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.utils import timezone
 
+from core.cache import invalidate_tags_on_commit
 from gamification.models import (
     Badge,
     GamificationProfile,
     Mission,
+    PlatformBenefit,
     UserBadge,
     UserMissionProgress,
+    XPRollup,
+    mission_entry,
 )
 from gigs.models import Application, Gig, GigSubmission, Review
+from gigs.signals import gigs_bulk_created
 
+from . import leaderboards, ledger
+from .events import handles, publish
 from .utils import notify_user_gamification
 
 
@@ -24,38 +28,77 @@ def create_gamification_profile(sender, instance, created, **kwargs):
         GamificationProfile.objects.get_or_create(user=instance)
 
 
-def award_mission(user, code, increment=1):
-    try:
-        mission = Mission.objects.get(code=code)
-    except Mission.DoesNotExist:
-        return
+@receiver(post_save, sender=GamificationProfile)
+def sync_leaderboard_profile(sender, instance, **kwargs):
+    leaderboards.on_commit(leaderboards.sync_user, instance.user_id)
 
-    now = timezone.now()
-    progress, _ = UserMissionProgress.objects.get_or_create(
-        user=user, mission=mission, defaults={"current_count": 0}
-    )
 
-    # Reset progress if needed based on type
-    if mission.type == "daily" and progress.updated_at.date() != now.date():
-        progress.current_count = 0
-    elif mission.type == "weekly":
-        start_of_week = now - timedelta(days=now.weekday())
-        if progress.updated_at < start_of_week:
-            progress.current_count = 0
-    elif mission.type == "monthly" and progress.updated_at.month != now.month:
-        progress.current_count = 0
-    elif mission.type == "yearly" and progress.updated_at.year != now.year:
-        progress.current_count = 0
-
-    if progress.completed:
-        return
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sync_leaderboard_role(sender, instance, created, update_fields, **kwargs):
+    # A new user is added along with their profile.
+    if not created and (update_fields is None or "role" in update_fields):
+        XPRollup.objects.filter(user=instance).exclude(role=instance.role).update(
+            role=instance.role
+        )
+        leaderboards.on_commit(leaderboards.sync_user, instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    leaderboards.on_commit(leaderboards.remove_user, instance.pk)
+
 
-    progress.current_count = (progress.current_count or 0) + increment
+def award_missions(user, codes, increment=1):
+    """
+    Advances ``user`` on every mission in ``codes`` for one event.
 
-    if progress.current_count >= (mission.goal_count or 1):
-        progress.complete()
-    else:
-        progress.save()
+    Missions are read with one query and the progress rows are incremented
+    with one upsert, which also tells which missions this call completed.
+    Only those are rewarded, in one profile update and one notification.
+    Returns the missions completed.
+    """
+    missions = list(Mission.objects.filter(code__in=codes))
+    completed = UserMissionProgress.objects.advance(user.pk, missions, increment)
+    if completed:
+        _reward_missions(user, completed)
+    return completed
+
+
+def _reward_missions(user, missions):
+    GamificationProfile.objects.filter(user=user).add_rewards(
+        xp=sum(mission.xp_reward for mission in missions),
+        points=sum(mission.point_reward for mission in missions),
+    )
+    ledger.record(user, [mission_entry(mission) for mission in missions])
+    _announce_missions(user, missions)
+
+
+def _announce_missions(user, missions):
+    notify_user_gamification(
+        user,
+        {
+            "type": "missions_completed",
+            "missions": [
+                {
+                    "title": mission.title,
+                    "xp": mission.xp_reward,
+                    "points": mission.point_reward,
+                }
+                for mission in missions
+            ],
+            "xp": sum(mission.xp_reward for mission in missions),
+            "points": sum(mission.point_reward for mission in missions),
+        },
+    )
+    total_completed = UserMissionProgress.objects.filter(
+        user=user, completed=True
+    ).count()
+    if total_completed >= 10:
+        award_badge(user, "mission_master")
+
+
+def award_mission(user, code, increment=1):
+    award_missions(user, [code], increment=increment)
 
 
 def award_badge(user, code):
@@ -77,85 +120,132 @@ def award_badge(user, code):
         )
 
 
+# The receivers below only queue an event; the rules run in the handlers
+# after it, from the process_gamification_events worker.
+
+
 @receiver(post_save, sender=Gig)
 def handle_gig_created(sender, instance, created, **kwargs):
-    if created and instance.client:
-        award_mission(instance.client, "submit_first_gig")
+    if created and instance.client_id:
+        publish("gigs_created", instance.client_id, count=1)
+
+
+@receiver(gigs_bulk_created, sender=Gig)
+def handle_gigs_bulk_created(sender, client, gigs, **kwargs):
+    if gigs:
+        publish("gigs_created", client.pk, count=len(gigs))
 
 
 @receiver(post_save, sender=Application)
 def handle_application_created(sender, instance, created, **kwargs):
     if created:
-        user = instance.applicant
-        award_mission(user, "first_application")
-        award_mission(user, "once_10_apps")
-        award_mission(user, "daily_apply")
-        award_mission(user, "weekly_5_apps")
-        award_mission(user, "monthly_apps")
-        award_mission(user, "yearly_100_apps")
-
-        count = Application.objects.filter(applicant=user).count()
-        if count == 1:
-            award_badge(user, "first_application")
-        if count >= 10:
-            award_badge(user, "application_spammer")
+        publish("application_created", instance.applicant_id)
 
 
 @receiver(post_save, sender=GigSubmission)
 def handle_submission_created(sender, instance, created, **kwargs):
-    if created:
-        freelancer = instance.gig.freelancer
-        award_mission(freelancer, "first_submission")
-        award_mission(freelancer, "once_5_submissions")
-        award_mission(freelancer, "weekly_submissions")
-        award_mission(freelancer, "monthly_submissions")
-        award_mission(freelancer, "yearly_50_submissions")
+    if created and instance.gig.freelancer_id:
+        publish("submission_created", instance.gig.freelancer_id)
 
 
 @receiver(post_save, sender=Review)
 def handle_review_created(sender, instance, created, **kwargs):
     if created:
-        client = instance.gig.client
-        freelancer = instance.gig.freelancer
+        publish("review_written", instance.gig.client_id)
+        if instance.gig.freelancer_id:
+            publish("review_received", instance.gig.freelancer_id)
+
+
+@handles("gigs_created")
+def on_gigs_created(user, count):
+    award_mission(user, "submit_first_gig", increment=count)
+
+
+@handles("application_created")
+def on_application_created(user):
+    award_missions(
+        user,
+        [
+            "first_application",
+            "once_10_apps",
+            "daily_apply",
+            "weekly_5_apps",
+            "monthly_apps",
+            "yearly_100_apps",
+        ],
+    )
 
-        award_mission(client, "write_first_review")
-        award_mission(client, "write_5_reviews")
-        award_mission(client, "daily_review")
-        award_mission(client, "monthly_reviews")
+    count = Application.objects.filter(applicant=user).count()
+    if count == 1:
+        award_badge(user, "first_application")
+    if count >= 10:
+        award_badge(user, "application_spammer")
+
+
+@handles("submission_created")
+def on_submission_created(user):
+    award_missions(
+        user,
+        [
+            "first_submission",
+            "once_5_submissions",
+            "weekly_submissions",
+            "monthly_submissions",
+            "yearly_50_submissions",
+        ],
+    )
 
-        review_count = Review.objects.filter(gig__client=client).count()
-        if review_count >= 5:
-            award_badge(client, "reviewer")
 
-        award_mission(freelancer, "receive_review")
+@handles("review_written")
+def on_review_written(user):
+    award_missions(
+        user,
+        ["write_first_review", "write_5_reviews", "daily_review", "monthly_reviews"],
+    )
 
-        finished = Gig.objects.filter(freelancer=freelancer, status="completed").count()
-        if finished >= 1:
-            award_badge(freelancer, "first_finish")
-        if finished >= 10:
-            award_badge(freelancer, "veteran")
+    review_count = Review.objects.filter(gig__client=user).count()
+    if review_count >= 5:
+        award_badge(user, "reviewer")
 
 
-@receiver(post_save, sender=UserMissionProgress)
-def handle_mission_completion(sender, instance, created, **kwargs):
-    if instance.completed and not instance.seen:
-        notify_user_gamification(
-            instance.user,
-            {
-                "type": "mission_completed",
-                "title": instance.mission.title,
-                "xp": instance.mission.xp_reward,
-                "points": instance.mission.point_reward,
-            },
-        )
+@handles("review_received")
+def on_review_received(user):
+    award_mission(user, "receive_review")
+
+    finished = Gig.objects.filter(freelancer=user, status="completed").count()
+    if finished >= 1:
+        award_badge(user, "first_finish")
+    if finished >= 10:
+        award_badge(user, "veteran")
+
 
-        total_completed = UserMissionProgress.objects.filter(
-            user=instance.user, completed=True
-        ).count()
-        if total_completed >= 10:
-            award_badge(instance.user, "mission_master")
+@handles("chat_message_sent")
+def on_chat_message_sent(user):
+    award_mission(user, "daily_chat")
+
+
+@handles("missions_completed")
+def on_missions_completed(user, missions):
+    _announce_missions(user, list(Mission.objects.filter(pk__in=missions)))
+
+
+@handles("logged_in")
+def on_logged_in(user):
+    award_mission(user, "daily_login")
 
 
 @receiver(user_logged_in)
 def handle_user_login(sender, request, user, **kwargs):
-    award_mission(user, "daily_login")
+    publish("logged_in", user.pk)
+
+
+@receiver(post_save, sender=Mission)
+@receiver(post_delete, sender=Mission)
+def invalidate_mission_responses(sender, **kwargs):
+    invalidate_tags_on_commit("missions")
+
+
+@receiver(post_save, sender=PlatformBenefit)
+@receiver(post_delete, sender=PlatformBenefit)
+def invalidate_platform_benefit_responses(sender, **kwargs):
+    invalidate_tags_on_commit("platform_benefits")
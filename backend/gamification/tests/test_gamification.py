@@ -1,8 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.utils import timezone
+from rest_framework.test import APIClient
 
-from gamification.models import Badge, Mission, UserBadge, UserMissionProgress
+from gamification.models import (
+    Badge,
+    GamificationProfile,
+    Mission,
+    UserBadge,
+    UserMissionProgress,
+    XPLedgerEntry,
+    level_for_total_xp,
+)
 
 User = get_user_model()
 
@@ -28,6 +41,71 @@ def test_xp_level_up():
     assert profile.xp == 150
 
 
+def test_level_for_total_xp_matches_the_curve():
+    level, total = 1, 0
+    for xp in range(20000):
+        if xp - total >= 100 * 2 ** (level - 1):
+            total += 100 * 2 ** (level - 1)
+            level += 1
+        assert level_for_total_xp(xp) == level
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_rewards_are_not_lost():
+    from gamification.signals import award_missions
+
+    user = User.objects.create_user(email="u9@example.com", password="pass")
+    profile = user.gamification_profile
+    mission = Mission.objects.create(
+        title="Race", description="", xp_reward=7, point_reward=3, code="race"
+    )
+    progress = UserMissionProgress.objects.create(user=user, mission=mission)
+    goal = Mission.objects.create(
+        title="Race goal",
+        description="",
+        xp_reward=11,
+        point_reward=5,
+        code="race_goal",
+        goal_count=50,
+    )
+    tally = Mission.objects.create(
+        title="Race tally",
+        description="",
+        xp_reward=1,
+        code="race_tally",
+        goal_count=1000,
+    )
+
+    def award(_):
+        try:
+            GamificationProfile.objects.get(pk=profile.pk).add_rewards(xp=30, points=1)
+            completed = award_missions(
+                User.objects.get(pk=user.pk), ["race_goal", "race_tally"]
+            )
+            return (
+                UserMissionProgress.objects.get(pk=progress.pk).complete(),
+                [mission.code for mission in completed],
+            )
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(award, range(200)))
+
+    assert [completed for completed, _ in results].count(True) == 1
+    assert [codes for _, codes in results].count(["race_goal"]) == 1
+    assert UserMissionProgress.objects.get(user=user, mission=goal).current_count == 50
+    assert (
+        UserMissionProgress.objects.get(user=user, mission=tally).current_count == 200
+    )
+    assert XPLedgerEntry.objects.filter(user=user, mission=goal).count() == 1
+    profile.refresh_from_db()
+    total = 200 * 30 + 7 + 11
+    assert profile.total_xp == total
+    assert profile.level == level_for_total_xp(total)
+    assert profile.points == 200 + 3 + 5
+
+
 @pytest.mark.django_db
 def test_points_add_and_spend():
     user = User.objects.create_user(email="u2@example.com", password="pass")
@@ -86,3 +164,318 @@ def test_badge_award_and_uniqueness():
 
     with pytest.raises(Exception):
         UserBadge.objects.create(user=user, badge=badge)
+
+
+@pytest.mark.django_db
+def test_mission_list_is_cached_until_missions_change(
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    user = User.objects.create_user(email="u5@example.com", password="pass")
+    client = APIClient()
+    client.force_authenticate(user)
+    mission = Mission.objects.create(
+        title="Cached mission",
+        description="Desc",
+        xp_reward=50,
+        point_reward=20,
+        code="cached_mission",
+        goal_count=1,
+    )
+    assert len(client.get("/api/gamification/missions/").data) == 1
+
+    with django_assert_num_queries(0):
+        client.get("/api/gamification/missions/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mission.is_active = False
+        mission.save()
+    assert client.get("/api/gamification/missions/").data == []
+
+
+@pytest.mark.django_db
+def test_award_missions_batches_progress_and_rewards(
+    django_assert_num_queries, monkeypatch
+):
+    from gamification import signals
+
+    events = []
+    monkeypatch.setattr(
+        signals, "notify_user_gamification", lambda user, event: events.append(event)
+    )
+    user = User.objects.create_user(email="u6@example.com", password="pass")
+    for code, xp, points, goal in [
+        ("batch_one", 50, 10, 1),
+        ("batch_two", 60, 5, 1),
+        ("batch_three", 30, 30, 2),
+    ]:
+        Mission.objects.create(
+            title=code,
+            description="Desc",
+            xp_reward=xp,
+            point_reward=points,
+            code=code,
+            goal_count=goal,
+        )
+    codes = ["batch_one", "batch_two", "batch_three", "missing"]
+
+    # Missions, progress upsert, profile update, ledger insert, rollup insert
+    # and update, mission_master count.
+    with django_assert_num_queries(7):
+        completed = signals.award_missions(user, codes)
+    assert {mission.code for mission in completed} == {"batch_one", "batch_two"}
+    assert len(events) == 1
+    assert events[0]["type"] == "missions_completed"
+    assert (events[0]["xp"], events[0]["points"]) == (110, 15)
+
+    profile = user.gamification_profile
+    profile.refresh_from_db()
+    assert (profile.level, profile.xp, profile.points) == (2, 10, 15)
+
+    signals.award_missions(user, codes)
+    progress = UserMissionProgress.objects.get(user=user, mission__code="batch_three")
+    assert progress.completed and progress.current_count == 2
+    assert len(events) == 2
+
+    with django_assert_num_queries(2):
+        assert signals.award_missions(user, codes) == []
+
+    # A repeating mission starts over once its period has passed.
+    daily = Mission.objects.create(
+        title="daily",
+        description="Desc",
+        xp_reward=5,
+        code="batch_daily",
+        goal_count=2,
+        type=Mission.DAILY,
+    )
+    signals.award_missions(user, ["batch_daily"])
+    UserMissionProgress.objects.filter(mission=daily).update(
+        updated_at=timezone.now() - timedelta(days=2)
+    )
+    assert signals.award_missions(user, ["batch_daily"]) == []
+    assert UserMissionProgress.objects.get(mission=daily).current_count == 1
+    assert [m.code for m in signals.award_missions(user, ["batch_daily"])] == [
+        "batch_daily"
+    ]
+
+
+@pytest.mark.django_db
+def test_events_are_queued_on_commit_and_processed_by_worker(
+    settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    from gamification import utils
+    from gamification.events import HANDLERS, MAX_ATTEMPTS, process_events
+    from gamification.models import GamificationEvent
+    from gigs.models import Application, Gig
+
+    settings.GAMIFICATION_EVENTS_BACKEND = "outbox"
+    sent = []
+    monkeypatch.setattr(utils, "_send", lambda user_id, event: sent.append(event))
+    client = User.objects.create_user(
+        email="u7@example.com", password="pass", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="u8@example.com", password="pass", role="freelancer"
+    )
+    Mission.objects.create(
+        title="Apply",
+        description="Desc",
+        xp_reward=10,
+        point_reward=5,
+        code="first_application",
+        goal_count=1,
+    )
+    gig = Gig.objects.create(client=client, title="Gig", description="d", price=10)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Application.objects.create(gig=gig, applicant=freelancer)
+        assert not GamificationEvent.objects.exists()
+    assert not UserMissionProgress.objects.exists()
+    assert set(GamificationEvent.objects.values_list("kind", flat=True)) == {
+        "application_created"
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert process_events() == 1
+    assert not GamificationEvent.objects.exists()
+    assert UserMissionProgress.objects.get(user=freelancer).completed
+    assert [event["type"] for event in sent] == ["missions_completed"]
+
+    def broken(user):
+        utils.notify_user_gamification(user, {"type": "never_sent"})
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(HANDLERS, "broken", broken)
+    event = GamificationEvent.objects.create(kind="broken", user=freelancer)
+    delays = []
+    for _ in range(MAX_ATTEMPTS):
+        with django_capture_on_commit_callbacks(execute=True):
+            assert process_events() == 1
+        # Not retried until the backoff has passed.
+        assert process_events() == 0
+        event.refresh_from_db()
+        delays.append(event.available_at - timezone.now())
+        GamificationEvent.objects.filter(pk=event.pk).update(
+            available_at=timezone.now()
+        )
+    assert process_events() == 0
+    assert all(later > earlier for earlier, later in zip(delays, delays[1:]))
+    event.refresh_from_db()
+    assert event.attempts == MAX_ATTEMPTS
+    assert "boom" in event.last_error
+    assert [event["type"] for event in sent] == ["missions_completed"]
+
+
+@pytest.mark.django_db
+def test_leaderboard_ranks_from_redis(
+    django_assert_num_queries, django_capture_on_commit_callbacks, monkeypatch, settings
+):
+    from gamification import leaderboards
+
+    with django_capture_on_commit_callbacks(execute=True):
+        freelancers = [
+            User.objects.create_user(
+                email=f"board{i}@example.com", password="pass", role="freelancer"
+            )
+            for i in range(5)
+        ]
+        for i, user in enumerate(freelancers):
+            user.gamification_profile.add_xp(100 * i + 50)
+    api = APIClient()
+
+    with django_assert_num_queries(1):
+        res = api.get("/api/gamification/leaderboard/freelancers/?limit=3")
+    assert res.data["count"] == 5
+    assert res.data["me"] is None
+    assert [entry["rank"] for entry in res.data["results"]] == [1, 2, 3]
+    assert [entry["id"] for entry in res.data["results"]] == [
+        user.pk for user in freelancers[:1:-1]
+    ]
+
+    api.force_authenticate(freelancers[2])
+    res = api.get("/api/gamification/leaderboard/freelancers/?limit=1")
+    assert res.data["me"] == {"rank": 3, "total_xp": 250}
+    res = api.get("/api/gamification/leaderboard/freelancers/around/?radius=1")
+    assert res.data["rank"] == 3
+    assert [entry["id"] for entry in res.data["results"]] == [
+        user.pk for user in freelancers[3:0:-1]
+    ]
+    assert (
+        api.get("/api/gamification/leaderboard/clients/around/").data["results"] == []
+    )
+
+    # With Redis unreachable the same boards are read from Postgres.
+    with monkeypatch.context() as patch:
+        patch.setattr(leaderboards, "_client", None)
+        patch.setattr(settings, "REDIS_URL", "redis://localhost:1")
+        res = api.get("/api/gamification/leaderboard/freelancers/?limit=1")
+        assert res.data["count"] == 5
+        assert res.data["me"] == {"rank": 3, "total_xp": 250}
+        assert res.data["results"][0]["id"] == freelancers[4].pk
+        res = api.get("/api/gamification/leaderboard/freelancers/around/?radius=1")
+        assert res.data["rank"] == 3
+        assert [entry["id"] for entry in res.data["results"]] == [
+            user.pk for user in freelancers[3:0:-1]
+        ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        freelancers[4].role = "client"
+        freelancers[4].save()
+    assert leaderboards.rank_of("client", freelancers[4].pk) == (1, 450)
+    assert leaderboards.count("freelancer") == 4
+
+    leaderboards.get_client().delete(leaderboards.board_key("freelancer"))
+    assert leaderboards.rebuild() == {"freelancer": 4, "client": 1}
+    assert leaderboards.rank_of("freelancer", freelancers[2].pk) == (2, 250)
+
+
+@pytest.mark.django_db
+def test_xp_ledger_rollups_and_compaction(django_capture_on_commit_callbacks):
+    from datetime import date, datetime, timedelta
+
+    from gamification import ledger
+    from gamification.models import PlatformBenefit, XPLedgerEntry, XPRollup
+
+    leader, other = (
+        User.objects.create_user(
+            email=f"ledger{i}@example.com", password="pass", role="freelancer"
+        )
+        for i in range(2)
+    )
+    mission = Mission.objects.create(
+        title="Ledger", description="", xp_reward=40, point_reward=15, code="ledger"
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        for user in (leader, other):
+            UserMissionProgress.objects.create(user=user, mission=mission).complete()
+    bonus = Mission.objects.create(
+        title="Bonus", description="", xp_reward=20, code="ledger_bonus"
+    )
+    UserMissionProgress.objects.create(user=leader, mission=bonus).complete()
+
+    benefit = PlatformBenefit.objects.create(name="Perk", cost=10, effect_code="perk")
+    client = APIClient()
+    client.force_authenticate(User.objects.get(pk=leader.pk))
+    assert (
+        client.post(
+            f"/api/gamification/platform-benefits/{benefit.pk}/buy/"
+        ).status_code
+        == 200
+    )
+
+    assert list(
+        XPLedgerEntry.objects.filter(user=leader)
+        .order_by("pk")
+        .values_list("reason", "xp", "points")
+    ) == [("mission", 40, 15), ("mission", 20, 0), ("benefit", 0, -10)]
+    starts = ledger.period_starts(timezone.now())
+    rollups = XPRollup.objects.filter(user=leader)
+    assert rollups.count() == 3
+    assert {
+        (rollup.period, rollup.period_start, rollup.xp, rollup.points)
+        for rollup in rollups
+    } == {(period, start, 60, 5) for period, start in starts.items()}
+
+    res = client.get("/api/gamification/leaderboard/freelancers/?period=week")
+    assert res.data["count"] == 2
+    assert res.data["me"] == {"rank": 1, "xp": 60}
+    assert [entry["period_xp"] for entry in res.data["results"]] == [60, 40]
+    assert (
+        client.get(
+            "/api/gamification/leaderboard/freelancers/?period=decade"
+        ).status_code
+        == 400
+    )
+
+    # The rollups follow a role change onto the other board.
+    with django_capture_on_commit_callbacks(execute=True):
+        other.role = "client"
+        other.save()
+    assert set(XPRollup.objects.filter(user=other).values_list("role", flat=True)) == {
+        "client"
+    }
+    res = client.get("/api/gamification/leaderboard/clients/?period=season")
+    assert [entry["id"] for entry in res.data["results"]] == [other.pk]
+    assert (
+        client.get("/api/gamification/leaderboard/freelancers/?period=week").data[
+            "count"
+        ]
+        == 1
+    )
+
+    assert ledger.period_starts(timezone.make_aware(datetime(2026, 8, 19, 12))) == {
+        "week": date(2026, 8, 17),
+        "month": date(2026, 8, 1),
+        "season": date(2026, 7, 1),
+    }
+    assert ledger.compaction_cutoff(
+        2, now=timezone.make_aware(datetime(2026, 2, 1, 12))
+    ) == date(2025, 7, 1)
+
+    XPLedgerEntry.objects.filter(user=other).update(
+        created_at=timezone.now() - timedelta(days=400)
+    )
+    assert ledger.compact(keep_seasons=1, batch_size=1) == 1
+    assert not XPLedgerEntry.objects.filter(user=other).exists()
+    assert XPLedgerEntry.objects.filter(user=leader).count() == 3
+    assert XPRollup.objects.filter(user=other, xp=40).count() == 3
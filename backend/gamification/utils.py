@@ -1,11 +1,22 @@
+from functools import partial
+
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import transaction
 
 
 def notify_user_gamification(user, payload: dict):
+    """
+    Pushes ``payload`` to the user's sockets once the transaction commits,
+    so an award that gets rolled back is never announced.
+    """
+    transaction.on_commit(partial(_send, user.pk, payload), robust=True)
+
+
+def _send(user_id, payload):
     channel_layer = get_channel_layer()
     async_to_sync(channel_layer.group_send)(
-        f"user_{user.pk}",
+        f"user_{user_id}",
         {
             "type": "gamification_event",
             "event": payload,
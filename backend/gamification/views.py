@@ -1,14 +1,20 @@
 from typing import Any
 
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import QuerySet
+from django.db import models, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.response import Response
 
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin, collection_version
+
 User = get_user_model()
 
+from gamification import leaderboards, ledger
 from gamification.models import (
     Badge,
     Mission,
@@ -16,6 +22,8 @@ from gamification.models import (
     UserBadge,
     UserBenefit,
     UserMissionProgress,
+    XPLedgerEntry,
+    XPRollup,
 )
 from gamification.serializers import (
     BadgeSerializer,
@@ -28,13 +36,14 @@ from gamification.serializers import (
 )
 
 
-class MissionViewSet(viewsets.ReadOnlyModelViewSet):
+class MissionViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Mission.objects.filter(is_active=True)
     serializer_class = MissionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_tags = ("missions",)
 
 
-class UserMissionProgressViewSet(viewsets.ModelViewSet):
+class UserMissionProgressViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = UserMissionProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -63,8 +72,7 @@ class UserMissionProgressViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
         progress = self.get_object()
-        if not progress.completed:
-            progress.complete()
+        if progress.complete():
             return Response(
                 {
                     "completed": True,
@@ -84,8 +92,10 @@ class UserMissionProgressViewSet(viewsets.ModelViewSet):
         recent = UserMissionProgress.objects.filter(
             user=request.user, completed=True, seen=False
         ).select_related("mission")
-        serializer = self.get_serializer(recent, many=True)
-        return Response(serializer.data)
+        return self.conditional(
+            collection_version(recent),
+            lambda: Response(self.get_serializer(recent, many=True).data),
+        )
 
 
 class BadgeViewSet(viewsets.ReadOnlyModelViewSet):
@@ -136,10 +146,11 @@ class UserBenefitViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
-class PlatformBenefitViewSet(viewsets.ReadOnlyModelViewSet):
+class PlatformBenefitViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PlatformBenefit.objects.all()
     serializer_class = PlatformBenefitSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_tags = ("platform_benefits",)
 
     @action(detail=True, methods=["post"])
     def buy(self, request, pk=None):
@@ -157,9 +168,21 @@ class PlatformBenefitViewSet(viewsets.ReadOnlyModelViewSet):
                 {"detail": "Nepakanka taškų."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        success = profile.spend_points(benefit.cost)
+        with transaction.atomic():
+            success = profile.spend_points(benefit.cost)
+            if success:
+                UserBenefit.objects.create(user=user, benefit=benefit)
+                ledger.record(
+                    user,
+                    [
+                        XPLedgerEntry(
+                            reason=XPLedgerEntry.BENEFIT,
+                            benefit=benefit,
+                            points=-benefit.cost,
+                        )
+                    ],
+                )
         if success:
-            UserBenefit.objects.create(user=user, benefit=benefit)
             return Response({"detail": "Nauda įsigyta!"})
         return Response(
             {"detail": "Nepavyko nusipirkti naudos."},
@@ -167,25 +190,120 @@ class PlatformBenefitViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
+def _bounded_param(request, name, default, maximum):
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, maximum))
+
+
 class LeaderboardViewSet(viewsets.ViewSet):
+    """
+    Role leaderboards served from the Redis sorted sets in
+    ``gamification.leaderboards``; only the users shown are read from
+    Postgres.
+    """
+
     permission_classes = [permissions.AllowAny]
 
+    def _entries(self, ranked):
+        ids = [user_id for user_id, _, _ in ranked]
+        users = User.objects.select_related("gamification_profile").in_bulk(ids)
+        ranks = {user_id: rank for user_id, rank, _ in ranked}
+        return LeaderboardEntrySerializer(
+            [users[user_id] for user_id in ids if user_id in users],
+            many=True,
+            context={"ranks": ranks},
+        ).data
+
+    def _period_board(self, request, role, period, limit):
+        """The board for the current ``period``, read from ``XPRollup``."""
+        start = ledger.period_starts(timezone.now())[period]
+        rollups = XPRollup.objects.filter(period=period, period_start=start, role=role)
+        top = list(
+            rollups.select_related("user__gamification_profile").order_by(
+                "-xp", "user_id"
+            )[:limit]
+        )
+        me = None
+        if request.user.is_authenticated:
+            mine = rollups.filter(user=request.user).values_list("xp", flat=True)
+            if mine:
+                ahead = rollups.filter(
+                    Q(xp__gt=mine[0]) | Q(xp=mine[0], user_id__lt=request.user.pk)
+                ).count()
+                me = {"rank": ahead + 1, "xp": mine[0]}
+        return Response(
+            {
+                "count": rollups.count(),
+                "period_start": start,
+                "me": me,
+                "results": LeaderboardEntrySerializer(
+                    [rollup.user for rollup in top],
+                    many=True,
+                    context={
+                        "ranks": {
+                            rollup.user_id: rank
+                            for rank, rollup in enumerate(top, start=1)
+                        },
+                        "period_xp": {rollup.user_id: rollup.xp for rollup in top},
+                    },
+                ).data,
+            }
+        )
+
+    def _board(self, request, role):
+        limit = _bounded_param(request, "limit", 50, 100)
+        period = request.query_params.get("period")
+        if period is not None:
+            if period not in dict(XPRollup.PERIOD_CHOICES):
+                return Response(
+                    {"detail": "Netinkamas laikotarpis."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return self._period_board(request, role, period, limit)
+        me = None
+        if request.user.is_authenticated:
+            ranked = leaderboards.rank_of(role, request.user.pk)
+            if ranked is not None:
+                me = {"rank": ranked[0], "total_xp": ranked[1]}
+        return Response(
+            {
+                "count": leaderboards.count(role),
+                "me": me,
+                "results": self._entries(leaderboards.top(role, limit)),
+            }
+        )
+
+    def _around(self, request, role):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        radius = _bounded_param(request, "radius", 5, 25)
+        window = leaderboards.around(role, request.user.pk, radius)
+        rank = next(
+            (rank for user_id, rank, _ in window if user_id == request.user.pk), None
+        )
+        return Response(
+            {
+                "count": leaderboards.count(role),
+                "rank": rank,
+                "results": self._entries(window),
+            }
+        )
+
     @action(detail=False, methods=["get"])
     def freelancers(self, request):
-        freelancers = (
-            User.objects.filter(role="freelancer")
-            .select_related("gamification_profile")
-            .order_by("-gamification_profile__xp", "-gamification_profile__level")
-        )
-        serializer = LeaderboardEntrySerializer(freelancers, many=True)
-        return Response(serializer.data)
+        return self._board(request, "freelancer")
 
     @action(detail=False, methods=["get"])
     def clients(self, request):
-        clients = (
-            User.objects.filter(role="client")
-            .select_related("gamification_profile")
-            .order_by("-gamification_profile__xp", "-gamification_profile__level")
-        )
-        serializer = LeaderboardEntrySerializer(clients, many=True)
-        return Response(serializer.data)
+        return self._board(request, "client")
+
+    @action(detail=False, methods=["get"], url_path="freelancers/around")
+    def freelancers_around(self, request):
+        return self._around(request, "freelancer")
+
+    @action(detail=False, methods=["get"], url_path="clients/around")
+    def clients_around(self, request):
+        return self._around(request, "client")
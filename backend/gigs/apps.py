@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GigsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "gigs"
+
+    def ready(self):
+        import gigs.signals
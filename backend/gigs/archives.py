@@ -0,0 +1,100 @@
+import json
+import os
+import zipfile
+
+from django.utils import timezone
+
+# Bytes read from storage per write into the archive.
+READ_SIZE = 64 * 1024
+
+
+class _Sink:
+    """
+    Write-only stream that keeps what ZipFile wrote until it is drained.
+
+    Having no ``tell``/``seek`` makes ZipFile write each entry's sizes in a
+    data descriptor after its data instead of seeking back to the header.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Returns what was written since the last call, as zero or one chunk."""
+        if not self._chunks:
+            return []
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return [data]
+
+
+def _entry_name(index, filename, used):
+    stem, extension = os.path.splitext(filename)
+    name = f"{index:03d}_{filename}"
+    suffix = 1
+    while name in used:
+        suffix += 1
+        name = f"{index:03d}_{stem}_{suffix}{extension}"
+    used.add(name)
+    return name
+
+
+def _zip_info(name, moment, size):
+    local = timezone.localtime(moment) if timezone.is_aware(moment) else moment
+    info = zipfile.ZipInfo(name, date_time=local.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    # Lets ZipFile switch to ZIP64 up front for files over 4 GiB.
+    info.file_size = size
+    return info
+
+
+def stream_submissions_zip(gig, submissions):
+    """
+    Yields a ZIP of ``submissions``' files plus a ``manifest.json`` with the
+    messages and timestamps, holding at most one read's worth of data.
+    """
+    sink = _Sink()
+    manifest = []
+    used = {"manifest.json"}
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, submission in enumerate(submissions, start=1):
+            entry = {
+                "file": None,
+                "original_name": submission.original_name,
+                "message": submission.message,
+                "submitted_at": submission.submitted_at.isoformat(),
+                "user": submission.user_id,
+            }
+            manifest.append(entry)
+            if not submission.file:
+                continue
+            filename = submission.original_name or os.path.basename(
+                submission.file.name
+            )
+            entry["file"] = _entry_name(index, filename, used)
+            info = _zip_info(
+                entry["file"], submission.submitted_at, submission.file.size
+            )
+            with submission.file.open("rb") as source, archive.open(
+                info, mode="w"
+            ) as target:
+                while data := source.read(READ_SIZE):
+                    target.write(data)
+                    yield from sink.drain()
+            yield from sink.drain()
+
+        payload = json.dumps(
+            {"gig": gig.pk, "title": gig.title, "submissions": manifest},
+            ensure_ascii=False,
+            indent=2,
+        ).encode()
+        info = _zip_info("manifest.json", timezone.now(), len(payload))
+        archive.writestr(info, payload)
+    yield from sink.drain()
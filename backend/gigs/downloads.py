@@ -0,0 +1,171 @@
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+
+from .storage import BLOB_DIR
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOB_NAME_RE = re.compile(
+    rf"^{BLOB_DIR}/(?P<a>[0-9a-f]{{2}})/(?P<b>[0-9a-f]{{2}})/"
+    r"(?P<digest>(?P=a)(?P=b)[0-9a-f]{60})(\.[^./]*)?$"
+)
+_DONE = object()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Returns the ``(start, end)`` byte offsets, end inclusive, that a
+    single-range ``Range`` header asks for, or ``None`` to send everything.
+
+    Multiple ranges are answered with the whole file, which RFC 9110 allows,
+    and so are malformed ones. ``RangeNotSatisfiable`` is only raised for a
+    well-formed range that lies outside the file.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        if not int(last):
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, end
+
+
+class RangeFile:
+    """A read-only window of ``length`` bytes of ``file`` from ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class ThreadedIterationMixin:
+    """
+    Under ASGI Django reads a synchronous ``streaming_content`` into a list
+    before sending any of it. This pulls one chunk at a time in a worker
+    thread instead, so memory stays at a chunk whichever server runs us.
+    """
+
+    async def __aiter__(self):
+        parts = iter(self.streaming_content)
+        pull = sync_to_async(next, thread_sensitive=False)
+        while (part := await pull(parts, _DONE)) is not _DONE:
+            yield part
+
+
+class ThreadedStreamingHttpResponse(ThreadedIterationMixin, StreamingHttpResponse):
+    pass
+
+
+class ThreadedFileResponse(ThreadedIterationMixin, FileResponse):
+    pass
+
+
+def file_etag(field_file):
+    """
+    A strong ETag for content-addressed blobs, whose names are the SHA-256
+    of their content. Any other file gets a weak one from its size and
+    mtime, or ``None`` when the storage cannot tell.
+    """
+    match = BLOB_NAME_RE.match(field_file.name)
+    if match is not None:
+        return '"{}"'.format(match["digest"])
+    try:
+        stat = os.stat(field_file.path)
+    except (NotImplementedError, OSError):
+        return None
+    return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def serve_file(request, field_file, filename, as_attachment=False):
+    """
+    Answers with ``field_file`` once the caller has checked access.
+
+    With ``PROTECTED_MEDIA_HEADER`` set the body is left to the front proxy,
+    which also handles ``Range``. Otherwise the file is streamed from here,
+    honouring a single ``Range``, which is only meant for development.
+    """
+    etag = file_etag(field_file)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    header = settings.PROTECTED_MEDIA_HEADER
+    if header:
+        response = HttpResponse()
+        if header.lower() == "x-sendfile":
+            response[header] = field_file.path
+        else:
+            response[header] = settings.PROTECTED_MEDIA_PREFIX + quote(field_file.name)
+        # Left empty, nginx and Apache fill the type in from the file.
+        del response["Content-Type"]
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, filename
+        )
+        if etag:
+            response["ETag"] = etag
+        return response
+
+    size = field_file.size
+    try:
+        byte_range = None
+        if_range = request.headers.get("If-Range")
+        # If-Range needs a strong comparison, so a weak ETag never matches.
+        if if_range is None or (
+            etag and not etag.startswith("W/") and if_range == etag
+        ):
+            byte_range = parse_range(request.headers.get("Range"), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = field_file.open("rb")
+    if byte_range is None:
+        response = ThreadedFileResponse(
+            file, as_attachment=as_attachment, filename=filename
+        )
+    else:
+        start, end = byte_range
+        response = ThreadedFileResponse(
+            RangeFile(file, start, end - start + 1),
+            status=206,
+            as_attachment=as_attachment,
+            filename=filename,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+    response["Accept-Ranges"] = "bytes"
+    if etag:
+        response["ETag"] = etag
+    return response
@@ -1,6 +1,20 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
 from django_filters import rest_framework as filters
 
-from .models import Gig, Review
+from .models import SEARCH_CONFIG, Application, Gig, Review
+
+# Half-open ``[low, high)`` price ranges shown in the gig browser.
+PRICE_BUCKETS = [(0, 50), (50, 100), (100, 250), (250, 500), (500, 1000), (1000, None)]
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+class ChoiceInFilter(filters.BaseInFilter, filters.ChoiceFilter):
+    pass
 
 
 class GigFilter(filters.FilterSet):
@@ -10,11 +24,45 @@ class GigFilter(filters.FilterSet):
     max_price = filters.NumberFilter(
         field_name="price", lookup_expr="lte", method="filter_max_price"
     )
-    skill_ids = filters.BaseInFilter(field_name="skills__id", lookup_expr="in")
+    skill_ids = NumberInFilter(method="filter_skill_ids")
+    skill_match = filters.ChoiceFilter(
+        choices=[("any", "any"), ("all", "all")], method="filter_skill_match"
+    )
+    q = filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Gig
-        fields = ["status", "client", "freelancer", "skill_ids"]
+        fields = ["status", "client", "freelancer", "skill_ids", "skill_match", "q"]
+
+    def filter_skill_ids(self, queryset, name, value):
+        # Array operators on the GIN-indexed copy of the skill ids: one row
+        # per gig, whichever of the skills it has.
+        ids = [int(skill_id) for skill_id in value]
+        if not ids:
+            return queryset
+        if self.form.cleaned_data.get("skill_match") == "all":
+            return queryset.filter(skill_id_array__contains=ids)
+        return queryset.filter(skill_id_array__overlap=ids)
+
+    def filter_skill_match(self, queryset, name, value):
+        # Read by ``filter_skill_ids``.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        query = SearchQuery(value, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            # float8 so the rank survives a round trip through the page cursor
+            search_rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+            search_headline=SearchHeadline(
+                "description",
+                query,
+                config=SEARCH_CONFIG,
+                start_sel="<mark>",
+                stop_sel="</mark>",
+                max_words=30,
+                min_words=10,
+            ),
+        )
 
     def filter_min_price(self, queryset, name, value):
         if value not in [None, ""]:
@@ -27,6 +75,68 @@ class GigFilter(filters.FilterSet):
         return queryset
 
 
+def gig_facets(queryset):
+    """
+    Counts the gigs in ``queryset`` by status, price bucket and skill.
+
+    Status and price counts are ``COUNT(...) FILTER (WHERE ...)`` columns of
+    one aggregate over the gigs. Skill counts come from a second query that
+    groups the skill through table by skill, restricted to the same gigs, so
+    neither query grows with the size of the skill catalogue.
+    """
+    gig_ids = queryset.values("pk")
+    aggregates = {"total": Count("id")}
+    for value, _ in Gig.STATUS_CHOICES:
+        aggregates[f"status_{value}"] = Count("id", filter=Q(status=value))
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        condition = Q(price__gte=low)
+        if high is not None:
+            condition &= Q(price__lt=high)
+        aggregates[f"price_{index}"] = Count("id", filter=condition)
+    counts = Gig.objects.filter(pk__in=gig_ids).aggregate(**aggregates)
+
+    skills = (
+        Gig.skills.through.objects.filter(gig_id__in=gig_ids)
+        .values("skill_id", "skill__name")
+        .annotate(count=Count("gig_id"))
+        .order_by("-count", "skill__name")
+    )
+    return {
+        "total": counts["total"],
+        "status": [
+            {"value": value, "label": label, "count": counts[f"status_{value}"]}
+            for value, label in Gig.STATUS_CHOICES
+        ],
+        "price": [
+            {"min": low, "max": high, "count": counts[f"price_{index}"]}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        "skills": [
+            {"id": row["skill_id"], "name": row["skill__name"], "count": row["count"]}
+            for row in skills
+        ],
+    }
+
+
+class MyGigFilter(filters.FilterSet):
+    """``?status=in_progress,pending`` on the caller's own gigs."""
+
+    status = ChoiceInFilter(choices=Gig.STATUS_CHOICES)
+
+    class Meta:
+        model = Gig
+        fields = ["status"]
+
+
+class MyApplicationFilter(filters.FilterSet):
+    status = ChoiceInFilter(choices=Application.STATUS_CHOICES)
+    gig_status = ChoiceInFilter(field_name="gig__status", choices=Gig.STATUS_CHOICES)
+
+    class Meta:
+        model = Application
+        fields = ["status", "gig_status"]
+
+
 class ReviewFilter(filters.FilterSet):
     gig__freelancer__username = filters.CharFilter(
         field_name="gig__freelancer__username", lookup_expr="iexact"
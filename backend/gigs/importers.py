@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from users.models import Skill
+
+from .models import Gig
+from .serializers import GigImportSerializer
+from .signals import gigs_bulk_created
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class GigImportError(Exception):
+    """Carries per-row validation errors, keyed by the row's position."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid rows")
+
+
+def parse_gig_rows(content, fmt):
+    """Turns a JSON array or a CSV document into a list of row dicts."""
+    if fmt == "json":
+        rows = json.loads(content)
+        if isinstance(rows, dict):
+            rows = rows.get("gigs", [])
+        if not isinstance(rows, list):
+            raise GigImportError({"non_field_errors": ["Expected a list of gigs."]})
+        return rows
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(content)):
+        row = {key: value for key, value in row.items() if value not in ("", None)}
+        if "skill_ids" in row:
+            row["skill_ids"] = [
+                part.strip()
+                for part in row["skill_ids"].replace(";", ",").split(",")
+                if part.strip()
+            ]
+        rows.append(row)
+    return rows
+
+
+def import_gigs(client, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Validates ``rows`` batch by batch and inserts them all for ``client`` or
+    none of them. Gigs and their skill links are written with ``bulk_create``
+    and receivers get a single ``gigs_bulk_created`` per import instead of a
+    ``post_save`` per gig.
+    """
+    known_skill_ids = set(Skill.objects.values_list("id", flat=True))
+    validated, errors = [], {}
+    for start in range(0, len(rows), batch_size):
+        serializer = GigImportSerializer(
+            data=rows[start : start + batch_size],
+            many=True,
+            context={"known_skill_ids": known_skill_ids},
+        )
+        if serializer.is_valid():
+            validated.extend(serializer.validated_data)
+            continue
+        batch_errors = serializer.errors
+        if not isinstance(batch_errors, dict):
+            batch_errors = dict(enumerate(batch_errors))
+        for offset, row_errors in batch_errors.items():
+            if row_errors:
+                errors[start + int(offset)] = row_errors
+    if errors:
+        raise GigImportError(errors)
+
+    skill_ids = [data.pop("skill_ids", []) for data in validated]
+    with transaction.atomic():
+        gigs = Gig.objects.bulk_create(
+            [
+                Gig(client=client, skill_id_array=sorted(set(ids)), **data)
+                for data, ids in zip(validated, skill_ids)
+            ],
+            batch_size=batch_size,
+        )
+        Gig.skills.through.objects.bulk_create(
+            [
+                Gig.skills.through(gig_id=gig.id, skill_id=skill_id)
+                for gig in gigs
+                for skill_id in gig.skill_id_array
+            ],
+            batch_size=batch_size,
+        )
+        skills = {gig.id: gig.skill_id_array for gig in gigs}
+        gigs_bulk_created.send(sender=Gig, client=client, gigs=gigs, skills=skills)
+    return gigs
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gigs', '0010_gigsubmission_user_alter_gigsubmission_file_and_more'),
+        ('users', '0006_remove_freelancerprofile_skills_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['created_at', 'id'], name='gig_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['price', 'id'], name='gig_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gig',
+            index=models.Index(fields=['due_date', 'id'], name='gig_due_date_id_idx'),
+        ),
+    ]
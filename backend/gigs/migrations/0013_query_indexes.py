@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0012_gig_search_vector"),
+        ("users", "0006_remove_freelancerprofile_skills_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["gig", "status"], name="application_gig_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["applicant", "applied_at"], name="application_applicant_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clientinstruction",
+            index=models.Index(
+                fields=["gig", "uploaded_at"], name="instruction_gig_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gig",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="gig_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gig",
+            index=models.Index(
+                condition=models.Q(("status", "available")),
+                fields=["created_at", "id"],
+                name="gig_open_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gig",
+            index=models.Index(
+                fields=["client", "created_at"], name="gig_client_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gig",
+            index=models.Index(
+                fields=["freelancer", "created_at"], name="gig_freelancer_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gigsubmission",
+            index=models.Index(
+                fields=["gig", "submitted_at"], name="submission_gig_time_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:58
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def backfill_skill_ids(apps, schema_editor):
+    Gig = apps.get_model("gigs", "Gig")
+    Link = Gig.skills.through
+    links = Link.objects.filter(gig=OuterRef("pk")).order_by("skill_id")
+    Gig.objects.filter(pk__in=Link.objects.values("gig_id")).update(
+        skill_id_array=ArraySubquery(links.values("skill_id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0013_query_indexes"),
+        ("users", "0008_profile_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gig",
+            name="skill_id_array",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.RunPython(backfill_skill_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="gig",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["skill_id_array"], name="gig_skill_id_array_gin"
+            ),
+        ),
+    ]
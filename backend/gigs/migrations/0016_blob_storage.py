@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:04
+
+import gigs.models
+import gigs.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0015_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clientinstruction",
+            name="original_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="gigsubmission",
+            name="original_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="clientinstruction",
+            name="file",
+            field=models.FileField(
+                storage=gigs.storage.ContentAddressedStorage(),
+                upload_to=gigs.models.instruction_upload_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gigsubmission",
+            name="file",
+            field=models.FileField(
+                storage=gigs.storage.ContentAddressedStorage(),
+                upload_to=gigs.models.submission_upload_path,
+            ),
+        ),
+        migrations.CreateModel(
+            name="Blob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("refcount", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("refcount", 0)),
+                        fields=["updated_at"],
+                        name="blob_unreferenced_idx",
+                    )
+                ],
+            },
+        ),
+    ]
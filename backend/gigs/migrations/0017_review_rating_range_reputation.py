@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:18
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def backfill_reputations(apps, schema_editor):
+    Review = apps.get_model("gigs", "Review")
+    FreelancerReputation = apps.get_model("users", "FreelancerReputation")
+    buckets = {
+        f"rating_{rating}": Count("id", filter=Q(rating=rating))
+        for rating in range(1, 6)
+    }
+    totals = (
+        Review.objects.filter(gig__freelancer__isnull=False, rating__range=(1, 5))
+        .order_by()
+        .values(user_id=F("gig__freelancer"))
+        .annotate(review_count=Count("id"), rating_sum=Sum("rating"), **buckets)
+    )
+    FreelancerReputation.objects.bulk_create(
+        FreelancerReputation(**row) for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0016_blob_storage"),
+        ("users", "0010_freelancer_reputation"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="review",
+            name="rating",
+            field=models.PositiveSmallIntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ]
+            ),
+        ),
+        migrations.RunPython(backfill_reputations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# Keeps gigs_gig.skill_id_array in step with gigs_gig_skills inside
+# Postgres. Statement triggers on the link table recompute the arrays of
+# the gigs whose links changed, cascades from deleted skills included, and
+# a row trigger on gigs_gig ignores any other write to the column, so
+# saving a gig loaded before its skills changed cannot put back a stale copy.
+SYNC_SQL = """
+CREATE FUNCTION gigs_sync_skill_id_array() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE gigs_gig AS gig
+    SET skill_id_array = ARRAY(
+            SELECT link.skill_id FROM gigs_gig_skills AS link
+            WHERE link.gig_id = gig.id
+            ORDER BY link.skill_id
+        ),
+        updated_at = now()
+    WHERE gig.id IN (SELECT gig_id FROM changed_links);
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER gigs_gig_skills_added
+AFTER INSERT ON gigs_gig_skills
+REFERENCING NEW TABLE AS changed_links
+FOR EACH STATEMENT EXECUTE FUNCTION gigs_sync_skill_id_array();
+
+CREATE TRIGGER gigs_gig_skills_removed
+AFTER DELETE ON gigs_gig_skills
+REFERENCING OLD TABLE AS changed_links
+FOR EACH STATEMENT EXECUTE FUNCTION gigs_sync_skill_id_array();
+
+CREATE FUNCTION gigs_keep_skill_id_array() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Only the link triggers above, one level down, may change the copy.
+    IF pg_trigger_depth() = 1 THEN
+        NEW.skill_id_array := OLD.skill_id_array;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER gigs_gig_keep_skill_id_array
+BEFORE UPDATE OF skill_id_array ON gigs_gig
+FOR EACH ROW EXECUTE FUNCTION gigs_keep_skill_id_array();
+"""
+
+DROP_SQL = """
+DROP TRIGGER gigs_gig_keep_skill_id_array ON gigs_gig;
+DROP FUNCTION gigs_keep_skill_id_array();
+DROP TRIGGER gigs_gig_skills_removed ON gigs_gig_skills;
+DROP TRIGGER gigs_gig_skills_added ON gigs_gig_skills;
+DROP FUNCTION gigs_sync_skill_id_array();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gigs", "0017_review_rating_range_reputation"),
+    ]
+
+    operations = [
+        migrations.RunSQL(SYNC_SQL, DROP_SQL),
+    ]
@@ -1,8 +1,32 @@
+import os
+import uuid
+
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.signals import post_save
+from django.utils import timezone
 
 from users.models import Skill
 
+from .storage import blob_storage
+
+# Gigs are written in Lithuanian, which Postgres has no stemmer for.
+SEARCH_CONFIG = "simple"
+
+
+class GigStateConflict(Exception):
+    """Raised when a gig is no longer in a state that allows a transition."""
+
+    def __init__(self, gig_id, transition, status):
+        self.gig_id = gig_id
+        self.transition = transition
+        self.status = status
+        super().__init__(f"Gig {gig_id} cannot {transition} from status {status!r}.")
+
 
 class Gig(models.Model):
     STATUS_CHOICES = [
@@ -31,16 +55,95 @@ class Gig(models.Model):
         max_length=20, choices=STATUS_CHOICES, default="available"
     )
     skills = models.ManyToManyField(Skill, blank=True, related_name="gigs")
+    # Copy of the ``skills`` ids kept in sync by database triggers (see
+    # migration 0018), so skill filters are a GIN lookup on the gig row
+    # instead of a join. Updates from the application are ignored.
+    skill_id_array = ArrayField(
+        models.IntegerField(), default=list, blank=True, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="gig_created_at_id_idx"),
+            models.Index(fields=["price", "id"], name="gig_price_id_idx"),
+            models.Index(fields=["due_date", "id"], name="gig_due_date_id_idx"),
+            GinIndex(fields=["search_vector"], name="gig_search_vector_gin"),
+            GinIndex(fields=["skill_id_array"], name="gig_skill_id_array_gin"),
+            models.Index(
+                fields=["status", "created_at", "id"], name="gig_status_created_idx"
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="available"),
+                name="gig_open_created_idx",
+            ),
+            models.Index(
+                fields=["client", "created_at"], name="gig_client_created_idx"
+            ),
+            models.Index(
+                fields=["freelancer", "created_at"], name="gig_freelancer_created_idx"
+            ),
+        ]
+
+    # transition name -> (allowed source statuses, target status)
+    TRANSITIONS = {
+        "assign": (("available",), "in_progress"),
+        "confirm": (("available",), "in_progress"),
+        "complete": (("in_progress",), "completed"),
+        "submit": (("in_progress", "pending"), "pending"),
+        "approve": (("pending",), "completed"),
+        "decline": (("pending",), "in_progress"),
+    }
 
     def __str__(self):
         return self.title
 
+    def transition(self, name, *conditions, **changes):
+        """
+        Applies ``TRANSITIONS[name]`` as one ``UPDATE ... WHERE status IN (...)``
+        so that of two racing requests only one can succeed. Extra
+        ``conditions`` are added to the WHERE clause and ``changes`` are
+        written alongside the new status.
+
+        Raises ``GigStateConflict`` if the row no longer matches.
+        """
+        sources, target = self.TRANSITIONS[name]
+        changes.update(status=target, updated_at=timezone.now())
+
+        updated = Gig.objects.filter(
+            *conditions, pk=self.pk, status__in=sources
+        ).update(**changes)
+        if not updated:
+            current = (
+                Gig.objects.filter(pk=self.pk).values_list("status", flat=True).first()
+            )
+            raise GigStateConflict(self.pk, name, current)
+
+        for field, value in changes.items():
+            setattr(self, field, value)
+        post_save.send(
+            sender=Gig,
+            instance=self,
+            created=False,
+            update_fields=frozenset(changes),
+            raw=False,
+            using=self._state.db,
+        )
+
 
 class Review(models.Model):
     gig = models.OneToOneField(Gig, on_delete=models.CASCADE, related_name="review")
-    rating = models.PositiveSmallIntegerField()
+    rating = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
     feedback = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -68,28 +171,67 @@ class Application(models.Model):
 
     class Meta:
         unique_together = ("applicant", "gig")
+        indexes = [
+            models.Index(fields=["gig", "status"], name="application_gig_status_idx"),
+            models.Index(
+                fields=["applicant", "applied_at"], name="application_applicant_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.applicant} -> {self.gig.title} ({self.status})"
 
 
+# The blob storage names files by content; these paths only supply the
+# extension, so they also record the name the file was uploaded under.
 def submission_upload_path(instance, filename):
+    instance.original_name = os.path.basename(filename)
     return f"submissions/gig_{instance.gig.id}/user_{instance.user.id}/{filename}"
 
 
 def instruction_upload_path(instance, filename):
+    instance.original_name = os.path.basename(filename)
     return (
         f"instructions/gig_{instance.gig.id}/user_{instance.uploaded_by.id}/{filename}"
     )
 
 
+class Blob(models.Model):
+    """A file in ``blob_storage`` and how many rows point at it."""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(refcount=0),
+                name="blob_unreferenced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+
 class GigSubmission(models.Model):
     gig = models.ForeignKey(Gig, on_delete=models.CASCADE, related_name="submissions")
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    file = models.FileField(upload_to=submission_upload_path)
+    file = models.FileField(upload_to=submission_upload_path, storage=blob_storage)
+    original_name = models.CharField(max_length=255, blank=True)
     message = models.TextField(blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["gig", "submitted_at"], name="submission_gig_time_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Submission by {self.user} for {self.gig.title}"
 
@@ -97,9 +239,60 @@ class GigSubmission(models.Model):
 class ClientInstruction(models.Model):
     gig = models.ForeignKey(Gig, on_delete=models.CASCADE, related_name="instructions")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    file = models.FileField(upload_to=instruction_upload_path)
+    file = models.FileField(upload_to=instruction_upload_path, storage=blob_storage)
+    original_name = models.CharField(max_length=255, blank=True)
     description = models.TextField(blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["gig", "uploaded_at"], name="instruction_gig_time_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Instruction by {self.uploaded_by} for {self.gig.title}"
+
+
+class ChunkedUpload(models.Model):
+    """
+    A resumable upload in progress. Chunks are appended to ``path`` and the
+    submission or instruction row is only created once the upload is
+    finalized.
+    """
+
+    KIND_CHOICES = [
+        ("submission", "Darbo pateikimas"),
+        ("instruction", "Kliento nurodymai"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    gig = models.ForeignKey(Gig, on_delete=models.CASCADE, related_name="uploads")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    # CRC32 of the first ``received`` bytes, carried over from chunk to chunk.
+    checksum = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.delete()
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
@@ -0,0 +1,174 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a ``(field, id)`` key instead of a single field.
+
+    The cursor stores the full key of the boundary row, so every page is a
+    plain index range scan with no offset and no ``COUNT(*)``. NULLs sort
+    last in ascending order, the same as Postgres does by default, which keeps
+    nullable keys such as ``due_date`` on the ``(field, id)`` index. The key
+    may also be an annotation, such as a search rank.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+    tiebreaker = "id"
+    version_field = "updated_at"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        primary = ordering[0]
+        if primary.lstrip("-") == self.tiebreaker:
+            return (primary,)
+        descending = primary.startswith("-")
+        return (primary, f"-{self.tiebreaker}" if descending else self.tiebreaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            key = self._decode_position(queryset, current_position)
+            descending = self.ordering[0].startswith("-")
+            queryset = self._filter_after(
+                queryset, key, ascending=reverse == descending
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_page_version(self, queryset, request, view=None):
+        """
+        Identifies the page ``paginate_queryset`` would return from the ids and
+        ``version_field`` of its rows and its links, without loading the rows.
+
+        Keyset pages are anchored on the cursor key rather than an offset, so
+        writes elsewhere in the collection cannot change them.
+        """
+        paginator = type(self)()
+        ordering = paginator.get_ordering(request, queryset, view)
+        fields = {"id", self.version_field, *(o.lstrip("-") for o in ordering)}
+        rows = paginator.paginate_queryset(
+            queryset.prefetch_related(None).values(*fields), request, view
+        )
+        return (
+            [(row["id"], row[self.version_field]) for row in rows],
+            paginator.get_next_link(),
+            paginator.get_previous_link(),
+        )
+
+    def _filter_after(self, queryset, key, ascending):
+        """Keep rows strictly after ``key`` in the requested direction."""
+        (name, value), (tie_name, tie_value) = key
+        nullable = self._get_output_field(queryset, name).null
+        op = "gt" if ascending else "lt"
+        tie = {f"{tie_name}__{op}": tie_value}
+
+        if name == tie_name:
+            return queryset.filter(**{f"{name}__{op}": value})
+
+        if value is None:
+            after = Q(**{f"{name}__isnull": True}, **tie)
+            if not ascending:
+                after |= Q(**{f"{name}__isnull": False})
+            return queryset.filter(after)
+
+        after = Q(**{f"{name}__{op}": value}) | Q(**{name: value}, **tie)
+        if nullable and ascending:
+            return queryset.filter(after | Q(**{f"{name}__isnull": True}))
+        # The redundant range bound gives the planner an index condition.
+        bound = {f"{name}__{op}e": value}
+        return queryset.filter(**bound).filter(after)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = getattr(instance, field_name)
+            values.append(None if attr is None else str(attr))
+        return json.dumps(values)
+
+    def _get_output_field(self, queryset, name):
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset.query.annotations[name].output_field
+
+    def _decode_position(self, queryset, position):
+        try:
+            values = json.loads(position)
+            names = [order.lstrip("-") for order in self.ordering]
+            if not isinstance(values, list) or len(values) != len(names):
+                raise ValueError
+            key = [
+                (name, self._get_output_field(queryset, name).to_python(value))
+                for name, value in zip(names, values)
+            ]
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if len(key) == 1:
+            key.append(key[0])
+        return key
+
+
+class ApplicationPagination(KeysetPagination):
+    ordering = ("-applied_at", "-id")
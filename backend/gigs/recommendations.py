@@ -0,0 +1,230 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from users.models import FreelancerProfile
+
+from .models import Gig
+
+OVERLAP_WEIGHT = 0.6
+RECENCY_WEIGHT = 0.25
+PRICE_WEIGHT = 0.15
+RECENCY_HALF_LIFE_DAYS = 14
+WORD_BITS = 64
+
+
+def pack_skills(skill_ids, words):
+    """Packs skill ids into a bitset of ``words`` 64-bit words."""
+    bits = np.zeros(words, dtype=np.uint64)
+    for skill_id in skill_ids:
+        word, bit = divmod(skill_id, WORD_BITS)
+        bits[word] |= np.uint64(1) << np.uint64(bit)
+    return bits
+
+
+def _words_for(skill_ids):
+    return max((max(skill_ids, default=0) // WORD_BITS) + 1, 1)
+
+
+class GigSkillIndex:
+    """
+    Open gigs as rows of packed skill bitsets, plus the recency and price
+    columns the score needs, so ranking is one vectorized pass.
+
+    The index is built lazily per process and then patched row by row from
+    the signals in ``gigs.signals``. Writes from other worker processes are
+    picked up by the periodic rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._profiles = {}
+        self._reset_rows(words=1)
+
+    def _reset_rows(self, words):
+        self.words = words
+        self.gig_ids = np.zeros(0, dtype=np.int64)
+        self.client_ids = np.zeros(0, dtype=np.int64)
+        self.bits = np.zeros((0, words), dtype=np.uint64)
+        self.skill_counts = np.zeros(0, dtype=np.float64)
+        self.created = np.zeros(0, dtype=np.float64)
+        self.prices = np.zeros(0, dtype=np.float64)
+        self._rows = {}
+
+    @property
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    @property
+    def is_stale(self):
+        max_age = getattr(settings, "GIG_RECOMMENDATION_REBUILD_SECONDS", 600)
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > max_age
+
+    def clear(self):
+        with self._lock:
+            self._loaded_at = None
+            self._profiles.clear()
+            self._reset_rows(words=1)
+
+    def rebuild(self):
+        gigs = Gig.objects.filter(status="available").values_list(
+            "id", "client_id", "created_at", "price"
+        )
+        skills = {}
+        for gig_id, skill_id in Gig.skills.through.objects.filter(
+            gig__status="available"
+        ).values_list("gig_id", "skill_id"):
+            skills.setdefault(gig_id, []).append(skill_id)
+
+        rows = list(gigs)
+        all_skill_ids = [skill_id for ids in skills.values() for skill_id in ids]
+        with self._lock:
+            # Profiles may have changed in other processes, and cached ones
+            # would no longer match the new row width.
+            self._profiles.clear()
+            self._reset_rows(words=_words_for(all_skill_ids))
+            self.bits = np.zeros((len(rows), self.words), dtype=np.uint64)
+            for i, (gig_id, *_) in enumerate(rows):
+                self.bits[i] = pack_skills(skills.get(gig_id, []), self.words)
+            self.gig_ids = np.array([r[0] for r in rows], dtype=np.int64)
+            self.client_ids = np.array([r[1] for r in rows], dtype=np.int64)
+            self.created = np.array([r[2].timestamp() for r in rows])
+            self.prices = np.array([float(r[3]) for r in rows])
+            self.skill_counts = np.array(
+                [len(skills.get(r[0], [])) for r in rows], dtype=np.float64
+            )
+            self._rows = {int(gig_id): i for i, gig_id in enumerate(self.gig_ids)}
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self.is_stale:
+            self.rebuild()
+
+    def _grow(self, words):
+        if words <= self.words:
+            return
+        padding = np.zeros((len(self.gig_ids), words - self.words), dtype=np.uint64)
+        self.bits = np.hstack([self.bits, padding])
+        self.words = words
+        self._profiles.clear()
+
+    def upsert(self, gig, skill_ids):
+        """Adds or refreshes one open gig without touching the other rows."""
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self._grow(_words_for(skill_ids))
+            values = (
+                gig.client_id,
+                gig.created_at.timestamp(),
+                float(gig.price),
+                len(skill_ids),
+            )
+            row = self._rows.get(gig.id)
+            if row is None:
+                row = len(self.gig_ids)
+                self._rows[gig.id] = row
+                self.gig_ids = np.append(self.gig_ids, gig.id)
+                self.client_ids = np.append(self.client_ids, 0)
+                self.created = np.append(self.created, 0.0)
+                self.prices = np.append(self.prices, 0.0)
+                self.skill_counts = np.append(self.skill_counts, 0.0)
+                self.bits = np.vstack(
+                    [self.bits, np.zeros((1, self.words), dtype=np.uint64)]
+                )
+            (
+                self.client_ids[row],
+                self.created[row],
+                self.prices[row],
+                self.skill_counts[row],
+            ) = values
+            self.bits[row] = pack_skills(skill_ids, self.words)
+
+    def remove(self, gig_id):
+        """Drops a gig by moving the last row into its slot."""
+        with self._lock:
+            row = self._rows.pop(gig_id, None)
+            if row is None:
+                return
+            last = len(self.gig_ids) - 1
+            if row != last:
+                for column in (
+                    self.gig_ids,
+                    self.client_ids,
+                    self.created,
+                    self.prices,
+                    self.skill_counts,
+                    self.bits,
+                ):
+                    column[row] = column[last]
+                self._rows[int(self.gig_ids[row])] = row
+            self.gig_ids = self.gig_ids[:last]
+            self.client_ids = self.client_ids[:last]
+            self.created = self.created[:last]
+            self.prices = self.prices[:last]
+            self.skill_counts = self.skill_counts[:last]
+            self.bits = self.bits[:last]
+
+    def contains(self, gig_id):
+        return gig_id in self._rows
+
+    def forget_profile(self, user_id):
+        with self._lock:
+            self._profiles.pop(user_id, None)
+
+    def forget_profiles(self):
+        with self._lock:
+            self._profiles.clear()
+
+    def _profile_bits(self, user):
+        bits = self._profiles.get(user.pk)
+        if bits is None:
+            skill_ids = list(
+                FreelancerProfile.skills.through.objects.filter(
+                    freelancerprofile__user=user
+                ).values_list("skill_id", flat=True)
+            )
+            self._grow(_words_for(skill_ids))
+            bits = pack_skills(skill_ids, self.words)
+            self._profiles[user.pk] = bits
+        return bits
+
+    def recommend(self, user, limit=20):
+        """Returns ``(gig_id, score)`` pairs for the best open gigs for ``user``."""
+        self.ensure_loaded()
+        with self._lock:
+            if not len(self.gig_ids):
+                return []
+            profile = self._profile_bits(user)
+
+            matched = np.bitwise_count(self.bits & profile).sum(axis=1)
+            overlap = matched / np.maximum(self.skill_counts, 1)
+
+            age_days = (timezone.now().timestamp() - self.created) / 86400
+            recency = np.power(0.5, np.maximum(age_days, 0) / RECENCY_HALF_LIFE_DAYS)
+
+            price = np.log1p(self.prices) / math.log1p(max(self.prices.max(), 1))
+
+            scores = (
+                OVERLAP_WEIGHT * overlap
+                + RECENCY_WEIGHT * recency
+                + PRICE_WEIGHT * price
+            )
+            scores[self.client_ids == user.pk] = -np.inf
+
+            limit = min(limit, len(scores))
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (int(self.gig_ids[i]), float(scores[i]))
+                for i in top
+                if np.isfinite(scores[i])
+            ]
+
+
+gig_skill_index = GigSkillIndex()
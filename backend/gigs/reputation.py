@@ -0,0 +1,67 @@
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from users.models import FreelancerReputation
+
+from .models import Gig, Review
+
+# Cache tag of one freelancer's review feed.
+FREELANCER_REVIEWS_TAG = "reviews:freelancer:{}"
+
+
+def review_freelancer_id(review):
+    # Read from the table rather than ``review.gig``, which a cascading
+    # delete may already have removed from the instance.
+    return (
+        Gig.objects.filter(pk=review.gig_id)
+        .values_list("freelancer_id", flat=True)
+        .first()
+    )
+
+
+def adjust_reputation(freelancer_id, rating, step):
+    """Adds (``step=1``) or removes (``step=-1``) a ``rating`` from the totals."""
+    if rating not in FreelancerReputation.RATINGS:
+        return
+    if step > 0:
+        FreelancerReputation.objects.get_or_create(user_id=freelancer_id)
+    bucket = f"rating_{rating}"
+    FreelancerReputation.objects.filter(user_id=freelancer_id).update(
+        review_count=F("review_count") + step,
+        rating_sum=F("rating_sum") + step * rating,
+        updated_at=timezone.now(),
+        **{bucket: F(bucket) + step},
+    )
+
+
+def reputation_totals(reviews):
+    """Per-freelancer totals of ``reviews``, with the reputation's field names."""
+    buckets = {
+        f"rating_{rating}": Count("id", filter=Q(rating=rating))
+        for rating in FreelancerReputation.RATINGS
+    }
+    return (
+        reviews.filter(gig__freelancer__isnull=False)
+        .order_by()
+        .values(user_id=F("gig__freelancer"))
+        .annotate(review_count=Count("id"), rating_sum=Sum("rating"), **buckets)
+    )
+
+
+def rebuild_reputations():
+    """Recomputes every reputation from the reviews and returns how many."""
+    totals = reputation_totals(
+        Review.objects.filter(rating__in=FreelancerReputation.RATINGS)
+    )
+    rows = [FreelancerReputation(**row) for row in totals]
+    fields = [name for name in totals.query.annotations if name != "user_id"]
+    FreelancerReputation.objects.exclude(
+        user_id__in=[row.user_id for row in rows]
+    ).delete()
+    FreelancerReputation.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=[*fields, "updated_at"],
+    )
+    return len(rows)
@@ -1,15 +1,55 @@
+import os
 from datetime import date
 
-from rest_framework import serializers
-
-from gigs.models import Application, ClientInstruction, Gig, GigSubmission, Review
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+from rest_framework import permissions, serializers
+
+from gigs.models import (
+    Application,
+    ChunkedUpload,
+    ClientInstruction,
+    Gig,
+    GigSubmission,
+    Review,
+)
 from users.models import Skill
-from users.serializers import SkillSerializer
+from users.serializers import FreelancerReputationSerializer, SkillSerializer
+
+
+def parse_field_list(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Trims read payloads to ``?fields=a,b`` and drops the relations listed in
+    ``Meta.expandable_fields`` unless they are asked for with ``?expand=x,y``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+
+        expand = parse_field_list(request.query_params.get("expand"))
+        only = parse_field_list(request.query_params.get("fields"))
+
+        for name in getattr(self.Meta, "expandable_fields", []):
+            if name not in expand:
+                self.fields.pop(name, None)
+
+        if only:
+            for name in set(self.fields) - only:
+                self.fields.pop(name)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     gig_title = serializers.CharField(source="gig.title", read_only=True)
-    freelancer_id = serializers.IntegerField(source="gig.freelancer.id", read_only=True)
+    freelancer_id = serializers.IntegerField(source="gig.freelancer_id", read_only=True)
 
     class Meta:
         model = Review
@@ -28,45 +68,76 @@ class ReviewSerializer(serializers.ModelSerializer):
         }
 
 
-class GigSubmissionSerializer(serializers.ModelSerializer):
+class ReviewListSerializer(ReviewSerializer):
+    freelancer_reputation = FreelancerReputationSerializer(
+        source="gig.freelancer.reputation", read_only=True, allow_null=True
+    )
+
+    class Meta(ReviewSerializer.Meta):
+        fields = [*ReviewSerializer.Meta.fields, "freelancer_reputation"]
+
+
+class FileDownloadMixin:
+    """
+    Points ``file`` and ``file_url`` at ``FileDownloadView`` instead of the
+    media URL, so every download goes through its access check.
+    """
+
+    download_kind = "submissions"
+
+    def get_file_url(self, instance):
+        request = self.context.get("request")
+        if instance.file and request:
+            url = reverse("file-download", args=[self.download_kind, instance.pk])
+            return request.build_absolute_uri(url)
+        return None
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "file" in data:
+            data["file"] = self.get_file_url(instance)
+        return data
+
+
+class GigSubmissionSerializer(FileDownloadMixin, serializers.ModelSerializer):
     class Meta:
         model = GigSubmission
-        fields = ["id", "gig", "user", "file", "message", "submitted_at"]
-        read_only_fields = ["id", "submitted_at", "gig", "user"]
+        fields = [
+            "id",
+            "gig",
+            "user",
+            "file",
+            "original_name",
+            "message",
+            "submitted_at",
+        ]
+        read_only_fields = ["id", "submitted_at", "gig", "user", "original_name"]
 
     def create(self, validated_data):
         validated_data["gig"] = self.context["gig"]
         validated_data["user"] = self.context["request"].user
         return super().create(validated_data)
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        request = self.context.get("request")
-        if instance.file and request:
-            data["file"] = request.build_absolute_uri(instance.file.url)
-        return data
 
-
-class GigSubmissionListSerializer(serializers.ModelSerializer):
+class GigSubmissionListSerializer(FileDownloadMixin, serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
 
     class Meta:
         model = GigSubmission
-        fields = ["id", "file", "file_url", "message", "submitted_at", "user"]
+        fields = [
+            "id",
+            "file",
+            "file_url",
+            "original_name",
+            "message",
+            "submitted_at",
+            "user",
+        ]
         read_only_fields = fields
 
-    def get_file_url(self, instance):
-        request = self.context.get("request")
-        if instance.file and request:
-            return request.build_absolute_uri(instance.file.url)
-        return None
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        return data
 
-
-class ClientInstructionSerializer(serializers.ModelSerializer):
+class ClientInstructionSerializer(FileDownloadMixin, serializers.ModelSerializer):
+    download_kind = "instructions"
     file_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -77,21 +148,39 @@ class ClientInstructionSerializer(serializers.ModelSerializer):
             "uploaded_by",
             "file",
             "file_url",
+            "original_name",
             "description",
             "uploaded_at",
         ]
-        read_only_fields = ["id", "gig", "uploaded_by", "uploaded_at"]
+        read_only_fields = ["id", "gig", "uploaded_by", "original_name", "uploaded_at"]
 
     def create(self, validated_data):
         validated_data["gig"] = self.context["gig"]
         validated_data["uploaded_by"] = self.context["request"].user
         return super().create(validated_data)
 
-    def get_file_url(self, instance):
-        request = self.context.get("request")
-        if instance.file and request:
-            return request.build_absolute_uri(instance.file.url)
-        return None
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ["id", "kind", "filename", "size", "received", "chunk_size"]
+        read_only_fields = ["id", "received"]
+
+    def get_chunk_size(self, obj):
+        return settings.CHUNKED_UPLOAD_CHUNK_SIZE
+
+    def validate_filename(self, value):
+        try:
+            return get_valid_filename(os.path.basename(value))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError("Netinkamas failo pavadinimas.")
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Netinkamas failo dydis.")
+        return value
 
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -132,7 +221,39 @@ class ApplicationSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class GigSerializer(serializers.ModelSerializer):
+class MyApplicationSerializer(serializers.ModelSerializer):
+    """An application with just enough of its gig for the applicant's list."""
+
+    status_display = serializers.CharField(source="get_status_display")
+    gig_title = serializers.CharField(source="gig.title")
+    gig_status = serializers.CharField(source="gig.status")
+    gig_status_display = serializers.CharField(source="gig.get_status_display")
+    gig_price = serializers.DecimalField(
+        source="gig.price", max_digits=10, decimal_places=2
+    )
+    gig_due_date = serializers.DateField(source="gig.due_date")
+    client_username = serializers.CharField(source="gig.client.username")
+
+    class Meta:
+        model = Application
+        fields = [
+            "id",
+            "gig",
+            "gig_title",
+            "gig_status",
+            "gig_status_display",
+            "gig_price",
+            "gig_due_date",
+            "client_username",
+            "applicant",
+            "status",
+            "status_display",
+            "applied_at",
+        ]
+        read_only_fields = fields
+
+
+class GigSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     review = ReviewSerializer(required=False, allow_null=True)
     client_name = serializers.SerializerMethodField()
     client_username = serializers.SerializerMethodField()
@@ -198,10 +319,15 @@ class GigSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, "has_applied"):
+            return obj.has_applied
         return obj.applications.filter(applicant=request.user).exists()
 
     def get_latest_submission(self, obj):
-        latest = obj.submissions.order_by("-submitted_at").first()
+        if hasattr(obj, "latest_submissions"):
+            latest = next(iter(obj.latest_submissions), None)
+        else:
+            latest = obj.submissions.order_by("-submitted_at").first()
         if latest:
             request = self.context.get("request")
             serializer = GigSubmissionListSerializer(
@@ -211,7 +337,10 @@ class GigSerializer(serializers.ModelSerializer):
         return None
 
     def get_latest_instruction(self, obj):
-        latest = obj.instructions.order_by("-uploaded_at").first()
+        if hasattr(obj, "latest_instructions"):
+            latest = next(iter(obj.latest_instructions), None)
+        else:
+            latest = obj.instructions.order_by("-uploaded_at").first()
         if latest:
             request = self.context.get("request")
             serializer = ClientInstructionSerializer(
@@ -228,3 +357,99 @@ class GigSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data["client"] = self.context["request"].user
         return super().create(validated_data)
+
+
+class GigImportSerializer(serializers.ModelSerializer):
+    skill_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+    class Meta:
+        model = Gig
+        fields = ["title", "description", "price", "due_date", "skill_ids"]
+
+    validate_due_date = GigSerializer.validate_due_date
+
+    def validate_skill_ids(self, value):
+        unknown = set(value) - self.context["known_skill_ids"]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Nežinomi įgūdžiai: {', '.join(map(str, sorted(unknown)))}."
+            )
+        return value
+
+
+class GigListSerializer(GigSerializer):
+    applications_count = serializers.IntegerField(read_only=True)
+    search_rank = serializers.FloatField(read_only=True, default=None)
+    search_headline = serializers.CharField(read_only=True, default=None)
+    recommendation_score = serializers.FloatField(read_only=True, default=None)
+
+    class Meta(GigSerializer.Meta):
+        fields = [
+            "id",
+            "title",
+            "description",
+            "price",
+            "status",
+            "status_display",
+            "client",
+            "client_name",
+            "client_username",
+            "freelancer",
+            "freelancer_name",
+            "freelancer_username",
+            "applications_count",
+            "search_rank",
+            "search_headline",
+            "recommendation_score",
+            "already_applied",
+            "skills",
+            "due_date",
+            "created_at",
+            "updated_at",
+            "review",
+            "applications",
+            "submissions",
+            "latest_submission",
+            "latest_instruction",
+        ]
+        expandable_fields = [
+            "review",
+            "applications",
+            "submissions",
+            "latest_submission",
+            "latest_instruction",
+        ]
+
+
+class MyGigSerializer(serializers.ModelSerializer):
+    """The columns the "my gigs" lists show, from one row per gig."""
+
+    status_display = serializers.CharField(source="get_status_display")
+    client_username = serializers.CharField(source="client.username")
+    freelancer_username = serializers.CharField(
+        source="freelancer.username", default=None
+    )
+    applications_count = serializers.IntegerField()
+    submissions_count = serializers.IntegerField()
+
+    class Meta:
+        model = Gig
+        fields = [
+            "id",
+            "title",
+            "price",
+            "status",
+            "status_display",
+            "due_date",
+            "client",
+            "client_username",
+            "freelancer",
+            "freelancer_username",
+            "applications_count",
+            "submissions_count",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,171 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from core.cache import invalidate_tags_on_commit
+from users.models import FreelancerProfile, Skill
+
+from .models import (
+    Application,
+    Blob,
+    ClientInstruction,
+    Gig,
+    GigSubmission,
+    Review,
+)
+from .recommendations import gig_skill_index
+from .reputation import FREELANCER_REVIEWS_TAG, adjust_reputation, review_freelancer_id
+
+M2M_CHANGES = ("post_add", "post_remove", "post_clear")
+
+# Sent once per bulk import with ``client``, ``gigs`` and ``skills``
+# (gig id -> skill ids), since bulk_create skips post_save.
+gigs_bulk_created = Signal()
+
+
+def _refresh_gig(gig):
+    if not gig_skill_index.is_loaded:
+        return
+    if gig.status != "available":
+        gig_skill_index.remove(gig.id)
+        return
+    skill_ids = list(gig.skills.values_list("id", flat=True))
+    gig_skill_index.upsert(gig, skill_ids)
+
+
+@receiver(post_save, sender=Gig)
+def index_saved_gig(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _refresh_gig(instance))
+
+
+@receiver(gigs_bulk_created, sender=Gig)
+def index_imported_gigs(sender, gigs, skills, **kwargs):
+    def refresh():
+        for gig in gigs:
+            gig_skill_index.upsert(gig, skills[gig.id])
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_delete, sender=Gig)
+def unindex_deleted_gig(sender, instance, **kwargs):
+    transaction.on_commit(lambda: gig_skill_index.remove(instance.id))
+
+
+# Fields of a gig that the review list renders.
+REVIEWED_GIG_FIELDS = {"title", "freelancer"}
+
+
+@receiver(post_save, sender=Gig)
+@receiver(post_delete, sender=Gig)
+def invalidate_gig_responses(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or REVIEWED_GIG_FIELDS & set(update_fields):
+        invalidate_tags_on_commit(
+            "gigs", "reviews", FREELANCER_REVIEWS_TAG.format(instance.freelancer_id)
+        )
+    else:
+        invalidate_tags_on_commit("gigs")
+
+
+@receiver(gigs_bulk_created, sender=Gig)
+def invalidate_imported_gig_responses(sender, **kwargs):
+    invalidate_tags_on_commit("gigs")
+
+
+def _touch_gigs(gigs):
+    gigs.update(updated_at=timezone.now())
+    invalidate_tags_on_commit("gigs")
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=GigSubmission)
+@receiver(post_delete, sender=GigSubmission)
+@receiver(post_save, sender=ClientInstruction)
+@receiver(post_delete, sender=ClientInstruction)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def touch_gig(sender, instance, **kwargs):
+    """
+    Keeps ``Gig.updated_at`` a validator for everything rendered with the gig,
+    so conditional GETs never answer ``304`` after a child row changed.
+    """
+    _touch_gigs(Gig.objects.filter(pk=instance.gig_id))
+    if sender is Review:
+        invalidate_tags_on_commit("reviews")
+
+
+@receiver(m2m_changed, sender=Gig.skills.through)
+def index_gig_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_CHANGES:
+        return
+    # Triggers on the link table have already updated skill_id_array and
+    # updated_at; the copy on ``instance`` is left as loaded, and the
+    # database ignores it when the instance is saved.
+    invalidate_tags_on_commit("gigs")
+
+    if not reverse:
+        transaction.on_commit(lambda: _refresh_gig(instance))
+    elif pk_set is None:
+        transaction.on_commit(gig_skill_index.clear)
+    else:
+        gigs = Gig.objects.filter(pk__in=pk_set)
+        transaction.on_commit(lambda: [_refresh_gig(gig) for gig in gigs])
+
+
+@receiver(post_delete, sender=Skill)
+def drop_deleted_skill(sender, instance, **kwargs):
+    # The cascade deletes the through rows without sending m2m_changed; the
+    # link triggers still update the gigs it touched.
+    invalidate_tags_on_commit("gigs")
+    transaction.on_commit(gig_skill_index.clear)
+
+
+@receiver(m2m_changed, sender=FreelancerProfile.skills.through)
+def forget_profile_skills(sender, instance, action, reverse, **kwargs):
+    if action not in M2M_CHANGES:
+        return
+    if reverse:
+        transaction.on_commit(gig_skill_index.forget_profiles)
+    else:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: gig_skill_index.forget_profile(user_id))
+
+
+@receiver(post_save, sender=GigSubmission)
+@receiver(post_save, sender=ClientInstruction)
+def reference_blob(sender, instance, created, **kwargs):
+    if created and instance.file:
+        Blob.objects.filter(name=instance.file.name).update(refcount=F("refcount") + 1)
+
+
+@receiver(post_delete, sender=GigSubmission)
+@receiver(post_delete, sender=ClientInstruction)
+def release_blob(sender, instance, **kwargs):
+    # The blob itself is left to collect_garbage, which waits out the grace
+    # period in case the same content is uploaded again.
+    if instance.file:
+        Blob.objects.filter(name=instance.file.name, refcount__gt=0).update(
+            refcount=F("refcount") - 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_reputation(sender, instance, created, **kwargs):
+    freelancer_id = review_freelancer_id(instance)
+    if freelancer_id is None:
+        return
+    if created:
+        adjust_reputation(freelancer_id, instance.rating, 1)
+    invalidate_tags_on_commit(FREELANCER_REVIEWS_TAG.format(freelancer_id))
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_reputation(sender, instance, **kwargs):
+    freelancer_id = review_freelancer_id(instance)
+    if freelancer_id is None:
+        return
+    adjust_reputation(freelancer_id, instance.rating, -1)
+    invalidate_tags_on_commit(FREELANCER_REVIEWS_TAG.format(freelancer_id))
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = "blobs"
+GC_BATCH_SIZE = 500
+# Blobs stay this long after their last reference goes, which covers a file
+# that is stored but whose row has not been committed yet.
+GC_GRACE = timedelta(hours=1)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every distinct file once, under the SHA-256 of its content.
+
+    The hash is computed while the upload is streamed to a temporary file
+    next to the blobs, so identical files need one write and no second
+    read. The ``upload_to`` path only contributes the extension. Each blob
+    has a ``Blob`` row whose ``refcount`` the ``gigs.signals`` receivers
+    keep, and ``collect_garbage`` removes blobs nobody references.
+    """
+
+    def _save(self, name, content):
+        from .models import Blob
+
+        source, owned, digest, size = self._spool(content)
+        extension = os.path.splitext(name)[1].lower()
+        blob_name = f"{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+        # Touching the row waits for a collect_garbage batch that holds it,
+        # and moves it out of the grace window of the next one.
+        touched = Blob.objects.filter(name=blob_name).update(updated_at=timezone.now())
+        if touched and self.exists(blob_name):
+            if owned:
+                os.remove(source)
+            return blob_name
+
+        path = self.path(blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_move_safe(source, path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        Blob.objects.bulk_create(
+            [Blob(name=blob_name, size=size)],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["size", "updated_at"],
+        )
+        return blob_name
+
+    def _spool(self, content):
+        """Returns ``(path, owned, sha256, size)`` for a file holding ``content``."""
+        digest, size = hashlib.sha256(), 0
+        if hasattr(content, "temporary_file_path"):
+            # Already on disk, e.g. a finished chunked upload: hash it in
+            # place and move it, like FileSystemStorage does.
+            for chunk in content.chunks():
+                digest.update(chunk)
+                size += len(chunk)
+            return content.temporary_file_path(), False, digest.hexdigest(), size
+
+        spool_dir = self.path(f"{BLOB_DIR}/tmp")
+        os.makedirs(spool_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=spool_dir)
+        with os.fdopen(fd, "wb") as spool:
+            for chunk in content.chunks():
+                spool.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        return path, True, digest.hexdigest(), size
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def collect_garbage(batch_size=GC_BATCH_SIZE, grace=GC_GRACE):
+    """
+    Deletes unreferenced blobs, ``batch_size`` at a time, and returns how
+    many went.
+
+    Each batch keeps its rows locked until the files are gone, so a
+    concurrent upload of the same content either reuses the blob before the
+    batch takes it or writes it anew afterwards.
+    """
+    from .models import Blob
+
+    cutoff = timezone.now() - grace
+    removed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Blob.objects.select_for_update(skip_locked=True)
+                .filter(refcount=0, updated_at__lt=cutoff)
+                .values_list("pk", "name")[:batch_size]
+            )
+            if not batch:
+                return removed
+            for _, name in batch:
+                blob_storage.delete(name)
+            Blob.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+        removed += len(batch)
@@ -1,8 +1,34 @@
+import hashlib
+import io
+import json
+import warnings
+import zipfile
+import zlib
+from datetime import timedelta
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from gigs.models import Gig
-from users.models import User
+from gamification.models import Mission, UserMissionProgress
+from gigs.filters import PRICE_BUCKETS
+from gigs.models import (
+    Application,
+    Blob,
+    ChunkedUpload,
+    ClientInstruction,
+    Gig,
+    GigStateConflict,
+    GigSubmission,
+    Review,
+)
+from gigs.recommendations import OVERLAP_WEIGHT, gig_skill_index
+from gigs.reputation import rebuild_reputations
+from gigs.storage import collect_garbage
+from users.models import FreelancerProfile, FreelancerReputation, Skill, User
 
 
 @pytest.fixture
@@ -229,3 +255,899 @@ def test_approve_submission(api_client, tmp_path):
         f"/api/gigs/{gig.id}/approve_submission/", {"rating": 5, "feedback": "Superb"}
     )
     assert res.status_code == 200
+
+
+@pytest.mark.django_db
+def test_gig_list_keyset_pagination(api_client):
+    client = User.objects.create_user(
+        email="client9@example.com", password="pass123", role="client"
+    )
+    for i, price in enumerate([50, 10, 30, 10, 20]):
+        Gig.objects.create(
+            title=f"Paged gig {i}",
+            description="paged",
+            price=price,
+            client=client,
+            status="available",
+        )
+
+    login = api_client.post(
+        "/api/auth/login/", {"email": client.email, "password": "pass123"}
+    )
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+    seen = []
+    url = "/api/gigs/?ordering=price&page_size=2&status=available"
+    while url:
+        res = api_client.get(url)
+        assert res.status_code == 200
+        seen.extend(res.data["results"])
+        url = res.data["next"]
+
+    assert len(seen) == 5
+    assert len({g["id"] for g in seen}) == 5
+    assert [float(g["price"]) for g in seen] == [10, 10, 20, 30, 50]
+
+    res = api_client.get(res.data["previous"])
+    assert [float(g["price"]) for g in res.data["results"]] == [20, 30]
+
+
+@pytest.mark.django_db
+def test_gig_list_is_compact_and_expandable(api_client):
+    client = User.objects.create_user(
+        email="client10@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer10@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(
+        title="Compact gig", description="list me", price=80, client=client
+    )
+    Application.objects.create(gig=gig, applicant=freelancer)
+
+    api_client.force_authenticate(client)
+
+    res = api_client.get("/api/gigs/")
+    row = res.data["results"][0]
+    assert row["applications_count"] == 1
+    assert "applications" not in row
+    assert "latest_submission" not in row
+
+    res = api_client.get("/api/gigs/?fields=id,title,applications&expand=applications")
+    row = res.data["results"][0]
+    assert set(row) == {"id", "title", "applications"}
+    assert row["applications"][0]["applicant"] == freelancer.id
+
+    res = api_client.get(f"/api/gigs/{gig.id}/")
+    assert "applications" in res.data
+    assert "submissions" in res.data
+
+
+@pytest.mark.django_db
+def test_gig_list_query_count_is_constant(api_client, django_assert_max_num_queries):
+    client = User.objects.create_user(
+        email="client11@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer11@example.com", password="pass123", role="freelancer"
+    )
+    skill = Skill.objects.create(name="Query counting")
+    api_client.force_authenticate(freelancer)
+    url = (
+        "/api/gigs/?expand=review,applications,submissions,"
+        "latest_submission,latest_instruction"
+    )
+
+    def add_gigs(count):
+        for i in range(count):
+            gig = Gig.objects.create(
+                title=f"Counted gig {i}", description="", price=10, client=client
+            )
+            gig.skills.add(skill)
+            Application.objects.create(gig=gig, applicant=freelancer)
+            GigSubmission.objects.create(gig=gig, user=freelancer, file="a.txt")
+            ClientInstruction.objects.create(gig=gig, uploaded_by=client, file="b.txt")
+
+    add_gigs(2)
+    with CaptureQueriesContext(connection) as small_page:
+        api_client.get(url)
+
+    add_gigs(8)
+    with django_assert_max_num_queries(len(small_page)):
+        res = api_client.get(url)
+
+    assert len(res.data["results"]) == 10
+    assert all(g["already_applied"] for g in res.data["results"])
+    assert all(g["latest_submission"] for g in res.data["results"])
+
+
+@pytest.mark.django_db
+def test_gig_full_text_search_ranks_and_highlights(api_client):
+    client = User.objects.create_user(
+        email="client12@example.com", password="pass123", role="client"
+    )
+    Gig.objects.create(
+        title="Logotipo kūrimas",
+        description="Reikia naujo logotipo kavinei",
+        price=50,
+        client=client,
+    )
+    Gig.objects.create(
+        title="Svetainės kūrimas",
+        description="Svetainė su logotipo vieta ir kontaktais",
+        price=500,
+        client=client,
+    )
+    Gig.objects.create(
+        title="Vertimas", description="Išversti tekstą", price=30, client=client
+    )
+    api_client.force_authenticate(client)
+
+    res = api_client.get("/api/gigs/", {"q": "logotipo"})
+    titles = [g["title"] for g in res.data["results"]]
+    assert titles == ["Logotipo kūrimas", "Svetainės kūrimas"]
+    first, second = res.data["results"]
+    assert "<mark>logotipo</mark>" in first["search_headline"]
+    assert first["search_rank"] > second["search_rank"]
+
+    res = api_client.get("/api/gigs/", {"q": "logotipo", "page_size": 1})
+    res = api_client.get(res.data["next"])
+    assert [g["title"] for g in res.data["results"]] == ["Svetainės kūrimas"]
+    assert res.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_recommended_gigs_rank_by_skill_overlap(
+    api_client, django_capture_on_commit_callbacks
+):
+    gig_skill_index.clear()
+    client = User.objects.create_user(
+        email="client13@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer13@example.com", password="pass123", role="freelancer"
+    )
+    django = Skill.objects.create(name="Django")
+    react = Skill.objects.create(name="React")
+    profile = FreelancerProfile.objects.create(user=freelancer)
+    profile.skills.add(django)
+
+    backend = Gig.objects.create(title="API", description="", price=100, client=client)
+    backend.skills.add(django)
+    frontend = Gig.objects.create(title="UI", description="", price=100, client=client)
+    frontend.skills.add(react)
+
+    api_client.force_authenticate(freelancer)
+    res = api_client.get("/api/gigs/recommended/")
+    assert [g["id"] for g in res.data] == [backend.id, frontend.id]
+
+    # Later changes patch the loaded index instead of rebuilding it.
+    with django_capture_on_commit_callbacks(execute=True):
+        frontend.skills.add(django)
+        backend.status = "in_progress"
+        backend.save()
+    assert not gig_skill_index.contains(backend.id)
+
+    res = api_client.get("/api/gigs/recommended/")
+    assert [g["id"] for g in res.data] == [frontend.id]
+    assert res.data[0]["recommendation_score"] > 0
+    matched_score = res.data[0]["recommendation_score"]
+
+    # A skill change made elsewhere, without signals here, shows after a rebuild.
+    FreelancerProfile.skills.through.objects.filter(freelancerprofile=profile).delete()
+    gig_skill_index.rebuild()
+    res = api_client.get("/api/gigs/recommended/")
+    # Half the gig's skills matched before, none do now.
+    assert res.data[0]["recommendation_score"] == pytest.approx(
+        matched_score - OVERLAP_WEIGHT / 2, abs=1e-3
+    )
+
+
+@pytest.mark.django_db
+def test_transition_rejects_stale_state():
+    client = User.objects.create_user(
+        email="client14@example.com", password="pass123", role="client"
+    )
+    first = User.objects.create_user(
+        email="freelancer14@example.com", password="pass123", role="freelancer"
+    )
+    second = User.objects.create_user(
+        email="freelancer15@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(title="Race", description="", price=10, client=client)
+
+    # Both requests loaded the gig while it was still available.
+    stale_a = Gig.objects.get(pk=gig.pk)
+    stale_b = Gig.objects.get(pk=gig.pk)
+
+    stale_a.transition("assign", freelancer=first)
+    with pytest.raises(GigStateConflict) as exc:
+        stale_b.transition("assign", freelancer=second)
+
+    assert exc.value.status == "in_progress"
+    gig.refresh_from_db()
+    assert gig.freelancer == first
+
+
+@pytest.mark.django_db
+def test_confirm_rejects_other_applications(api_client):
+    client = User.objects.create_user(
+        email="client15@example.com", password="pass123", role="client"
+    )
+    chosen, other = (
+        User.objects.create_user(
+            email=f"applicant{i}@example.com", password="pass123", role="freelancer"
+        )
+        for i in range(2)
+    )
+    gig = Gig.objects.create(title="Pick one", description="", price=10, client=client)
+    Application.objects.create(gig=gig, applicant=chosen)
+    Application.objects.create(gig=gig, applicant=other)
+
+    api_client.force_authenticate(client)
+    res = api_client.post(f"/api/gigs/{gig.id}/confirm/", {"freelancer_id": chosen.id})
+    assert res.status_code == 200
+    assert res.data["status"] == "in_progress"
+    assert {a["applicant"]: a["status"] for a in res.data["applications"]} == {
+        chosen.id: "accepted",
+        other.id: "rejected",
+    }
+
+    res = api_client.post(f"/api/gigs/{gig.id}/confirm/", {"freelancer_id": other.id})
+    assert res.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_import_gigs(api_client, django_capture_on_commit_callbacks):
+    client = User.objects.create_user(
+        email="client16@example.com", password="pass123", role="client"
+    )
+    skill = Skill.objects.create(name="Bulk skill")
+    Mission.objects.create(
+        title="First gig",
+        description="",
+        xp_reward=10,
+        code="submit_first_gig",
+        goal_count=3,
+    )
+    api_client.force_authenticate(client)
+
+    res = api_client.post(
+        "/api/gigs/bulk/",
+        [
+            {"title": "Bulk 1", "description": "a", "price": 10},
+            {"title": "Bulk 2", "description": "b", "price": 20, "skill_ids": [999]},
+        ],
+        format="json",
+    )
+    assert res.status_code == 400
+    assert list(res.data["errors"]) == [1]
+    assert not Gig.objects.filter(client=client).exists()
+
+    for body in ("abc", 5, {"gigs": 5}, {"gigs": "abc"}):
+        res = api_client.post("/api/gigs/bulk/", body, format="json")
+        assert res.status_code == 400
+        assert "gigs" in res.data
+
+    csv_file = io.BytesIO(
+        "title,description,price,skill_ids\n"
+        f'Bulk 1,a,10,{skill.id}\nBulk 2,b,20,\n"Bulk, 3",c,30,"{skill.id}"\n'.encode()
+    )
+    csv_file.name = "gigs.csv"
+    with django_capture_on_commit_callbacks(execute=True):
+        res = api_client.post("/api/gigs/bulk/", {"file": csv_file}, format="multipart")
+    assert res.status_code == 201
+    assert res.data["created"] == 3
+    assert Gig.objects.filter(client=client, skills=skill).count() == 2
+
+    progress = UserMissionProgress.objects.get(user=client)
+    assert progress.completed
+
+
+@pytest.mark.django_db
+def test_gig_conditional_get(api_client):
+    client = User.objects.create_user(
+        email="client17@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer17@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(
+        title="Cached gig",
+        description="Desc",
+        price=100,
+        client=client,
+        due_date="2025-12-12",
+    )
+    api_client.force_authenticate(freelancer)
+
+    for url in (f"/api/gigs/{gig.id}/", "/api/gigs/"):
+        res = api_client.get(url)
+        etag = res["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            res = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert res.status_code == 304
+        assert len(queries) == 1
+
+    detail_etag = api_client.get(f"/api/gigs/{gig.id}/")["ETag"]
+    list_etag = api_client.get("/api/gigs/")["ETag"]
+    Application.objects.create(gig=gig, applicant=freelancer)
+
+    res = api_client.get(f"/api/gigs/{gig.id}/", HTTP_IF_NONE_MATCH=detail_etag)
+    assert res.status_code == 200
+    assert res.data["already_applied"] is True
+    res = api_client.get("/api/gigs/", HTTP_IF_NONE_MATCH=list_etag)
+    assert res.status_code == 200
+    assert res.data["results"][0]["applications_count"] == 1
+
+    other_page = api_client.get(
+        "/api/gigs/?page_size=5", HTTP_IF_NONE_MATCH=res["ETag"]
+    )
+    assert other_page.status_code == 200
+
+
+@pytest.mark.django_db
+def test_gig_facets(api_client, django_assert_num_queries):
+    client = User.objects.create_user(
+        email="client18@example.com", password="pass123", role="client"
+    )
+    python = Skill.objects.create(name="Python facet")
+    design = Skill.objects.create(name="Design facet")
+    for title, price, status, skills in [
+        ("Cheap", 20, "available", [python, design]),
+        ("Mid", 80, "available", [python]),
+        ("Pricey", 2000, "completed", [design]),
+        ("Bare", 300, "available", []),
+    ]:
+        gig = Gig.objects.create(
+            title=title,
+            description="Desc",
+            price=price,
+            status=status,
+            client=client,
+            due_date="2025-12-12",
+        )
+        gig.skills.set(skills)
+    Skill.objects.bulk_create(Skill(name=f"Unused facet {i}") for i in range(30))
+    api_client.force_authenticate(client)
+
+    with django_assert_num_queries(2) as queries:
+        res = api_client.get("/api/gigs/facets/")
+    assert res.status_code == 200
+    # One count per status and price bucket plus the total and the skill
+    # count, however many skills exist.
+    assert sum(q["sql"].count("COUNT(") for q in queries.captured_queries) == (
+        len(Gig.STATUS_CHOICES) + len(PRICE_BUCKETS) + 2
+    )
+    assert res.data["total"] == 4
+    statuses = {s["value"]: s["count"] for s in res.data["status"]}
+    assert statuses["available"] == 3
+    assert statuses["completed"] == 1
+    assert [b["count"] for b in res.data["price"]] == [1, 1, 0, 1, 0, 1]
+    assert {s["name"]: s["count"] for s in res.data["skills"]} == {
+        "Python facet": 2,
+        "Design facet": 2,
+    }
+
+    res = api_client.get(f"/api/gigs/facets/?status=available&skill_ids={python.id}")
+    assert res.data["total"] == 2
+    assert [s["count"] for s in res.data["skills"]] == [2, 1]
+
+    with django_assert_num_queries(0):
+        cached = api_client.get(
+            f"/api/gigs/facets/?skill_ids={python.id}&status=available&page_size=5"
+        )
+    assert cached.data == res.data
+
+
+@pytest.mark.django_db
+def test_gig_skill_match_any_and_all(api_client):
+    client = User.objects.create_user(
+        email="client19@example.com", password="pass123", role="client"
+    )
+    python, django, design = (
+        Skill.objects.create(name=name) for name in ("Py", "Dj", "Ux")
+    )
+    both = Gig.objects.create(
+        title="Both", description="d", price=10, client=client, due_date="2025-12-12"
+    )
+    both.skills.set([python, django])
+    only_python = Gig.objects.create(
+        title="Python", description="d", price=10, client=client, due_date="2025-12-12"
+    )
+    only_python.skills.add(python)
+    unrelated = Gig.objects.create(
+        title="Design", description="d", price=10, client=client, due_date="2025-12-12"
+    )
+    unrelated.skills.add(design)
+    api_client.force_authenticate(client)
+
+    def titles(query):
+        res = api_client.get(f"/api/gigs/?{query}")
+        assert res.status_code == 200
+        return sorted(gig["title"] for gig in res.data["results"])
+
+    ids = f"{python.id},{django.id}"
+    assert titles(f"skill_ids={ids}") == ["Both", "Python"]
+    assert titles(f"skill_ids={ids}&skill_match=any") == ["Both", "Python"]
+    assert titles(f"skill_ids={ids}&skill_match=all") == ["Both"]
+    assert api_client.get("/api/gigs/?skill_ids=x").status_code == 400
+
+    # A full save of an instance loaded before its skills changed keeps the
+    # database copy of the skill ids.
+    stale = Gig.objects.get(pk=unrelated.pk)
+    unrelated.skills.add(python)
+    assert stale.skill_id_array == [design.id]
+    stale.title = "Design and Python"
+    stale.save()
+    assert titles(f"skill_ids={python.id}") == ["Both", "Design and Python", "Python"]
+    stale.refresh_from_db()
+    assert stale.skill_id_array == sorted([design.id, python.id])
+
+    django.gigs.remove(both)
+    assert titles(f"skill_ids={ids}&skill_match=all") == []
+    python.delete()
+    both.refresh_from_db()
+    assert both.skill_id_array == []
+
+
+@pytest.mark.django_db
+def test_resumable_submission_upload(api_client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.CHUNKED_UPLOAD_DIR = tmp_path / "chunks"
+    settings.CHUNKED_UPLOAD_CHUNK_SIZE = 8
+    client = User.objects.create_user(
+        email="client20@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer20@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(
+        title="Chunked gig",
+        description="test",
+        price=200,
+        client=client,
+        freelancer=freelancer,
+        status="in_progress",
+        due_date="2025-12-12",
+    )
+    content = b"0123456789abcdefXYZ"
+
+    api_client.force_authenticate(client)
+    res = api_client.post(
+        f"/api/gigs/{gig.id}/uploads/",
+        {"kind": "submission", "filename": "work.txt", "size": len(content)},
+    )
+    assert res.status_code == 403
+
+    api_client.force_authenticate(freelancer)
+    res = api_client.post(
+        f"/api/gigs/{gig.id}/uploads/",
+        {"kind": "submission", "filename": "../work.txt", "size": len(content)},
+    )
+    assert res.status_code == 201
+    url = f"/api/gigs/{gig.id}/uploads/{res.data['id']}/"
+
+    def put(offset, chunk, **headers):
+        return api_client.put(
+            url,
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+            **headers,
+        )
+
+    assert put(0, content[:8]).data["received"] == 8
+    bad = put(8, content[8:16], HTTP_UPLOAD_CHECKSUM="crc32 00000000")
+    assert bad.status_code == 400
+    assert bad.data["received"] == 8
+    assert put(0, content[:8]).status_code == 409
+    assert put(8, content[8:20]).status_code == 413
+
+    # Resume from whatever the server reports.
+    offset = api_client.get(url).data["received"]
+    chunk_crc = f"crc32 {zlib.crc32(content[offset:16]):08x}"
+    res = put(offset, content[offset:16], HTTP_UPLOAD_CHECKSUM=chunk_crc)
+    assert res.data["received"] == 16
+    assert api_client.post(f"{url}finalize/").status_code == 400
+    assert put(16, content[16:]).data["received"] == len(content)
+    assert not GigSubmission.objects.filter(gig=gig).exists()
+
+    res = api_client.post(
+        f"{url}finalize/",
+        {"checksum": f"{zlib.crc32(content):08x}", "message": "Done!"},
+    )
+    assert res.status_code == 201
+    submission = GigSubmission.objects.get(gig=gig)
+    assert submission.message == "Done!"
+    assert submission.original_name == "work.txt"
+    assert submission.file.name.endswith(".txt")
+    assert submission.file.read() == content
+    gig.refresh_from_db()
+    assert gig.status == "pending"
+    assert not ChunkedUpload.objects.exists()
+    assert not list((tmp_path / "chunks").iterdir())
+
+
+@pytest.mark.django_db
+def test_identical_files_share_one_blob(api_client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    client = User.objects.create_user(
+        email="client21@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer21@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(
+        title="Dedup gig",
+        description="test",
+        price=200,
+        client=client,
+        freelancer=freelancer,
+        status="in_progress",
+        due_date="2025-12-12",
+    )
+    content = b"the same brief twice"
+    api_client.force_authenticate(client)
+    for name in ("brief.PDF", "copy.pdf"):
+        res = api_client.post(
+            f"/api/gigs/{gig.id}/submit-instruction/",
+            {"file": SimpleUploadedFile(name, content), "description": name},
+            format="multipart",
+        )
+        assert res.status_code == 201
+
+    first, second = ClientInstruction.objects.filter(gig=gig).order_by("id")
+    digest = hashlib.sha256(content).hexdigest()
+    assert first.file.name == second.file.name
+    assert first.file.name.endswith(f"{digest}.pdf")
+    assert [first.original_name, second.original_name] == ["brief.PDF", "copy.pdf"]
+    blob = Blob.objects.get()
+    assert (blob.size, blob.refcount) == (len(content), 2)
+
+    first.delete()
+    assert collect_garbage(grace=timedelta(0)) == 0
+    second.delete()
+    assert Blob.objects.get().refcount == 0
+    assert collect_garbage(grace=timedelta(hours=1)) == 0
+    assert collect_garbage(grace=timedelta(0)) == 1
+    assert not Blob.objects.exists()
+    assert not (tmp_path / blob.name).exists()
+
+
+def read_under_asgi(response):
+    """Reads a streaming response the way Django's ASGI handler does."""
+
+    async def read():
+        return b"".join([part async for part in response])
+
+    # Django warns when it has to buffer a sync iterator for ASGI.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return async_to_sync(read)()
+
+
+@pytest.mark.django_db
+def test_file_download_checks_access_and_ranges(api_client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    client = User.objects.create_user(
+        email="client22@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer22@example.com", password="pass123", role="freelancer"
+    )
+    stranger = User.objects.create_user(
+        email="stranger22@example.com", password="pass123", role="freelancer"
+    )
+    gig = Gig.objects.create(
+        title="Download gig",
+        description="test",
+        price=200,
+        client=client,
+        freelancer=freelancer,
+        status="in_progress",
+        due_date="2025-12-12",
+    )
+    content = b"0123456789" * 10
+    api_client.force_authenticate(client)
+    res = api_client.post(
+        f"/api/gigs/{gig.id}/submit-instruction/",
+        {"file": SimpleUploadedFile("Darbas.txt", content), "description": "Brief"},
+        format="multipart",
+    )
+    assert res.status_code == 201
+    url = res.data["file"]
+    assert url == res.data["file_url"]
+    assert url.endswith(f"/api/files/instructions/{res.data['id']}/")
+
+    api_client.force_authenticate(stranger)
+    assert api_client.get(url).status_code == 404
+
+    api_client.force_authenticate(freelancer)
+    res = api_client.get(url)
+    assert res.status_code == 200
+    assert b"".join(res.streaming_content) == content
+    assert res["Content-Disposition"] == 'inline; filename="Darbas.txt"'
+    assert res["Accept-Ranges"] == "bytes"
+
+    res = api_client.get(url, HTTP_RANGE="bytes=10-19")
+    assert res.status_code == 206
+    assert res["Content-Range"] == f"bytes 10-19/{len(content)}"
+    assert b"".join(res.streaming_content) == content[10:20]
+    res = api_client.get(url, HTTP_RANGE="bytes=-5")
+    assert b"".join(res.streaming_content) == content[-5:]
+    assert api_client.get(url, HTTP_RANGE="bytes=500-").status_code == 416
+    res = api_client.get(url, HTTP_RANGE="bytes=-")
+    assert res.status_code == 200
+    assert b"".join(res.streaming_content) == content
+    etag = res["ETag"]
+    instruction = ClientInstruction.objects.get(gig=gig)
+    assert etag == '"{}"'.format(hashlib.sha256(content).hexdigest())
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert read_under_asgi(api_client.get(url, HTTP_RANGE="bytes=3-")) == content[3:]
+
+    # Files outside the blob layout get a weak ETag, which If-Range ignores.
+    legacy = tmp_path / "instructions" / "legacy.txt"
+    legacy.parent.mkdir()
+    legacy.write_bytes(content)
+    ClientInstruction.objects.filter(pk=instruction.pk).update(
+        file="instructions/legacy.txt"
+    )
+    res = api_client.get(url)
+    etag = res["ETag"]
+    assert etag.startswith('W/"')
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    res = api_client.get(url, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE=etag)
+    assert res.status_code == 200
+    assert b"".join(res.streaming_content) == content
+    ClientInstruction.objects.filter(pk=instruction.pk).update(file=instruction.file)
+
+    settings.PROTECTED_MEDIA_HEADER = "X-Accel-Redirect"
+    res = api_client.get(f"{url}?download")
+    assert res["X-Accel-Redirect"] == f"/protected-media/{instruction.file.name}"
+    assert res["Content-Disposition"] == 'attachment; filename="Darbas.txt"'
+    assert not res.content
+
+
+@pytest.mark.django_db
+def test_submissions_archive(api_client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    client = User.objects.create_user(
+        email="client23@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer23@example.com", password="pass123", role="freelancer"
+    )
+    stranger = User.objects.create_user(
+        email="stranger23@example.com", password="pass123", role="client"
+    )
+    gig = Gig.objects.create(
+        title="Archive gig",
+        description="test",
+        price=200,
+        client=client,
+        freelancer=freelancer,
+        status="in_progress",
+        due_date="2025-12-12",
+    )
+    rounds = [b"first draft", b"x" * 200_000]
+    for number, content in enumerate(rounds, start=1):
+        GigSubmission.objects.create(
+            gig=gig,
+            user=freelancer,
+            file=SimpleUploadedFile("darbas.txt", content),
+            message=f"Versija {number}",
+        )
+    url = f"/api/gigs/{gig.id}/submissions/archive/"
+
+    api_client.force_authenticate(stranger)
+    assert api_client.get(url).status_code == 403
+
+    api_client.force_authenticate(client)
+    res = api_client.get(url)
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/zip"
+    assert "gig-{}-submissions.zip".format(gig.id) in res["Content-Disposition"]
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(res.streaming_content)))
+    assert archive.testzip() is None
+    assert archive.namelist() == [
+        "001_darbas.txt",
+        "002_darbas.txt",
+        "manifest.json",
+    ]
+    assert archive.read("002_darbas.txt") == rounds[1]
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["title"] == "Archive gig"
+    assert [entry["message"] for entry in manifest["submissions"]] == [
+        "Versija 1",
+        "Versija 2",
+    ]
+    assert manifest["submissions"][0]["file"] == "001_darbas.txt"
+
+    # Under ASGI the archive is still produced a chunk at a time.
+    streamed = read_under_asgi(api_client.get(url))
+    archive = zipfile.ZipFile(io.BytesIO(streamed))
+    assert archive.testzip() is None
+    assert archive.read("002_darbas.txt") == rounds[1]
+
+
+@pytest.mark.django_db
+def test_my_work_endpoints_are_paginated(api_client, django_assert_num_queries):
+    client = User.objects.create_user(
+        email="client24@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer24@example.com", password="pass123", role="freelancer"
+    )
+    gigs = [
+        Gig.objects.create(
+            title=f"Work {i}",
+            description="test",
+            price=100 + i,
+            client=client,
+            freelancer=freelancer if i % 2 else None,
+            status="in_progress" if i % 2 else "available",
+            due_date="2025-12-12",
+        )
+        for i in range(5)
+    ]
+    for gig in gigs:
+        Application.objects.create(gig=gig, applicant=freelancer)
+    GigSubmission.objects.create(gig=gigs[1], user=freelancer, file="work.txt")
+
+    api_client.force_authenticate(client)
+    with django_assert_num_queries(1):
+        res = api_client.get("/api/gigs/my/client/?page_size=2")
+    assert [gig["title"] for gig in res.data["results"]] == ["Work 4", "Work 3"]
+    assert res.data["results"][1]["freelancer_username"] == freelancer.username
+    assert res.data["results"][0]["freelancer_username"] is None
+    assert res.data["results"][0]["applications_count"] == 1
+    with django_assert_num_queries(1):
+        res = api_client.get(res.data["next"])
+    assert [gig["title"] for gig in res.data["results"]] == ["Work 2", "Work 1"]
+    assert res.data["results"][1]["submissions_count"] == 1
+
+    res = api_client.get("/api/gigs/my/client/?status=in_progress,pending")
+    assert {gig["id"] for gig in res.data["results"]} == {gigs[1].id, gigs[3].id}
+    assert api_client.get("/api/gigs/my/client/?status=nope").status_code == 400
+    assert api_client.get("/api/gigs/my/freelancer/").data["results"] == []
+
+    api_client.force_authenticate(freelancer)
+    res = api_client.get("/api/gigs/my/freelancer/?status=in_progress")
+    assert [gig["id"] for gig in res.data["results"]] == [gigs[3].id, gigs[1].id]
+
+    with django_assert_num_queries(1):
+        res = api_client.get("/api/applications/my/?gig_status=available")
+    assert [app["gig_title"] for app in res.data["results"]] == [
+        "Work 4",
+        "Work 2",
+        "Work 0",
+    ]
+    assert res.data["results"][0]["client_username"] == client.username
+    res = api_client.get("/api/applications/my/?page_size=4")
+    assert len(res.data["results"]) == 4
+    assert res.data["next"]
+
+
+@pytest.mark.django_db
+def test_freelancer_reputation(api_client):
+    client = User.objects.create_user(
+        email="client25@example.com", password="pass123", role="client"
+    )
+    freelancer = User.objects.create_user(
+        email="freelancer25@example.com",
+        password="pass123",
+        role="freelancer",
+        username="rated",
+    )
+    gigs = [
+        Gig.objects.create(
+            title=f"Rated {i}",
+            description="test",
+            price=100,
+            client=client,
+            freelancer=freelancer,
+            status="completed",
+        )
+        for i in range(3)
+    ]
+    api_client.force_authenticate(client)
+    for gig, rating in zip(gigs, [5, 4, 5]):
+        res = api_client.post(
+            f"/api/gigs/{gig.id}/review/", {"rating": rating, "feedback": "Gerai"}
+        )
+        assert res.status_code == 201
+    res = api_client.post(
+        f"/api/gigs/{gigs[0].id}/review/", {"rating": 9, "feedback": "Per daug"}
+    )
+    assert res.status_code == 400
+
+    reputation = FreelancerReputation.objects.get(user=freelancer)
+    assert (reputation.review_count, reputation.rating_sum) == (3, 14)
+    assert reputation.histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 2}
+    prior = FreelancerReputation.PRIOR_MEAN * FreelancerReputation.PRIOR_WEIGHT
+    expected = (prior + 14) / (FreelancerReputation.PRIOR_WEIGHT + 3)
+    assert reputation.score == pytest.approx(expected)
+
+    profile = api_client.get("/api/user/profile/rated/").data["reputation"]
+    assert profile["review_count"] == 3
+    assert profile["average"] == pytest.approx(14 / 3)
+    assert profile["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 2}
+    reviews = api_client.get("/api/reviews/?gig__freelancer__username=rated").data
+    assert reviews["results"][0]["freelancer_reputation"]["score"] == pytest.approx(
+        expected
+    )
+
+    Review.objects.filter(gig=gigs[1]).delete()
+    gigs[2].delete()
+    reputation.refresh_from_db()
+    assert reputation.histogram == {1: 0, 2: 0, 3: 0, 4: 0, 5: 1}
+    assert rebuild_reputations() == 1
+    reputation.refresh_from_db()
+    assert (reputation.review_count, reputation.rating_sum) == (1, 5)
+
+
+@pytest.mark.django_db
+def test_freelancer_review_feed(
+    api_client, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    client = User.objects.create_user(
+        email="client26@example.com", password="pass123", role="client"
+    )
+    freelancers = [
+        User.objects.create_user(
+            email=f"feed{i}@example.com",
+            password="pass123",
+            role="freelancer",
+            username=f"Feed{i}",
+        )
+        for i in range(2)
+    ]
+
+    def review(freelancer, rating):
+        gig = Gig.objects.create(
+            title=f"Feed gig {rating}",
+            description="test",
+            price=100,
+            client=client,
+            freelancer=freelancer,
+            status="completed",
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            return Review.objects.create(gig=gig, rating=rating, feedback="Ok")
+
+    for rating in (3, 4, 5):
+        review(freelancers[0], rating)
+    url = "/api/reviews/freelancer/feed0/?page_size=2"
+
+    res = api_client.get(url)
+    assert [r["rating"] for r in res.data["results"]] == [5, 4]
+    res = api_client.get(res.data["next"])
+    assert [r["rating"] for r in res.data["results"]] == [3]
+
+    # Cached: only the username lookup runs, and other freelancers' reviews
+    # leave the entry alone.
+    review(freelancers[1], 1)
+    with django_assert_num_queries(1):
+        assert [r["rating"] for r in api_client.get(url).data["results"]] == [5, 4]
+
+    latest = review(freelancers[0], 2)
+    assert [r["rating"] for r in api_client.get(url).data["results"]] == [2, 5]
+    with django_capture_on_commit_callbacks(execute=True):
+        latest.delete()
+    assert [r["rating"] for r in api_client.get(url).data["results"]] == [5, 4]
+
+    # Uncached cursor pages cost the same however many reviews they hold.
+    for rating in (1, 2, 3, 4, 5, 1, 2):
+        review(freelancers[0], rating)
+    counts = []
+    for size in (2, 4):
+        first = api_client.get(f"/api/reviews/freelancer/feed0/?page_size={size}")
+        with CaptureQueriesContext(connection) as queries:
+            res = api_client.get(first.data["next"])
+        assert len(res.data["results"]) == size
+        assert all(r["freelancer_id"] == freelancers[0].pk for r in res.data["results"])
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
+
+    assert api_client.get("/api/reviews/freelancer/nobody/").status_code == 404
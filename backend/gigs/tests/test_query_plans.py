@@ -0,0 +1,87 @@
+import random
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from gigs.models import Application, ClientInstruction, Gig, GigSubmission, Review
+from users.models import User
+
+pytestmark = [pytest.mark.django_db, pytest.mark.query_plan]
+
+STATUSES = ["available", "in_progress", "pending", "completed", "cancelled"]
+
+
+@pytest.fixture
+def seeded():
+    rng = random.Random(42)
+    users = User.objects.bulk_create(
+        User(
+            email=f"seed{i}@example.com",
+            username=f"seed-{i}",
+            role="client" if i % 2 else "freelancer",
+        )
+        for i in range(2000)
+    )
+    clients = [u for u in users if u.role == "client"]
+    freelancers = [u for u in users if u.role == "freelancer"]
+
+    gigs = Gig.objects.bulk_create(
+        Gig(
+            title=f"Seeded gig {i}",
+            description="seeded",
+            price=rng.randint(10, 1000),
+            client=rng.choice(clients),
+            freelancer=rng.choice(freelancers),
+            status=rng.choice(STATUSES),
+        )
+        for i in range(20000)
+    )
+    Application.objects.bulk_create(
+        Application(gig=gig, applicant=freelancer, status="pending")
+        for gig in gigs[:10000]
+        for freelancer in rng.sample(freelancers, 2)
+    )
+    GigSubmission.objects.bulk_create(
+        GigSubmission(gig=gig, user=gig.freelancer, file="work.txt")
+        for gig in gigs[:5000]
+    )
+    ClientInstruction.objects.bulk_create(
+        ClientInstruction(gig=gig, uploaded_by=gig.client, file="brief.txt")
+        for gig in gigs[:5000]
+    )
+    Review.objects.bulk_create(
+        Review(gig=gig, rating=5, feedback="seeded") for gig in gigs[:5000]
+    )
+    return {"client": gigs[0].client, "freelancer": gigs[0].freelancer, "gig": gigs[0]}
+
+
+@pytest.mark.parametrize(
+    "as_role, url",
+    [
+        ("freelancer", "/api/gigs/?status=available"),
+        ("freelancer", "/api/gigs/?status=completed&ordering=price"),
+        ("client", "/api/gigs/?client={client}"),
+        ("freelancer", "/api/gigs/{gig}/"),
+        ("freelancer", "/api/gigs/my/"),
+        ("client", "/api/gigs/my/client/?status=available,in_progress"),
+        ("freelancer", "/api/gigs/my/freelancer/"),
+        ("client", "/api/gigs/{gig}/submissions/"),
+        ("client", "/api/gigs/{gig}/instructions/"),
+        ("freelancer", "/api/applications/my/"),
+        ("freelancer", "/api/applications/my/?status=pending"),
+        ("freelancer", "/api/reviews/?gig__freelancer__username=SEED-1"),
+        ("client", "/api/reviews/freelancer/SEED-2/"),
+    ],
+)
+def test_endpoint_avoids_sequential_scans(seeded, assert_no_seq_scans, as_role, url):
+    api_client = APIClient()
+    api_client.force_authenticate(seeded[as_role])
+    url = url.format(client=seeded["client"].id, gig=seeded["gig"].id)
+
+    with CaptureQueriesContext(connection) as queries:
+        res = api_client.get(url)
+
+    assert res.status_code == 200
+    assert_no_seq_scans(queries.captured_queries)
@@ -0,0 +1,82 @@
+import os
+import zlib
+
+from django.conf import settings
+from django.core.files import File
+
+# Bytes read from the request per write, which bounds memory per chunk.
+READ_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """A chunk that was not appended, with the HTTP status to answer with."""
+
+    def __init__(self, detail, status):
+        self.detail = detail
+        self.status = status
+        super().__init__(detail)
+
+
+class PartFile(File):
+    """
+    A finished part file. Storages that can move files, such as
+    FileSystemStorage, take it over through ``temporary_file_path`` instead
+    of copying it.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def parse_crc32(value):
+    """Parses ``"crc32 <hex>"`` or a bare hex digest into an int."""
+    algorithm, _, digest = value.strip().rpartition(" ")
+    if algorithm not in ("", "crc32") or len(digest) != 8:
+        raise ValueError(value)
+    return int(digest, 16)
+
+
+def create_part_file(upload):
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.path, "wb").close()
+
+
+def append_chunk(upload, stream, offset, length, expected_crc=None):
+    """
+    Streams ``length`` bytes from ``stream`` onto ``upload`` at ``offset``.
+
+    The running CRC32 continues from the one stored on ``upload``, so the
+    whole-file checksum never needs the earlier chunks again. A short or
+    corrupt chunk is cut off again and leaves ``upload`` where it was. The
+    caller must hold a row lock on ``upload``.
+    """
+    if offset != upload.received:
+        raise ChunkError("Netinkamas dalies poslinkis.", status=409)
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise ChunkError("Failo dalis per didelė.", status=413)
+    if offset + length > upload.size:
+        raise ChunkError("Failo dalis viršija nurodytą dydį.", status=400)
+
+    checksum, chunk_checksum, remaining = upload.checksum, 0, length
+    with open(upload.path, "r+b") as part:
+        part.seek(offset)
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            part.write(data)
+            checksum = zlib.crc32(data, checksum)
+            chunk_checksum = zlib.crc32(data, chunk_checksum)
+            remaining -= len(data)
+
+        if remaining:
+            part.truncate(offset)
+            raise ChunkError("Failo dalis gauta ne visa.", status=400)
+        if expected_crc is not None and chunk_checksum != expected_crc:
+            part.truncate(offset)
+            raise ChunkError("Failo dalies kontrolinė suma nesutampa.", status=400)
+        part.truncate()
+
+    upload.received += length
+    upload.checksum = checksum
+    upload.save(update_fields=["received", "checksum", "updated_at"])
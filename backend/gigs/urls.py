@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import GigViewSet, MyApplicationsView, ReviewViewSet
+from .views import FileDownloadView, GigViewSet, MyApplicationsView, ReviewViewSet
 
 router = DefaultRouter()
 router.register(r"gigs", GigViewSet, basename="gig")
@@ -10,4 +10,9 @@ router.register(r"reviews", ReviewViewSet, basename="reviews")
 urlpatterns = [
     path("", include(router.urls)),
     path("applications/my/", MyApplicationsView.as_view(), name="my-applications"),
+    path(
+        "files/<str:kind>/<int:pk>/",
+        FileDownloadView.as_view(),
+        name="file-download",
+    ),
 ]
@@ -1,23 +1,91 @@
 import json
+import os
 from typing import cast
 
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils.http import content_disposition_header
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, status, viewsets
+from django_filters.utils import translate_validation
+from rest_framework import exceptions, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .filters import GigFilter, ReviewFilter
-from .models import Application, Gig, Review
+from core.cache import CachedResponseMixin, cached_value
+from core.conditional import ConditionalGetMixin, collection_version
+from users.models import User
+
+from .archives import stream_submissions_zip
+from .downloads import ThreadedStreamingHttpResponse, serve_file
+from .filters import (
+    GigFilter,
+    MyApplicationFilter,
+    MyGigFilter,
+    ReviewFilter,
+    gig_facets,
+)
+from .importers import GigImportError, import_gigs, parse_gig_rows
+from .models import (
+    Application,
+    ChunkedUpload,
+    ClientInstruction,
+    Gig,
+    GigStateConflict,
+    GigSubmission,
+    Review,
+)
+from .pagination import ApplicationPagination, KeysetPagination
+from .recommendations import gig_skill_index
+from .reputation import FREELANCER_REVIEWS_TAG
 from .serializers import (
-    ApplicationSerializer,
+    ChunkedUploadSerializer,
     ClientInstructionSerializer,
+    GigListSerializer,
     GigSerializer,
     GigSubmissionListSerializer,
     GigSubmissionSerializer,
+    MyApplicationSerializer,
+    MyGigSerializer,
+    ReviewListSerializer,
     ReviewSerializer,
+    parse_field_list,
 )
+from .uploads import ChunkError, PartFile, append_chunk, create_part_file, parse_crc32
+
+FACETS_CACHE_SECONDS = 30
+
+
+def related_count(model):
+    """Number of ``model`` rows per gig as a correlated subquery, 0 for none."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(gig=OuterRef("pk"))
+            .order_by()
+            .values("gig")
+            .annotate(count=Count("id"))
+            .values("count"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
 
 
 class IsClientOrReadOnly(permissions.BasePermission):
@@ -25,16 +93,111 @@ class IsClientOrReadOnly(permissions.BasePermission):
         return request.method in permissions.SAFE_METHODS or obj.client == request.user
 
 
-class GigViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Gig.objects.all()
-        .select_related("client", "freelancer")
-        .prefetch_related("applications__applicant")
-    )
+class GigViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Gig.objects.all().select_related("client", "freelancer")
     serializer_class = GigSerializer
     permission_classes = [permissions.IsAuthenticated, IsClientOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = GigFilter
+    pagination_class = KeysetPagination
+    ordering_fields = ["created_at", "price", "due_date"]
+    cache_tags = ("gigs",)
+    # ``already_applied`` depends on the requesting user.
+    cache_per_user = True
+
+    # Actions that render the full GigSerializer graph for a single gig.
+    detail_actions = {
+        "retrieve",
+        "update",
+        "partial_update",
+        "my",
+    }
+
+    @property
+    def ordering(self):
+        request = getattr(self, "request", None)
+        if request is not None and request.query_params.get("q"):
+            return ["-search_rank"]
+        return ["-created_at"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "recommended"):
+            expand = parse_field_list(self.request.query_params.get("expand"))
+            queryset = self._with_relations(queryset, expand)
+            return queryset.annotate(applications_count=related_count(Application))
+        if self.action in self.detail_actions:
+            expand = GigListSerializer.Meta.expandable_fields
+            return self._with_relations(queryset, expand)
+        return queryset
+
+    def _with_relations(self, queryset, expand):
+        """
+        Loads everything GigSerializer renders in a fixed number of queries,
+        regardless of how many gigs are on the page.
+        """
+        queryset = queryset.prefetch_related("skills")
+
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                has_applied=Exists(
+                    Application.objects.filter(gig=OuterRef("pk"), applicant=user)
+                )
+            )
+
+        if "review" in expand:
+            queryset = queryset.select_related("review")
+        if "applications" in expand:
+            queryset = queryset.prefetch_related("applications__applicant")
+        if "submissions" in expand:
+            queryset = queryset.prefetch_related("submissions")
+        if "latest_submission" in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "submissions",
+                    queryset=GigSubmission.objects.order_by("-submitted_at")[:1],
+                    to_attr="latest_submissions",
+                )
+            )
+        if "latest_instruction" in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "instructions",
+                    queryset=ClientInstruction.objects.order_by("-uploaded_at")[:1],
+                    to_attr="latest_instructions",
+                )
+            )
+        return queryset
+
+    def get_object_version(self):
+        # Child writes touch the gig (see gigs.signals), so ``updated_at``
+        # covers everything the detail serializer renders.
+        try:
+            return (
+                Gig.objects.filter(pk=self.kwargs["pk"])
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def _detail_response(self, pk):
+        queryset = self._with_relations(
+            super().get_queryset(), GigListSerializer.Meta.expandable_fields
+        )
+        return Response(self.get_serializer(queryset.get(pk=pk)).data)
+
+    def _conflict_response(self, exc):
+        return Response(
+            {"detail": "Darbo būsena jau pasikeitė.", "status": exc.status},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    def get_serializer_class(self):
+        if self.action in ("list", "recommended"):
+            return GigListSerializer
+        return GigSerializer
 
     def _set_gig_skills(self, gig, data):
         skill_ids = data.get("skill_ids", [])
@@ -64,6 +227,40 @@ class GigViewSet(viewsets.ModelViewSet):
         response_serializer = self.get_serializer(gig)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk_create(self, request):
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                fmt = "csv" if upload.name.lower().endswith(".csv") else "json"
+                rows = parse_gig_rows(upload.read().decode("utf-8-sig"), fmt)
+            elif isinstance(request.data, dict):
+                rows = request.data.get("gigs", [])
+            else:
+                rows = request.data
+            if not isinstance(rows, list):
+                raise exceptions.ValidationError(
+                    {"gigs": "Turi būti pasiūlymų sąrašas."}
+                )
+            gigs = import_gigs(request.user, rows)
+        except (ValueError, UnicodeDecodeError):
+            return Response(
+                {"detail": "Nepavyko nuskaityti failo."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except GigImportError as exc:
+            return Response({"errors": exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"created": len(gigs), "ids": [gig.id for gig in gigs]},
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
@@ -73,11 +270,12 @@ class GigViewSet(viewsets.ModelViewSet):
         if gig.status != "available":
             return Response({"detail": "Pasiūlymas nėra atviras."}, status=400)
 
-        gig.freelancer = request.user
-        gig.status = "in_progress"
-        gig.save()
+        try:
+            gig.transition("assign", freelancer=request.user)
+        except GigStateConflict as exc:
+            return self._conflict_response(exc)
 
-        return Response(self.get_serializer(gig).data)
+        return self._detail_response(gig.pk)
 
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
@@ -97,8 +295,10 @@ class GigViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        gig.status = "completed"
-        gig.save()
+        try:
+            gig.transition("complete")
+        except GigStateConflict as exc:
+            return self._conflict_response(exc)
 
         return Response(
             {"detail": "Darbas pažymėtas kaip atliktas."}, status=status.HTTP_200_OK
@@ -128,9 +328,15 @@ class GigViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer = ReviewSerializer(data=request.data)
+        serializer = ReviewSerializer(
+            data={
+                "gig": gig.pk,
+                "rating": request.data.get("rating"),
+                "feedback": request.data.get("feedback"),
+            }
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save(gig=gig)
+        serializer.save()
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -181,26 +387,37 @@ class GigViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        freelancer_id = request.data.get("freelancer_id")
+        not_found = Response(
+            {"detail": "Paraiška nerasta."}, status=status.HTTP_404_NOT_FOUND
+        )
         try:
-            application = Application.objects.get(gig=gig, applicant_id=freelancer_id)
-        except Application.DoesNotExist:
-            return Response(
-                {"detail": "Paraiška nerasta."}, status=status.HTTP_404_NOT_FOUND
-            )
+            freelancer_id = int(request.data.get("freelancer_id"))
+        except (TypeError, ValueError):
+            return not_found
 
-        gig.freelancer = application.applicant
-        gig.status = "in_progress"
-        gig.save()
-
-        application.status = "accepted"
-        application.save()
-
-        Application.objects.filter(gig=gig).exclude(
-            applicant=application.applicant
-        ).update(status="rejected")
+        try:
+            with transaction.atomic():
+                gig.transition(
+                    "confirm",
+                    Exists(
+                        Application.objects.filter(
+                            gig=OuterRef("pk"), applicant_id=freelancer_id
+                        )
+                    ),
+                    freelancer_id=freelancer_id,
+                )
+                Application.objects.filter(gig=gig).update(
+                    status=Case(
+                        When(applicant_id=freelancer_id, then=Value("accepted")),
+                        default=Value("rejected"),
+                    )
+                )
+        except GigStateConflict as exc:
+            if exc.status == "available":
+                return not_found
+            return self._conflict_response(exc)
 
-        return Response(self.get_serializer(gig).data)
+        return self._detail_response(gig.pk)
 
     @action(
         detail=True,
@@ -253,10 +470,90 @@ class GigViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def my(self, request):
-        gigs = Gig.objects.filter(freelancer=request.user)
+        gigs = self.get_queryset().filter(freelancer=request.user)
+        return self.conditional(
+            collection_version(gigs),
+            lambda: Response(self.get_serializer(gigs, many=True).data),
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="my/client",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def my_client(self, request):
+        return self._my_gigs(Gig.objects.filter(client=request.user))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="my/freelancer",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def my_freelancer(self, request):
+        return self._my_gigs(Gig.objects.filter(freelancer=request.user))
+
+    def _my_gigs(self, queryset):
+        """One keyset page of ``queryset`` as ``MyGigSerializer`` in one query."""
+        filterset = MyGigFilter(self.request.query_params, queryset=queryset)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = (
+            filterset.qs.select_related("client", "freelancer")
+            .defer("description", "search_vector", "skill_id_array")
+            .annotate(
+                applications_count=related_count(Application),
+                submissions_count=related_count(GigSubmission),
+            )
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = MyGigSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def recommended(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, 100))
+
+        scores = dict(gig_skill_index.recommend(request.user, limit=limit))
+        gigs = list(self.get_queryset().filter(pk__in=scores, status="available"))
+        gigs.sort(key=lambda gig: scores[gig.pk], reverse=True)
+        for gig in gigs:
+            gig.recommendation_score = scores[gig.pk]
+
         serializer = self.get_serializer(gigs, many=True)
         return Response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def facets(self, request):
+        queryset = self.filter_queryset(Gig.objects.all())
+        # Only the filter parameters, so paging and ordering share an entry.
+        signature = sorted(
+            (name, sorted(request.query_params.getlist(name)))
+            for name in GigFilter.base_filters
+            if name in request.query_params
+        )
+        facets = cached_value(
+            "gig-facets",
+            signature,
+            ("gigs", "skills"),
+            lambda: gig_facets(queryset),
+            timeout=FACETS_CACHE_SECONDS,
+        )
+        return Response(facets)
+
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
@@ -277,10 +574,13 @@ class GigViewSet(viewsets.ModelViewSet):
             context={"gig": gig, "request": request},
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
 
-        gig.status = "pending"
-        gig.save()
+        try:
+            with transaction.atomic():
+                gig.transition("submit")
+                serializer.save()
+        except GigStateConflict as exc:
+            return self._conflict_response(exc)
 
         return Response({"detail": "Darbas pateiktas."}, status=201)
 
@@ -295,8 +595,7 @@ class GigViewSet(viewsets.ModelViewSet):
                 {"detail": "Tik klientas gali patvirtinti darbą."}, status=403
             )
 
-        latest_submission = gig.submissions.order_by("-submitted_at").first()
-        if not latest_submission:
+        if not gig.submissions.exists():
             return Response({"detail": "Darbas dar nepateiktas."}, status=400)
 
         if gig.status != "pending":
@@ -305,17 +604,26 @@ class GigViewSet(viewsets.ModelViewSet):
                 status=400,
             )
 
-        gig.status = "completed"
-        gig.save()
-
         rating = request.data.get("rating")
         feedback = request.data.get("feedback")
 
-        if rating and feedback:
-            if hasattr(gig, "review"):
-                return Response({"detail": "Atsiliepimas jau egzistuoja."}, status=400)
+        if rating and feedback and hasattr(gig, "review"):
+            return Response({"detail": "Atsiliepimas jau egzistuoja."}, status=400)
+
+        if rating and str(rating) not in {"1", "2", "3", "4", "5"}:
+            return Response(
+                {"detail": "Įvertinimas turi būti nuo 1 iki 5."}, status=400
+            )
 
-            Review.objects.create(gig=gig, rating=int(rating), feedback=feedback)
+        try:
+            with transaction.atomic():
+                gig.transition("approve")
+                if rating and feedback:
+                    Review.objects.create(
+                        gig=gig, rating=int(rating), feedback=feedback
+                    )
+        except GigStateConflict as exc:
+            return self._conflict_response(exc)
 
         return Response(
             {"detail": "Darbas patvirtintas ir atsiliepimas pateiktas."}, status=200
@@ -335,8 +643,7 @@ class GigViewSet(viewsets.ModelViewSet):
         if gig.client != request.user:
             return Response({"detail": "Tik klientas gali atmesti darbą."}, status=403)
 
-        latest_submission = gig.submissions.order_by("-submitted_at").first()
-        if not latest_submission:
+        if not gig.submissions.exists():
             return Response({"detail": "Darbas dar nepateiktas."}, status=400)
 
         if gig.status != "pending":
@@ -344,14 +651,43 @@ class GigViewSet(viewsets.ModelViewSet):
                 {"detail": "Tik laukiami darbai gali būti atmesti."}, status=400
             )
 
-        gig.status = "in_progress"
-        gig.save()
+        try:
+            gig.transition("decline")
+        except GigStateConflict as exc:
+            return self._conflict_response(exc)
 
         return Response(
             {"detail": "Darbas atmestas. Specialistas gali pateikti iš naujo."},
             status=200,
         )
 
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="submissions/archive",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def submissions_archive(self, request, pk=None):
+        gig = self.get_object()
+
+        if gig.client != request.user and gig.freelancer != request.user:
+            return Response(
+                {
+                    "detail": "Tik klientas arba paskirtas specialistas gali atsisiųsti pateikimus."
+                },
+                status=403,
+            )
+
+        # Read up front so no query runs while the response streams.
+        submissions = list(gig.submissions.order_by("submitted_at", "id"))
+        response = ThreadedStreamingHttpResponse(
+            stream_submissions_zip(gig, submissions), content_type="application/zip"
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            True, f"gig-{gig.pk}-submissions.zip"
+        )
+        return response
+
     @action(
         detail=True,
         methods=["get"],
@@ -420,23 +756,218 @@ class GigViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=201)
 
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="uploads",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def start_upload(self, request, pk=None):
+        gig = self.get_object()
+        serializer = ChunkedUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        uploader = {"submission": gig.freelancer, "instruction": gig.client}
+        if uploader[serializer.validated_data["kind"]] != request.user:
+            return Response({"detail": "Neturite teisės įkelti šio failo."}, status=403)
+
+        upload = serializer.save(gig=gig, user=request.user)
+        create_part_file(upload)
+        return Response(ChunkedUploadSerializer(upload).data, status=201)
+
+    def _get_upload(self, upload_id, lock=False):
+        uploads = ChunkedUpload.objects.filter(
+            gig=self.get_object(), user=self.request.user
+        )
+        if lock:
+            uploads = uploads.select_for_update()
+        try:
+            return uploads.get(pk=upload_id)
+        except (ChunkedUpload.DoesNotExist, ValidationError):
+            raise NotFound("Įkėlimas nerastas.")
+
+    @action(
+        detail=True,
+        methods=["get", "put"],
+        url_path=r"uploads/(?P<upload_id>[^/.]+)",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """
+        ``GET`` reports how much of the upload arrived, so a client can resume.
+        ``PUT`` appends the raw request body at the ``Upload-Offset`` header,
+        optionally checked against ``Upload-Checksum: crc32 <hex>``.
+        """
+        if request.method == "GET":
+            return Response(ChunkedUploadSerializer(self._get_upload(upload_id)).data)
+
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers.get("Content-Length") or 0)
+            expected_crc = request.headers.get("Upload-Checksum")
+            if expected_crc is not None:
+                expected_crc = parse_crc32(expected_crc)
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Trūksta arba netinkamos įkėlimo antraštės."}, status=400
+            )
+
+        with transaction.atomic():
+            upload = self._get_upload(upload_id, lock=True)
+            try:
+                # The body is read straight off the request stream, never
+                # parsed into request.data.
+                append_chunk(upload, request.stream, offset, length, expected_crc)
+            except ChunkError as exc:
+                return Response(
+                    {"detail": exc.detail, "received": upload.received},
+                    status=exc.status,
+                )
+        return Response(ChunkedUploadSerializer(upload).data)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path=r"uploads/(?P<upload_id>[^/.]+)/finalize",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def finalize_upload(self, request, pk=None, upload_id=None):
+        with transaction.atomic():
+            upload = self._get_upload(upload_id, lock=True)
+            if not upload.is_complete:
+                return Response(
+                    {
+                        "detail": "Failas dar neįkeltas iki galo.",
+                        "received": upload.received,
+                    },
+                    status=400,
+                )
+            checksum = request.data.get("checksum")
+            try:
+                if checksum is not None and parse_crc32(checksum) != upload.checksum:
+                    raise ValueError(checksum)
+            except ValueError:
+                upload.discard()
+                return Response(
+                    {"detail": "Failo kontrolinė suma nesutampa."}, status=400
+                )
+
+            try:
+                record = self._save_upload(upload, request.data)
+            except GigStateConflict as exc:
+                transaction.set_rollback(True)
+                return self._conflict_response(exc)
+            upload.discard()
+
+        if upload.kind == "submission":
+            serializer = GigSubmissionSerializer(record, context={"request": request})
+        else:
+            serializer = ClientInstructionSerializer(
+                record, context={"request": request}
+            )
+        return Response(serializer.data, status=201)
+
+    def _save_upload(self, upload, data):
+        """Creates the row for a finished upload and moves its file into place."""
+        gig = upload.gig
+        if upload.kind == "submission":
+            gig.transition("submit")
+            record = GigSubmission(
+                gig=gig, user=upload.user, message=data.get("message", "")
+            )
+        else:
+            record = ClientInstruction(
+                gig=gig,
+                uploaded_by=upload.user,
+                description=data.get("description", ""),
+            )
+        with open(upload.path, "rb") as part:
+            record.file.save(upload.filename, PartFile(part))
+        return record
+
 
-class MyApplicationsView(APIView):
+class MyApplicationsView(ListAPIView):
+    serializer_class = MyApplicationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ApplicationPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = MyApplicationFilter
 
-    def get(self, request):
-        applications = Application.objects.filter(
-            applicant=request.user
-        ).select_related("gig")
-        serializer = ApplicationSerializer(
-            applications, many=True, context={"request": request}
+    def get_queryset(self):
+        return Application.objects.filter(applicant=self.request.user).select_related(
+            "gig__client"
         )
-        return Response(serializer.data)
 
 
-class ReviewViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Review.objects.select_related("gig__freelancer", "gig__client")
-    serializer_class = ReviewSerializer
+class FileDownloadView(APIView):
+    """
+    Serves a submission or instruction file to the gig's client and
+    freelancer, checking both in the query that looks the file up.
+    """
+
+    permission_classes = [IsAuthenticated]
+    models = {"submissions": GigSubmission, "instructions": ClientInstruction}
+
+    def get(self, request, kind, pk):
+        model = self.models.get(kind)
+        if model is None:
+            raise NotFound("Failas nerastas.")
+        participant = Q(gig__client=request.user) | Q(gig__freelancer=request.user)
+        record = (
+            model.objects.filter(participant, pk=pk)
+            .only("file", "original_name")
+            .first()
+        )
+        if record is None or not record.file:
+            raise NotFound("Failas nerastas.")
+        filename = record.original_name or os.path.basename(record.file.name)
+        return serve_file(
+            request,
+            record.file,
+            filename,
+            as_attachment="download" in request.query_params,
+        )
+
+
+class ReviewViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Review.objects.select_related(
+        "gig__freelancer__reputation", "gig__client"
+    )
+    serializer_class = ReviewListSerializer
     permission_classes = [AllowAny]
+    cache_tags = ("reviews",)
     filter_backends = [DjangoFilterBackend]
     filterset_class = ReviewFilter
+    pagination_class = KeysetPagination
+
+    @action(detail=False, methods=["get"], url_path=r"freelancer/(?P<username>[^/]+)")
+    def freelancer(self, request, username=None):
+        """
+        One freelancer's reviews, newest first. The first page is cached until
+        a review of this freelancer changes, not on every review anywhere.
+        """
+        freelancer_id = (
+            User.objects.filter(username__iexact=username)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if freelancer_id is None:
+            raise NotFound("Vartotojas nerastas.")
+        queryset = Review.objects.filter(
+            gig__freelancer_id=freelancer_id
+        ).select_related("gig")
+
+        def render():
+            page = self.paginate_queryset(queryset)
+            serializer = ReviewSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data).data
+
+        if self.paginator.cursor_query_param in request.query_params:
+            return Response(render())
+        data = cached_value(
+            "freelancer-reviews",
+            request.build_absolute_uri(),
+            (FREELANCER_REVIEWS_TAG.format(freelancer_id),),
+            render,
+        )
+        return Response(data)
@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from users.images import variant_names
+
+
+class ProfilePictureVariantsField(serializers.Field):
+    """
+    URLs of the resized profile picture variants, by size and format, or
+    ``None`` until they have been rendered for the current picture.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        picture = user.profile_picture
+        if not picture or user.profile_picture_variants != variant_names(picture.name):
+            return None
+        request = self.context.get("request")
+        urls = {}
+        for size, formats in user.profile_picture_variants.items():
+            urls[size] = {}
+            for fmt, name in formats.items():
+                url = default_storage.url(name)
+                urls[size][fmt] = request.build_absolute_uri(url) if request else url
+        return urls
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Square edge in pixels of each profile picture variant.
+VARIANT_SIZES = {"small": 96, "medium": 256, "large": 512}
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+VARIANT_DIR = "profiles/variants"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_names(source):
+    """
+    Storage names of every variant of ``source``, by size and format.
+
+    Storage keeps source names unique, but ``me.png`` and ``me.jpg`` share a
+    stem, so the names also carry a hash of the whole source name.
+    """
+    stem = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha256(source.encode()).hexdigest()[:16]
+    return {
+        size: {
+            fmt: f"{VARIANT_DIR}/{stem}-{key}-{size}.{fmt}" for fmt in VARIANT_FORMATS
+        }
+        for size in VARIANT_SIZES
+    }
+
+
+def render_variants(source_path, targets):
+    """
+    Writes ``(path, edge, fmt)`` variants of the image at ``source_path``.
+
+    Runs in a worker process, so it only deals in paths and Pillow.
+    """
+    with Image.open(source_path) as original:
+        largest = max(edge for _, edge, _ in targets)
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+        fitted = {}
+        for path, edge, fmt in targets:
+            if edge not in fitted:
+                fitted[edge] = ImageOps.fit(
+                    image, (edge, edge), Image.Resampling.LANCZOS
+                )
+            pil_format, options = VARIANT_FORMATS[fmt]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial_path = f"{path}.part"
+            fitted[edge].save(partial_path, pil_format, **options)
+            os.replace(partial_path, path)
+
+
+def _render_job(source):
+    names = variant_names(source)
+    targets = [
+        (default_storage.path(name), VARIANT_SIZES[size], fmt)
+        for size, formats in names.items()
+        for fmt, name in formats.items()
+    ]
+    return default_storage.path(source), targets, names
+
+
+def _record_variants(user_id, source, names):
+    from users.models import User
+
+    # A newer picture may have been uploaded while this one was rendering.
+    User.objects.filter(pk=user_id, profile_picture=source).update(
+        profile_picture_variants=names, updated_at=timezone.now()
+    )
+
+
+def generate_variants(user_id, source):
+    """Renders and records the variants of ``source`` in this process."""
+    source_path, targets, names = _render_job(source)
+    render_variants(source_path, targets)
+    _record_variants(user_id, source, names)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned rather than forked, so workers never inherit the
+            # server's threads or database connections.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _rendered(user_id, source, names, future):
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Could not resize profile picture %s: %s", source, exc)
+        return
+    try:
+        _record_variants(user_id, source, names)
+    finally:
+        # Done callbacks run on the pool's own thread, which would otherwise
+        # keep its connection open forever.
+        connection.close()
+
+
+def schedule_variants(user_id, source):
+    """
+    Renders the variants of ``source`` in the process pool and stores them
+    on the user once done. With ``IMAGE_VARIANT_WORKERS = 0`` it renders
+    inline instead.
+    """
+    if not settings.IMAGE_VARIANT_WORKERS:
+        generate_variants(user_id, source)
+        return
+    source_path, targets, names = _render_job(source)
+    future = _get_executor().submit(render_variants, source_path, targets)
+    future.add_done_callback(partial(_rendered, user_id, source, names))
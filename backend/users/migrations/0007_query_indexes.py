@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:31
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0006_remove_freelancerprofile_skills_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("username"),
+                name="user_username_upper_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_profile_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
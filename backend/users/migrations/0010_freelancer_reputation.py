@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:17
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_profile_picture_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FreelancerReputation",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="reputation",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("rating_sum", models.PositiveIntegerField(default=0)),
+                ("rating_1", models.PositiveIntegerField(default=0)),
+                ("rating_2", models.PositiveIntegerField(default=0)),
+                ("rating_3", models.PositiveIntegerField(default=0)),
+                ("rating_4", models.PositiveIntegerField(default=0)),
+                ("rating_5", models.PositiveIntegerField(default=0)),
+                (
+                    "score",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=django.db.models.expressions.CombinedExpression(
+                            django.db.models.expressions.CombinedExpression(
+                                models.Value(17.5), "+", models.F("rating_sum")
+                            ),
+                            "/",
+                            django.db.models.expressions.CombinedExpression(
+                                models.Value(5.0), "+", models.F("review_count")
+                            ),
+                        ),
+                        output_field=models.FloatField(),
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        models.OrderBy(models.F("score"), descending=True),
+                        models.OrderBy(models.F("user")),
+                        name="reputation_score_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -8,6 +8,8 @@ from django.contrib.auth.models import (
     PermissionsMixin,
 )
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 if TYPE_CHECKING:
@@ -53,6 +55,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     first_name = models.CharField(max_length=100, blank=True)
     last_name = models.CharField(max_length=100, blank=True)
     profile_picture = models.ImageField(upload_to="profiles/", blank=True, null=True)
+    # Storage names of the resized copies, see users.images.variant_names.
+    profile_picture_variants = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
     address = models.OneToOneField(
         Address, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -66,6 +72,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     groups = models.ManyToManyField(
         Group,
@@ -88,6 +95,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
     objects: "UserManager"
 
+    class Meta:
+        indexes = [
+            # Matches the UPPER(...) = UPPER(...) that iexact lookups compile to.
+            models.Index(Upper("username"), name="user_username_upper_idx"),
+        ]
+
     def __str__(self):
         return self.username or self.email
 
@@ -99,6 +112,57 @@ class FreelancerProfile(models.Model):
     bio = models.TextField(blank=True)
     skills = models.ManyToManyField("users.Skill", blank=True)
     portfolio_links = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class FreelancerReputation(models.Model):
+    """
+    Running review totals of one freelancer, kept by ``gigs.reputation``.
+
+    ``score`` is the Bayesian average: the mean rating after adding
+    ``PRIOR_WEIGHT`` virtual reviews of ``PRIOR_MEAN``, so a single 5-star
+    review does not outrank a long record of 4.8s.
+    """
+
+    PRIOR_MEAN = 3.5
+    PRIOR_WEIGHT = 5
+    RATINGS = range(1, 6)
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="reputation"
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    score = models.GeneratedField(
+        expression=(Value(PRIOR_MEAN * PRIOR_WEIGHT) + F("rating_sum"))
+        / (Value(float(PRIOR_WEIGHT)) + F("review_count")),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                F("score").desc(), F("user").asc(), name="reputation_score_idx"
+            ),
+        ]
+
+    @property
+    def average(self):
+        return self.rating_sum / self.review_count if self.review_count else None
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, f"rating_{rating}") for rating in self.RATINGS}
+
+    def __str__(self):
+        return f"{self.user} ({self.score:.2f})"
 
 
 class ClientProfile(models.Model):
@@ -108,3 +172,4 @@ class ClientProfile(models.Model):
     organization = models.CharField(max_length=255, blank=True)
     business_description = models.TextField(blank=True)
     website = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
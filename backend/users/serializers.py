@@ -13,7 +13,14 @@ from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 
 from gamification.serializers import GamificationProfileSerializer
-from users.models import Address, ClientProfile, FreelancerProfile, Skill
+from users.fields import ProfilePictureVariantsField
+from users.models import (
+    Address,
+    ClientProfile,
+    FreelancerProfile,
+    FreelancerReputation,
+    Skill,
+)
 
 User = get_user_model()
 
@@ -79,6 +86,16 @@ class ClientProfileSerializer(serializers.ModelSerializer):
         fields = ["organization", "business_description", "website"]
 
 
+class FreelancerReputationSerializer(serializers.ModelSerializer):
+    average = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = FreelancerReputation
+        fields = ["review_count", "average", "score", "histogram"]
+        read_only_fields = fields
+
+
 class CustomUserDetailsSerializer(UserDetailsSerializer):
     username = serializers.SlugField(required=False, allow_null=True, allow_blank=True)
     address = AddressSerializer(read_only=True)
@@ -86,6 +103,8 @@ class CustomUserDetailsSerializer(UserDetailsSerializer):
     client_profile = ClientProfileSerializer(read_only=True)
     role = serializers.ChoiceField(choices=User.ROLE_CHOICES, required=False)
     gamification_profile = GamificationProfileSerializer(read_only=True)
+    profile_picture_variants = ProfilePictureVariantsField()
+    reputation = FreelancerReputationSerializer(read_only=True, allow_null=True)
 
     class Meta:
         model = User
@@ -96,11 +115,13 @@ class CustomUserDetailsSerializer(UserDetailsSerializer):
             "first_name",
             "last_name",
             "profile_picture",
+            "profile_picture_variants",
             "address",
             "role",
             "freelancer_profile",
             "client_profile",
             "gamification_profile",
+            "reputation",
         ]
         read_only_fields = ["email"]
 
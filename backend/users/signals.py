@@ -0,0 +1,39 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import invalidate_tags_on_commit
+from users.images import schedule_variants, variant_names
+from users.models import FreelancerProfile, Skill, User
+
+M2M_CHANGES = ("post_add", "post_remove", "post_clear")
+
+
+@receiver(m2m_changed, sender=FreelancerProfile.skills.through)
+def touch_freelancer_profile(sender, instance, action, reverse, pk_set, **kwargs):
+    """Skill changes bypass ``save()``, so bump the profile's ``updated_at``."""
+    if action not in M2M_CHANGES:
+        return
+    profiles = FreelancerProfile.objects.all()
+    if reverse:
+        profiles = profiles.filter(pk__in=pk_set or [])
+    else:
+        profiles = profiles.filter(pk=instance.pk)
+    profiles.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_responses(sender, **kwargs):
+    # Gigs render their skills by name.
+    invalidate_tags_on_commit("skills", "gigs")
+
+
+@receiver(post_save, sender=User)
+def resize_profile_picture(sender, instance, **kwargs):
+    picture = instance.profile_picture
+    if picture and instance.profile_picture_variants != variant_names(picture.name):
+        transaction.on_commit(partial(schedule_variants, instance.pk, picture.name))
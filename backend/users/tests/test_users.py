@@ -1,7 +1,12 @@
+import io
+import time
+
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
 from rest_framework.test import APIClient
 
-from users.models import User
+from users.models import Skill, User
 
 
 @pytest.fixture
@@ -156,3 +161,136 @@ def test_check_username_taken(api_client):
     response = api_client.get("/api/user/check-username/?username=uzimtas")
     assert response.status_code == 409
     assert "detail" in response.data
+
+
+@pytest.mark.django_db
+def test_public_user_profile_conditional_get(api_client):
+    user = User.objects.create_user(
+        email="etaguser@example.com", password="Testpass123!", username="etaguser"
+    )
+    url = f"/api/user/profile/{user.username}/"
+
+    etag = api_client.get(url)["ETag"]
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    user.gamification_profile.add_points(10)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["gamification_profile"]["points"] == 10
+    assert response["ETag"] != etag
+
+    assert api_client.get("/api/user/profile/nobody/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_skill_list_is_cached_until_skills_change(
+    api_client, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    Skill.objects.create(name="Python")
+    assert len(api_client.get("/api/user/skills/").data) == 1
+
+    with django_assert_num_queries(0):
+        response = api_client.get("/api/user/skills/")
+    assert [skill["name"] for skill in response.data] == ["Python"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Skill.objects.create(name="Django")
+    response = api_client.get("/api/user/skills/")
+    assert [skill["name"] for skill in response.data] == ["Django", "Python"]
+
+
+@pytest.mark.django_db
+def test_profile_picture_variants(
+    api_client, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    user = User.objects.create_user(
+        email="avatar@example.com", password="Testpass123!", username="avatar"
+    )
+    upload = io.BytesIO()
+    Image.new("RGBA", (1200, 800), (200, 40, 40, 128)).save(upload, "PNG")
+    api_client.force_authenticate(user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.patch(
+            "/api/auth/user/",
+            {"profile_picture": SimpleUploadedFile("me.png", upload.getvalue())},
+            format="multipart",
+        )
+    assert response.status_code == 200
+
+    variants = api_client.get(f"/api/user/profile/{user.username}/").data[
+        "profile_picture_variants"
+    ]
+    assert set(variants) == {"small", "medium", "large"}
+    assert variants["small"]["webp"].startswith("http://testserver/media/")
+    user.refresh_from_db()
+    for size, edge in (("small", 96), ("large", 512)):
+        for fmt, pil_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            with Image.open(tmp_path / user.profile_picture_variants[size][fmt]) as im:
+                assert (im.format, im.size) == (pil_format, (edge, edge))
+
+    # Another picture with the same stem gets variants of its own.
+    other = User.objects.create_user(
+        email="avatar2@example.com", password="Testpass123!", username="avatar2"
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        other.profile_picture = SimpleUploadedFile("me.jpg", upload.getvalue())
+        other.save()
+    other.refresh_from_db()
+    assert other.profile_picture_variants["small"]["webp"] not in {
+        name
+        for formats in user.profile_picture_variants.values()
+        for name in formats.values()
+    }
+    assert (tmp_path / other.profile_picture_variants["small"]["webp"]).exists()
+
+    # Replacing the picture hides the old variants until the new ones exist.
+    user.profile_picture = SimpleUploadedFile("new.png", upload.getvalue())
+    user.save()
+    response = api_client.get(f"/api/user/profile/{user.username}/")
+    assert response.data["profile_picture_variants"] is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_profile_picture_variants_render_in_process_pool(
+    api_client, settings, tmp_path
+):
+    from users import images
+
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 1
+    user = User.objects.create_user(
+        email="pooled@example.com", password="Testpass123!", username="pooled"
+    )
+    upload = io.BytesIO()
+    Image.new("RGB", (640, 480), (40, 120, 200)).save(upload, "JPEG")
+    api_client.force_authenticate(user)
+
+    try:
+        response = api_client.patch(
+            "/api/auth/user/",
+            {"profile_picture": SimpleUploadedFile("pool.jpg", upload.getvalue())},
+            format="multipart",
+        )
+        assert response.status_code == 200
+        # Rendering and recording happen off the request, in the pool.
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            user.refresh_from_db()
+            if user.profile_picture_variants:
+                break
+            time.sleep(0.1)
+    finally:
+        images._executor.shutdown()
+        images._executor = None
+
+    assert user.profile_picture_variants == images.variant_names(
+        user.profile_picture.name
+    )
+    for size, edge in images.VARIANT_SIZES.items():
+        for name in user.profile_picture_variants[size].values():
+            with Image.open(tmp_path / name) as im:
+                assert im.size == (edge, edge)
@@ -6,6 +6,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin
 from users.models import Skill, User
 from users.serializers import CustomUserDetailsSerializer, SkillSerializer
 
@@ -44,16 +46,40 @@ class CustomLogoutView(LogoutView):
         return response
 
 
-class SkillViewSet(ReadOnlyModelViewSet):
+class SkillViewSet(CachedResponseMixin, ReadOnlyModelViewSet):
     queryset = Skill.objects.all().order_by("name")
     serializer_class = SkillSerializer
     permission_classes = [permissions.AllowAny]
+    cache_tags = ("skills",)
 
 
-class PublicUserProfileView(RetrieveAPIView):
+class PublicUserProfileView(ConditionalGetMixin, RetrieveAPIView):
     queryset = User.objects.select_related(
-        "gamification_profile", "freelancer_profile", "client_profile", "address"
+        "gamification_profile",
+        "freelancer_profile",
+        "client_profile",
+        "address",
+        "reputation",
     )
     serializer_class = CustomUserDetailsSerializer
     lookup_field = "username"
     permission_classes = [permissions.AllowAny]
+
+    def get_object_version(self):
+        # The address has no timestamp of its own, so its columns are part of
+        # the validator; they come from the same joined row.
+        return (
+            User.objects.filter(username=self.kwargs["username"])
+            .values_list(
+                "updated_at",
+                "gamification_profile__updated_at",
+                "freelancer_profile__updated_at",
+                "client_profile__updated_at",
+                "reputation__updated_at",
+                "address__street",
+                "address__city",
+                "address__postal_code",
+                "address__country",
+            )
+            .first()
+        )
@@ -2,6 +2,7 @@ import { Modal, Button } from "flowbite-react";
 import { useAuth } from "../context/useAuth";
 import { useEffect, useRef, useState } from "react";
 import api from "../services/axios";
+import { ProfilePictureVariants } from "../types/profile";
 
 type ChatModalProps = {
   show: boolean;
@@ -16,12 +17,14 @@ type Message = {
     first_name: string;
     last_name: string;
     profile_picture: string | null;
+    profile_picture_variants: ProfilePictureVariants;
   };
   recipient: {
     username: string;
     first_name: string;
     last_name: string;
     profile_picture: string | null;
+    profile_picture_variants: ProfilePictureVariants;
   };
   content: string;
   timestamp: string;
@@ -126,8 +129,10 @@ export default function ChatModal({ show, onClose, otherUsername }: ChatModalPro
           {messages.map((msg, index) => {
             const isSender = msg.sender.username === user?.username;
 
-            const avatarUrl = msg.sender.profile_picture
-              ? `http://localhost:8000${msg.sender.profile_picture}`
+            const picture =
+              msg.sender.profile_picture_variants?.small.webp ?? msg.sender.profile_picture;
+            const avatarUrl = picture
+              ? `http://localhost:8000${picture}`
               : `https://ui-avatars.com/api/?name=${msg.sender.first_name}+${msg.sender.last_name}&background=0D8ABC&color=fff`;
 
             return (
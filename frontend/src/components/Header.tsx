@@ -106,7 +106,7 @@ export default function Header({ variant = "welcome" }: HeaderProps) {
             </div>
 
             <Avatar
-              img={user.profile_picture || undefined}
+              img={user.profile_picture_variants?.small.webp || user.profile_picture || undefined}
               alt={user.first_name}
               rounded
               className="cursor-pointer w-10 h-10"
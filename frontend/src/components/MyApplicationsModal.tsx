@@ -14,17 +14,26 @@ interface MyApplicationsModalProps {
 export default function MyApplicationsModal({ show, onClose, onViewGig }: MyApplicationsModalProps) {
   const [applications, setApplications] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState<string | null>(null);
 
   useEffect(() => {
     if (show) {
       setLoading(true);
-      api.get("/applications/my").then((res) => {
-        setApplications(res.data);
+      api.get("/applications/my/").then((res) => {
+        setApplications(res.data.results);
+        setNextPage(res.data.next);
         setLoading(false);
       });
     }
   }, [show]);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    const res = await api.get(nextPage);
+    setApplications((prev) => [...prev, ...res.data.results]);
+    setNextPage(res.data.next);
+  };
+
   const handleCancel = async (gigId: number, applicantId: number) => {
     try {
       await api.delete(`/gigs/${gigId}/applications/${applicantId}/`);
@@ -89,6 +98,13 @@ export default function MyApplicationsModal({ show, onClose, onViewGig }: MyAppl
               </li>
 
             ))}
+            {nextPage && (
+              <li className="flex justify-center">
+                <Button size="xs" color="gray" onClick={loadMore}>
+                  Rodyti daugiau
+                </Button>
+              </li>
+            )}
           </ul>
         )}
 
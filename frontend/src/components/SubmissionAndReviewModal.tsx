@@ -87,10 +87,20 @@ export default function SubmissionAndReviewModal({
   return (
     <Modal show={show} onClose={onClose} size="lg">
       <div className="p-6 space-y-6 bg-white dark:bg-gray-900 rounded-xl shadow-xl">
-        <h3 className="text-2xl font-extrabold text-gray-900 dark:text-white flex items-center gap-2">
-          <FaCheckCircle className="text-green-500" />
-          Darbo pateikimai
-        </h3>
+        <div className="flex items-center justify-between gap-2">
+          <h3 className="text-2xl font-extrabold text-gray-900 dark:text-white flex items-center gap-2">
+            <FaCheckCircle className="text-green-500" />
+            Darbo pateikimai
+          </h3>
+          {submissions.length > 1 && (
+            <a
+              href={`${api.defaults.baseURL}/gigs/${gig.id}/submissions/archive/`}
+              className="text-sm text-blue-600 hover:underline flex items-center gap-1"
+            >
+              <FaFileDownload /> Atsisiųsti visus (ZIP)
+            </a>
+          )}
+        </div>
 
         {loadingSubs ? (
           <div className="flex justify-center py-6">
@@ -100,7 +110,7 @@ export default function SubmissionAndReviewModal({
           <div className="space-y-4 max-h-[500px] overflow-y-auto pr-1">
             {submissions.map((sub) => {
               const isLatest = sub.id === latestSubmission.id;
-              const ext = getFileExtension(sub.file_url || "");
+              const ext = getFileExtension(sub.original_name || "");
 
               return (
                 <div
@@ -1,4 +1,5 @@
 import { createContext } from "react";
+import { ProfilePictureVariants } from "../types/profile";
 
 interface GamificationProfile {
   xp: number;
@@ -13,6 +14,7 @@ export interface User {
   username: string;
   role: string | null;
   profile_picture: string | null;
+  profile_picture_variants?: ProfilePictureVariants;
 
   gamification_profile?: GamificationProfile;
   // freelancer
@@ -31,8 +31,10 @@ export default function DashboardPage() {
 
   const [gigs, setGigs] = useState<any[]>([]);
   const fetchGigs = async () => {
-    const res = await api.get("/gigs/");
-    setGigs(res.data);
+    const res = await api.get("/gigs/", {
+      params: { expand: "applications,latest_submission" },
+    });
+    setGigs(res.data.results);
   };
 
   useEffect(() => {
@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import api from "../services/axios";
-import { Button, TextInput, Label } from "flowbite-react";
+import { Button, Checkbox, TextInput, Label } from "flowbite-react";
 import { FaMoneyBillWave, FaClipboardCheck, FaUserTie, FaCalendar } from "react-icons/fa";
 import { useAuth } from "../context/useAuth";
 import GigModal from "../components/GigModal";
@@ -18,32 +18,44 @@ export default function GigsPage() {
   const [minPrice, setMinPrice] = useState("");
   const [skills, setSkills] = useState<{ label: string; value: number }[]>([]);
   const [selectedSkills, setSelectedSkills] = useState<number[]>([]);
+  const [matchAllSkills, setMatchAllSkills] = useState(false);
+  const [skillCounts, setSkillCounts] = useState<Record<number, number>>({});
   const { isDarkMode } = useDarkMode();
   const isDark = isDarkMode;
 
 
   const fetchGigs = async () => {
+    const request = {
+      params: {
+        status: "available",
+        q: search,
+        min_price: minPrice,
+        skill_ids: selectedSkills.join(","),
+        skill_match: matchAllSkills ? "all" : "any",
+      },
+      paramsSerializer: (params: Record<string, any>) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+          if (Array.isArray(value)) {
+            value.forEach((v) => query.append(key, v.toString()));
+          } else if (value) {
+            query.append(key, value.toString());
+          }
+        });
+        return query.toString();
+      },
+    };
     try {
-      const res = await api.get("/gigs/", {
-        params: {
-          status: "available",
-          search,
-          min_price: minPrice,
-          skill_ids: selectedSkills,
-        },
-        paramsSerializer: (params) => {
-          const query = new URLSearchParams();
-          Object.entries(params).forEach(([key, value]) => {
-            if (Array.isArray(value)) {
-              value.forEach((v) => query.append(key, v.toString()));
-            } else if (value) {
-              query.append(key, value.toString());
-            }
-          });
-          return query.toString();
-        },
-      });
-      setGigs(res.data);
+      const [res, facets] = await Promise.all([
+        api.get("/gigs/", request),
+        api.get("/gigs/facets/", request),
+      ]);
+      setGigs(res.data.results);
+      setSkillCounts(
+        Object.fromEntries(
+          facets.data.skills.map((s: any) => [s.id, s.count])
+        )
+      );
     } catch (err) {
       console.error("Nepavyko gauti darbų:", err);
     }
@@ -109,6 +121,11 @@ export default function GigsPage() {
           <Label>Įgūdžiai</Label>
           <Select
             options={skills}
+            formatOptionLabel={(option) =>
+              skillCounts[option.value]
+                ? `${option.label} (${skillCounts[option.value]})`
+                : option.label
+            }
             isMulti
             placeholder="Pasirinkite įgūdžius..."
             onChange={(selected) => {
@@ -169,6 +186,14 @@ export default function GigsPage() {
               },
             })}
           />
+          <div className="flex items-center gap-2 mt-2">
+            <Checkbox
+              id="matchAllSkills"
+              checked={matchAllSkills}
+              onChange={(e) => setMatchAllSkills(e.target.checked)}
+            />
+            <Label htmlFor="matchAllSkills">Visi pasirinkti įgūdžiai</Label>
+          </div>
         </div>
         <Button onClick={fetchGigs} className="col-span-full w-full sm:w-auto mt-2">
           Filtruoti
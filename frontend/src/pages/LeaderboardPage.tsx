@@ -3,34 +3,57 @@ import { Spinner, Avatar } from "flowbite-react";
 import { HiUserGroup, HiBriefcase } from "react-icons/hi2";
 import { Link } from "react-router-dom";
 import api from "../services/axios";
+import { ProfilePictureVariants } from "../types/profile";
 
 interface LeaderboardEntry {
+  rank: number;
   id: number;
   username: string;
   first_name: string;
   last_name: string;
   profile_picture: string | null;
+  profile_picture_variants: ProfilePictureVariants;
   level: number;
   xp: number;
   points: number;
+  period_xp: number | null;
 }
 
+interface Leaderboard {
+  count: number;
+  me: { rank: number } | null;
+  results: LeaderboardEntry[];
+}
+
+type Period = "all" | "week" | "month" | "season";
+
+const periodLabels: Record<Period, string> = {
+  all: "Visų laikų",
+  week: "Savaitės",
+  month: "Mėnesio",
+  season: "Sezono",
+};
+
+const emptyLeaderboard: Leaderboard = { count: 0, me: null, results: [] };
+
 export default function LeaderboardPage() {
-  const [freelancers, setFreelancers] = useState<LeaderboardEntry[]>([]);
-  const [clients, setClients] = useState<LeaderboardEntry[]>([]);
+  const [freelancers, setFreelancers] = useState<Leaderboard>(emptyLeaderboard);
+  const [clients, setClients] = useState<Leaderboard>(emptyLeaderboard);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState<"freelancers" | "clients">("freelancers");
+  const [period, setPeriod] = useState<Period>("all");
 
   useEffect(() => {
     const fetchLeaderboard = async () => {
+      const params = period === "all" ? {} : { period };
       try {
         const [freelancersRes, clientsRes] = await Promise.all([
-          api.get("/gamification/leaderboard/freelancers/"),
-          api.get("/gamification/leaderboard/clients/"),
+          api.get("/gamification/leaderboard/freelancers/", { params }),
+          api.get("/gamification/leaderboard/clients/", { params }),
         ]);
 
-        setFreelancers(Array.isArray(freelancersRes.data) ? freelancersRes.data : []);
-        setClients(Array.isArray(clientsRes.data) ? clientsRes.data : []);
+        setFreelancers(freelancersRes.data);
+        setClients(clientsRes.data);
       } catch (error) {
         console.error("Klaida įkeliant duomenis:", error);
       } finally {
@@ -39,61 +62,72 @@ export default function LeaderboardPage() {
     };
 
     fetchLeaderboard();
-  }, []);
+  }, [period]);
 
-  const getRankColor = (index: number) => {
-    if (index === 0) return "text-yellow-500 font-bold";
-    if (index === 1) return "text-gray-400 font-semibold";
-    if (index === 2) return "text-yellow-800 font-medium";
+  const getRankColor = (rank: number) => {
+    if (rank === 1) return "text-yellow-500 font-bold";
+    if (rank === 2) return "text-gray-400 font-semibold";
+    if (rank === 3) return "text-yellow-800 font-medium";
     return "";
   };
 
-  const renderLeaderboard = (entries: LeaderboardEntry[]) => (
-    <div className="overflow-x-auto mt-4 rounded-xl shadow ring-1 ring-gray-200 dark:ring-gray-700">
-      <table className="w-full text-sm text-left text-gray-500 dark:text-gray-300">
-        <thead className="text-xs text-gray-700 uppercase bg-gray-50 dark:bg-gray-800 dark:text-gray-400">
-          <tr>
-            <th className="px-6 py-3">#</th>
-            <th className="px-6 py-3">Naudotojas</th>
-            <th className="px-6 py-3">Lygis</th>
-            <th className="px-6 py-3">XP</th>
-            <th className="px-6 py-3">Taškai</th>
-          </tr>
-        </thead>
-        <tbody>
-          {entries.map((entry, index) => (
-            <tr
-              key={entry.id}
-              className="bg-white dark:bg-gray-900 border-b dark:border-gray-700 hover:bg-gray-50 dark:hover:bg-gray-800"
-            >
-              <td className={`px-6 py-4 ${getRankColor(index)}`}>{index + 1}</td>
-              <td className="px-6 py-4 flex items-center gap-3">
-                <Link
-                  to={`/profile/${entry.username}`}
-                  className="flex items-center gap-3 hover:bg-gray-100 dark:hover:bg-gray-800 p-2 rounded-md transition"
-                >
-                  <Avatar
-                    img={entry.profile_picture ? `http://localhost:8000${entry.profile_picture}` : undefined}
-                    alt={`${entry.first_name} ${entry.last_name}`}
-                    rounded
-                    size="sm"
-                  />
-                  <div>
-                    <div className="font-medium text-gray-900 dark:text-white">
-                      {entry.first_name} {entry.last_name}
-                    </div>
-                    <div className="text-xs text-gray-500">@{entry.username}</div>
-                  </div>
-                </Link>
-              </td>
-              <td className="px-6 py-4">{entry.level}</td>
-              <td className="px-6 py-4">{entry.xp}</td>
-              <td className="px-6 py-4">{entry.points}</td>
+  const renderLeaderboard = ({ count, me, results: entries }: Leaderboard) => (
+    <>
+      {me && (
+        <p className="text-sm text-gray-600 dark:text-gray-300">
+          Tavo vieta: <span className="font-semibold">#{me.rank}</span> iš {count}
+        </p>
+      )}
+      <div className="overflow-x-auto mt-4 rounded-xl shadow ring-1 ring-gray-200 dark:ring-gray-700">
+        <table className="w-full text-sm text-left text-gray-500 dark:text-gray-300">
+          <thead className="text-xs text-gray-700 uppercase bg-gray-50 dark:bg-gray-800 dark:text-gray-400">
+            <tr>
+              <th className="px-6 py-3">#</th>
+              <th className="px-6 py-3">Naudotojas</th>
+              <th className="px-6 py-3">Lygis</th>
+              <th className="px-6 py-3">{period === "all" ? "XP" : "Surinkta XP"}</th>
+              <th className="px-6 py-3">Taškai</th>
             </tr>
-          ))}
-        </tbody>
-      </table>
-    </div>
+          </thead>
+          <tbody>
+            {entries.map((entry) => (
+              <tr
+                key={entry.id}
+                className="bg-white dark:bg-gray-900 border-b dark:border-gray-700 hover:bg-gray-50 dark:hover:bg-gray-800"
+              >
+                <td className={`px-6 py-4 ${getRankColor(entry.rank)}`}>{entry.rank}</td>
+                <td className="px-6 py-4 flex items-center gap-3">
+                  <Link
+                    to={`/profile/${entry.username}`}
+                    className="flex items-center gap-3 hover:bg-gray-100 dark:hover:bg-gray-800 p-2 rounded-md transition"
+                  >
+                    <Avatar
+                      img={(() => {
+                        const picture =
+                          entry.profile_picture_variants?.small.webp ?? entry.profile_picture;
+                        return picture ? `http://localhost:8000${picture}` : undefined;
+                      })()}
+                      alt={`${entry.first_name} ${entry.last_name}`}
+                      rounded
+                      size="sm"
+                    />
+                    <div>
+                      <div className="font-medium text-gray-900 dark:text-white">
+                        {entry.first_name} {entry.last_name}
+                      </div>
+                      <div className="text-xs text-gray-500">@{entry.username}</div>
+                    </div>
+                  </Link>
+                </td>
+                <td className="px-6 py-4">{entry.level}</td>
+                <td className="px-6 py-4">{entry.period_xp ?? entry.xp}</td>
+                <td className="px-6 py-4">{entry.points}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+    </>
   );
 
   return (
@@ -131,6 +165,21 @@ export default function LeaderboardPage() {
             </button>
           </div>
 
+          <div className="flex gap-2 mb-4">
+            {(Object.keys(periodLabels) as Period[]).map((value) => (
+              <button
+                key={value}
+                onClick={() => setPeriod(value)}
+                className={`px-3 py-1 rounded-md text-xs font-medium transition ${period === value
+                  ? "bg-blue-100 text-blue-700 dark:bg-blue-900 dark:text-blue-200"
+                  : "bg-gray-100 text-gray-700 dark:bg-gray-700 dark:text-gray-200"
+                  }`}
+              >
+                {periodLabels[value]}
+              </button>
+            ))}
+          </div>
+
           {activeTab === "freelancers"
             ? renderLeaderboard(freelancers)
             : renderLeaderboard(clients)}
@@ -2,6 +2,7 @@ import { useParams } from "react-router-dom";
 import { useEffect, useState } from "react";
 import { useAuth } from "../context/useAuth";
 import api from "../services/axios";
+import { FreelancerReputation, ProfilePictureVariants } from "../types/profile";
 import {
   FaFlask,
   FaClock,
@@ -47,7 +48,9 @@ interface ProfileData {
   first_name: string;
   last_name: string;
   profile_picture: string;
+  profile_picture_variants?: ProfilePictureVariants;
   gamification_profile: GamificationProfile;
+  reputation?: FreelancerReputation | null;
   freelancer_profile?: {
     bio: string;
     skills: { id: number; name: string }[];
@@ -126,7 +129,7 @@ export default function ProfilePage() {
           api.get(`/gamification/user-benefits/`),
           api.get(`/gamification/missions/`),
           api.get(`/gamification/progress/?username=${username}`),
-          api.get(`/reviews/?gig__freelancer__username=${username}`),
+          api.get(`/reviews/freelancer/${username}/`),
         ]);
 
         setProfile(profileRes.data);
@@ -152,11 +155,8 @@ export default function ProfilePage() {
         }
         setProgressMap(map);
 
-        setReviews(
-          reviewsRes.data.sort(
-            (a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-          )
-        );
+        // Newest first, one page.
+        setReviews(reviewsRes.data.results);
 
       } catch (err) {
         console.error("Failed to load data", err);
@@ -184,7 +184,7 @@ export default function ProfilePage() {
       <div className="flex items-center justify-between gap-6 border-b pb-6">
         <div className="flex items-center gap-6">
           <img
-            src={profile.profile_picture}
+            src={profile.profile_picture_variants?.medium.webp ?? profile.profile_picture}
             alt={profile.first_name}
             className="w-24 h-24 rounded-full object-cover border-4 border-blue-500"
           />
@@ -266,6 +266,20 @@ export default function ProfilePage() {
       {profile.role === "freelancer" && reviews.length > 0 && (
         <div className="bg-white dark:bg-gray-900 p-6 rounded-xl shadow space-y-4">
           <h2 className="text-xl font-bold text-gray-900 dark:text-white">Atsiliepimai</h2>
+          {profile.reputation && profile.reputation.review_count > 0 && (
+            <div className="flex flex-wrap items-center gap-4 text-sm text-gray-700 dark:text-gray-200">
+              <span className="flex items-center gap-1 font-semibold">
+                <FaStar className="text-yellow-400" />
+                {profile.reputation.average?.toFixed(1)} ({profile.reputation.review_count}{" "}
+                atsiliepimai)
+              </span>
+              {(["5", "4", "3", "2", "1"] as const).map((stars) => (
+                <span key={stars} className="text-xs text-gray-500">
+                  {stars}★: {profile.reputation!.histogram[stars]}
+                </span>
+              ))}
+            </div>
+          )}
           <div className="space-y-4">
             {reviews.map((review) => (
               <div key={review.id} className="p-4 rounded-lg border dark:border-gray-700 shadow">
@@ -55,6 +55,14 @@ export default function GamificationSocket() {
           );
           refreshUser();
         }
+        if (data.type === "missions_completed") {
+          const titles = data.missions.map((mission: { title: string }) => mission.title);
+          toast.custom(
+            <MissionToast title={titles.join(", ")} xp={data.xp} points={data.points} />,
+            { duration: 4000, position: "top-center" }
+          );
+          refreshUser();
+        }
         if (data.type === "badge_unlocked") {
           toast.custom(
             <BadgeToast title={data.title} description={data.description} icon={data.icon} />,
@@ -3,6 +3,21 @@ export interface Skill {
   name: string;
 }
 
+export type ProfilePictureSize = "small" | "medium" | "large";
+
+// Resized copies of the profile picture, null until the server has made them.
+export type ProfilePictureVariants = Record<
+  ProfilePictureSize,
+  { webp: string; jpeg: string }
+> | null;
+
+export interface FreelancerReputation {
+  review_count: number;
+  average: number | null;
+  score: number;
+  histogram: Record<"1" | "2" | "3" | "4" | "5", number>;
+}
+
 export interface GamificationProfile {
   xp: number;
   level: number;
@@ -15,6 +30,7 @@ export interface ProfileData {
   first_name: string;
   last_name: string;
   profile_picture: string;
+  profile_picture_variants?: ProfilePictureVariants;
   gamification_profile: GamificationProfile;
   role: "freelancer" | "client";
   freelancer_profile?: {